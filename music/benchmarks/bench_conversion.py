@@ -0,0 +1,270 @@
+"""
+Offline end-to-end conversion benchmark.
+
+    python -m benchmarks.bench_conversion [--latency 0.05] [--iterations 200] [--concurrency 16] [--output results.json]
+
+Runs song, album and artist conversions in every direction against the fake backends in
+benchmarks.fakes, injected through MusicServiceFactory, at three levels: Converter.convert,
+main.convert_link and the Telegram handlers, plus whole-playlist conversions through
+AsyncConverter.convert_playlist (latencies there are the gaps between consecutive tracks).
+The bot levels take Spotify, YouTube Music and YouTube links, the last routed to the service that
+tries YouTube Music before the Data API. The Data API service is run once more with its quota
+spent, so its calls take the YouTube Music fallback. Reports p50/p95/p99 latency and conversions
+per second, and writes machine-readable results for comparing releases.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import permutations
+from types import SimpleNamespace
+from typing import Callable, List
+
+from benchmarks.fakes import install_fakes
+from yt2spotify.converter import AsyncConverter, Converter
+from yt2spotify.quota import QuotaBudget
+from yt2spotify.services.factory import MusicServiceFactory
+from yt2spotify.services.service_names import ServiceNameEnum
+
+SOURCES = [ServiceNameEnum.SPOTIFY, ServiceNameEnum.YOUTUBE_MUSIC, ServiceNameEnum.YOUTUBE_STANDARD,
+           ServiceNameEnum.YOUTUBE_YTM]
+KINDS = ["song", "album", "artist"]
+BASE62 = string.ascii_letters + string.digits
+YT_ID = string.ascii_letters + string.digits + "-_"
+
+
+def random_url(service: ServiceNameEnum, kind: str, rng: random.Random) -> str:
+    """
+    A link to a never-seen entity, so every conversion takes the cold path.
+    """
+    def rand(alphabet, length):
+        return "".join(rng.choice(alphabet) for _ in range(length))
+
+    if service == ServiceNameEnum.SPOTIFY:
+        path = {"song": "track", "album": "album", "artist": "artist"}[kind]
+        return f"https://open.spotify.com/{path}/{rand(BASE62, 22)}?si={rand(BASE62, 16)}"
+    host = "https://music.youtube.com" if service == ServiceNameEnum.YOUTUBE_MUSIC else "https://www.youtube.com"
+    if kind == "song":
+        return f"{host}/watch?v={rand(YT_ID, 11)}"
+    if kind == "album":
+        return f"{host}/playlist?list=OLAK5uy_{rand(YT_ID, 33)}"
+    return f"{host}/channel/UC{rand(YT_ID, 22)}"
+
+
+@dataclass
+class Result:
+    target: str
+    direction: str
+    kind: str
+    iterations: int
+    concurrency: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    conversions_per_second: float
+    errors: int
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summarise(target, direction, kind, latencies, wall, errors, concurrency) -> Result:
+    latencies = sorted(latencies)
+    return Result(
+        target=target, direction=direction, kind=kind, iterations=len(latencies), concurrency=concurrency,
+        p50_ms=percentile(latencies, 0.50) * 1000, p95_ms=percentile(latencies, 0.95) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000, conversions_per_second=len(latencies) / wall, errors=errors,
+    )
+
+
+def bench_converter(from_name, to_name, kind, iterations, concurrency, rng,
+                    target: str = "Converter.convert") -> Result:
+    urls = [random_url(from_name, kind, rng) for _ in range(iterations)]
+    errors = 0
+
+    def one(url):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            Converter.by_names(from_name, to_name).convert(url)
+        except Exception:
+            errors += 1
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(one, urls))
+    wall = time.perf_counter() - start
+    return summarise(target, f"{from_name.value}->{to_name.value}", kind, latencies, wall, errors, concurrency)
+
+
+async def bench_playlist(from_name, to_name, concurrency, rng) -> Result:
+    if from_name == ServiceNameEnum.SPOTIFY:
+        url = f"https://open.spotify.com/playlist/{''.join(rng.choice(BASE62) for _ in range(22))}"
+    else:
+        host = "https://music.youtube.com" if from_name == ServiceNameEnum.YOUTUBE_MUSIC else "https://www.youtube.com"
+        url = f"{host}/playlist?list=PL{''.join(rng.choice(YT_ID) for _ in range(32))}"
+    converter = AsyncConverter.by_names(from_name, to_name)
+    gaps = []
+    errors = 0
+    start = last = time.perf_counter()
+    async for result in converter.convert_playlist(url, concurrency):
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+        errors += isinstance(result, Exception)
+    return summarise("convert_playlist", f"{from_name.value}->{to_name.value}", "playlist", gaps,
+                     last - start, errors, concurrency)
+
+
+async def _bench_async(target, direction, kind, calls: List[Callable], concurrency) -> Result:
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one(call):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(call) for call in calls))
+    wall = time.perf_counter() - start
+    return summarise(target, direction, kind, latencies, wall, errors, concurrency)
+
+
+def _message_update(text: str, user_id: int):
+    async def reply_text(reply, **kwargs):
+        return reply
+    message = SimpleNamespace(text=text, reply_text=reply_text, chat_id=user_id, parse_entities=lambda types: {})
+    return SimpleNamespace(message=message, effective_chat=SimpleNamespace(id=user_id))
+
+
+def _inline_update(query: str, user_id: int):
+    inline_query = SimpleNamespace(id=str(user_id), query=query, from_user=SimpleNamespace(id=user_id))
+    return SimpleNamespace(inline_query=inline_query)
+
+
+def _context():
+    async def answer_inline_query(inline_query_id, results, **kwargs):
+        return True
+    return SimpleNamespace(bot=SimpleNamespace(answer_inline_query=answer_inline_query))
+
+
+async def bench_bot(main, iterations, concurrency, rng) -> List[Result]:
+    results = []
+    # the kinds of link users send; the bot's router picks the service converting each
+    for link_service in (ServiceNameEnum.SPOTIFY, ServiceNameEnum.YOUTUBE_MUSIC, ServiceNameEnum.YOUTUBE_STANDARD):
+        for kind in KINDS:
+            route = main.link_router.route(random_url(link_service, kind, rng))
+            direction = f"{route.service.value}->{main.target_service(route.key).value}"
+            urls = [random_url(link_service, kind, rng) for _ in range(iterations)]
+            calls = [lambda url=url: main.convert_link(url) for url in urls]
+            results.append(await _bench_async("convert_link", direction, kind, calls, concurrency))
+
+            urls = [random_url(link_service, kind, rng) for _ in range(iterations)]
+            calls = [lambda i=i, url=url: main.handle_message(_message_update(url, i), _context())
+                     for i, url in enumerate(urls)]
+            results.append(await _bench_async("handle_message", direction, kind, calls, concurrency))
+
+            urls = [random_url(link_service, kind, rng) for _ in range(iterations)]
+            calls = [lambda i=i, url=url: main.inline_convert(_inline_update(url, i), _context())
+                     for i, url in enumerate(urls)]
+            results.append(await _bench_async("inline_convert", direction, kind, calls, concurrency))
+    return results
+
+
+def import_bot(cache_dir: str):
+    # main validates its configuration at import time
+    for var in ("TELE_API_KEY", "SPOTIPY_CLIENT_ID", "SPOTIPY_CLIENT_SECRET", "YOUTUBE_API_KEY"):
+        os.environ.setdefault(var, "benchmark")
+    os.environ["YT2SPOTIFY_CACHE_PATH"] = os.path.join(cache_dir, "cache.sqlite3")
+    os.environ["INLINE_DEBOUNCE_SECONDS"] = "0"
+    import main
+    return main
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every backend call")
+    parser.add_argument("--iterations", type=int, default=200, help="conversions per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("YOUTUBE_API_KEY", "benchmark")
+    install_fakes(args.latency, pool_size=args.concurrency)
+    rng = random.Random(args.seed)
+
+    results = []
+    for from_name, to_name in permutations(SOURCES, 2):
+        for kind in KINDS:
+            results.append(bench_converter(from_name, to_name, kind, args.iterations, args.concurrency, rng))
+
+    # the Data API service once its daily quota is spent: every call goes to YouTube Music instead
+    MusicServiceFactory.configure_quota(QuotaBudget(daily_limit=0))
+    for from_name, to_name in ((ServiceNameEnum.YOUTUBE_STANDARD, ServiceNameEnum.SPOTIFY),
+                               (ServiceNameEnum.SPOTIFY, ServiceNameEnum.YOUTUBE_STANDARD)):
+        for kind in KINDS:
+            results.append(bench_converter(from_name, to_name, kind, args.iterations, args.concurrency, rng,
+                                           target="quota spent"))
+    MusicServiceFactory.configure_quota(QuotaBudget())
+
+    # a 500-track playlist from each source that has playlists
+    for from_name, to_name in ((ServiceNameEnum.SPOTIFY, ServiceNameEnum.YOUTUBE_MUSIC),
+                               (ServiceNameEnum.YOUTUBE_MUSIC, ServiceNameEnum.SPOTIFY),
+                               (ServiceNameEnum.YOUTUBE_STANDARD, ServiceNameEnum.SPOTIFY),
+                               (ServiceNameEnum.YOUTUBE_YTM, ServiceNameEnum.SPOTIFY)):
+        results.append(asyncio.run(bench_playlist(from_name, to_name, args.concurrency, rng)))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        bot = import_bot(cache_dir)
+        results.extend(asyncio.run(bench_bot(bot, args.iterations, args.concurrency, rng)))
+        bot.conversion_cache.close()
+        bot.isrc_index.close()
+        bot.link_graph.close()
+        bot.traffic_log.close()
+
+    print(f"{'target':<18} {'direction':<28} {'kind':<7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'conv/s':>9} {'errors':>6}")
+    for result in results:
+        print(f"{result.target:<18} {result.direction:<28} {result.kind:<7} {result.p50_ms:8.1f} "
+              f"{result.p95_ms:8.1f} {result.p99_ms:8.1f} {result.conversions_per_second:9.1f} {result.errors:6}")
+
+    if args.output:
+        report = {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "parameters": vars(args),
+            "results": [asdict(result) for result in results],
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Microbenchmark for the canonical entity parser.
+
+    python -m benchmarks.bench_entities [--size 100000] [--urls links.txt]
+
+Compares `parse_url` against the per-service regex chains it replaced (detect followed by
+url_to_search_params' findall calls) on a sample of real links (--urls, one per line, or the
+links in benchmarks.corpus.SENT_LINKS) and on the synthetic corpus, then routes every word of
+mixed chat messages through the LinkRouter and through the old detect-each-service loop.
+
+Per link, parse_url costs about what the first matching regex did; it is not a speed-up on its
+own. What it buys is a canonical key (so share parameters, hosts and locale prefixes no longer
+split caches) and routing in one pass instead of detect-then-parse per service.
+"""
+import argparse
+import re
+import time
+from typing import Callable, List
+
+from benchmarks.corpus import chat_corpus, sample_corpus, url_corpus
+from yt2spotify.entities import parse_url
+from yt2spotify.services.factory import MusicServiceFactory
+
+_router = MusicServiceFactory.router()
+
+_spotifypattern = re.compile(r'(?:https://)?open\.spotify\.com/(track|artist|album)/.+')
+_ytmpattern = re.compile(r'(?:https://)?music\.youtube\.com/watch\?.*(?<=v=)([-\w]+).*')
+_ytmchannel_pattern = re.compile(r'(?:https://)?music\.youtube\.com/channel/([-\w]+).*')
+_ytmplaylist_pattern = re.compile(r'(?:https://)?music\.youtube\.com/playlist\?.*(?<=list=)([-\w]+).*')
+_ytpattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/watch\?.*(?<=v=)([-\w]+).*')
+_ytpattern_short_link = re.compile(r'(?:https://)?youtu\.be/([-_\w]+).*')
+_ytchannel_pattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/(?:(@[-\w]+)|channel/([-\w]+).*)')
+_ytplaylist_pattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/playlist\?.*(?<=list=)([-\w]+).*')
+
+
+def legacy_parse(url: str):
+    if _spotifypattern.match(url):
+        return _spotifypattern.findall(url)[0]
+    for pattern in (_ytmpattern, _ytmchannel_pattern, _ytmplaylist_pattern):
+        if pattern.match(url):
+            return pattern.findall(url)[0]
+    url = url.replace("m.youtube.com", "youtube.com")
+    if _ytpattern_short_link.match(url):
+        url = url.replace("youtu.be/", "youtube.com/watch?v=")
+    for pattern in (_ytpattern, _ytchannel_pattern, _ytplaylist_pattern):
+        if pattern.match(url):
+            return pattern.findall(url)[0]
+    return None
+
+
+def bench(name: str, fn: Callable, corpus: List[str], repeat: int, unit: str = "url") -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url in corpus:
+            fn(url)
+        best = min(best, time.perf_counter() - start)
+    per_url = best / len(corpus) * 1e9
+    print(f"{name:<14} {per_url:8.0f} ns/{unit:<7} {len(corpus) / best:12,.0f} {unit}s/s")
+    return per_url
+
+
+def route_message(text: str):
+    return [route for route in map(_router.route, text.split()) if route is not None]
+
+
+def legacy_route_message(text: str):
+    # convert_link used to try each service's detect regexes in turn, then parse the link again
+    return [parsed for parsed in map(legacy_parse, text.split()) if parsed is not None]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--urls", help="file of real links, one per line")
+    args = parser.parse_args()
+
+    for label, corpus in (("sampled", sample_corpus(args.size, args.urls)), ("synthetic", url_corpus(args.size))):
+        keys = {parse_url(url) for url in corpus} - {None}
+        print(f"{len(corpus):,} {label} urls, {len(set(corpus)):,} distinct links, {len(keys)} distinct entities")
+        bench("parse_url", parse_url, corpus, args.repeat)
+        bench("legacy regex", legacy_parse, corpus, args.repeat)
+        print()
+
+    messages = chat_corpus(max(1, args.size // 5))
+    links = sum(len(route_message(message)) for message in messages)
+    print(f"{len(messages):,} chat messages, {links:,} routable links")
+    bench("router", route_message, messages, args.repeat, "message")
+    bench("legacy regex", legacy_route_message, messages, args.repeat, "message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Candidate ranking on a labelled set.
+
+    python -m benchmarks.bench_matching [--repeat 2000]
+
+Each case is a source's SearchParams, the candidates a target search returned (in the shape the
+services build them) and the index of the right one. Reports top-1 accuracy of taking results[0]
+versus yt2spotify.matching.rank, how many candidates the early exit scored, and the time per ranking.
+"""
+import argparse
+import time
+from typing import List, NamedTuple
+
+from yt2spotify.matching import DEFAULT_THRESHOLD, best_match, rank
+from yt2spotify.models import ResultItem, Results, SearchParams
+
+
+class Case(NamedTuple):
+    name: str
+    params: SearchParams
+    candidates: List[ResultItem]
+    correct: int
+
+
+def track(title, album, artists, duration_s=None, year="2000") -> ResultItem:
+    return ResultItem(url=f"https://example.com/{title}", uri=title, description1=title,
+                      description2=f"{album} ({year})", description3=artists, description4="Track",
+                      duration_ms=duration_s * 1000 if duration_s else None)
+
+
+def video(title, channel) -> ResultItem:
+    return ResultItem(url=f"https://youtube.com/{title}", uri=title, description1=title,
+                      description2=channel, description3="", description4="Track")
+
+
+def album(title, artists, year) -> ResultItem:
+    return ResultItem(url=f"https://example.com/{title}", uri=title, description1=title,
+                      description2=year, description3=artists, description4="Album")
+
+
+def artist(name) -> ResultItem:
+    return ResultItem(url=f"https://example.com/{name}", uri=name, description1=name, description4="Artist")
+
+
+def song(name, artist_name, album_name=None, duration_s=None, year=None) -> SearchParams:
+    return SearchParams(name=name, artist=artist_name, album=album_name, search_type_hint="song",
+                        duration_ms=duration_s * 1000 if duration_s else None, year=year)
+
+
+CASES = [
+    Case("live version ranked first",
+         song("Yellow", "Coldplay", "Parachutes", 266),
+         [track("Yellow (Live in Buenos Aires)", "Live in Buenos Aires", "Coldplay", 290),
+          track("Yellow", "Parachutes", "Coldplay", 267)], 1),
+    Case("cover ranked first",
+         song("Hallelujah", "Jeff Buckley", "Grace", 413),
+         [track("Hallelujah", "Shrek", "Rufus Wainwright", 247),
+          track("Hallelujah", "Grace", "Jeff Buckley", 414)], 1),
+    Case("karaoke ranked first",
+         song("Rolling in the Deep", "Adele", "21", 228),
+         [track("Rolling in the Deep (Karaoke Version)", "Karaoke Hits", "Party Tyme", 230),
+          track("Rolling in the Deep", "21", "Adele", 228)], 1),
+    Case("remix ranked first",
+         song("Blinding Lights", "The Weeknd", "After Hours", 200),
+         [track("Blinding Lights - Chromatics Remix", "Blinding Lights (Remix)", "The Weeknd", 271),
+          track("Blinding Lights", "After Hours", "The Weeknd", 200)], 1),
+    Case("remaster is the same recording",
+         song("Bohemian Rhapsody - Remastered 2011", "Queen", "A Night At The Opera", 354),
+         [track("Bohemian Rhapsody", "A Night At The Opera", "Queen", 355),
+          track("Bohemian Rhapsody (Live Aid)", "Live Aid", "Queen", 360)], 0),
+    Case("featured artist credits",
+         song("Stay (with Justin Bieber)", "The Kid LAROI", "F*CK LOVE 3", 141),
+         [track("Stay", "Stay", "The Kid LAROI, Justin Bieber", 141)], 0),
+    Case("official video upload",
+         song("Yellow", "Coldplay", duration_s=266),
+         [video("Coldplay - Yellow (Official Video)", "Coldplay"),
+          video("Yellow - Coldplay cover", "Some Busker")], 0),
+    Case("lyric video ranked before official audio",
+         song("Bad Guy", "Billie Eilish"),
+         [video("Billie Eilish - bad guy (Slowed + Reverb)", "Slowed Vibes"),
+          video("Billie Eilish - bad guy (Official Audio)", "Billie Eilish")], 1),
+    Case("radio edit vs extended mix",
+         song("Levels - Radio Edit", "Avicii", "Levels", 199),
+         [track("Levels - Extended Mix", "Levels", "Avicii", 342),
+          track("Levels - Radio Edit", "Levels", "Avicii", 199)], 1),
+    Case("accents and case",
+         song("Déjà Vu", "Beyoncé", "B'Day", 240),
+         [track("Deja Vu", "Deja Vu", "Olivia Rodrigo", 215),
+          track("DÉJÀ VU", "B'Day", "Beyonce, JAY-Z", 240)], 1),
+    Case("deluxe album vs original",
+         SearchParams(album="1989", artist="Taylor Swift", year="2014", search_type_hint="album"),
+         [album("1989 (Taylor's Version)", "Taylor Swift", "2023"), album("1989", "Taylor Swift", "2014")], 1),
+    Case("tribute album first",
+         SearchParams(album="Nevermind", artist="Nirvana", year="1991", search_type_hint="album"),
+         [album("Nevermind (A Tribute)", "Various Artists", "2012"), album("Nevermind", "Nirvana", "1991")], 1),
+    Case("similarly named artist",
+         SearchParams(artist="The National", search_type_hint="artist"),
+         [artist("National Sweetheart"), artist("The National"), artist("The Nationals")], 1),
+    Case("already first",
+         song("Smells Like Teen Spirit", "Nirvana", "Nevermind", 301),
+         [track("Smells Like Teen Spirit", "Nevermind", "Nirvana", 301)]
+         + [track(f"Smells Like Teen Spirit (Cover {i})", "Covers", f"Band {i}", 300) for i in range(9)], 0),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000, help="rankings per case for the timing")
+    args = parser.parse_args()
+
+    baseline = matched = scored = 0
+    print(f"{'case':<42} {'first':>6} {'ranked':>7} {'confidence':>11}")
+    for case in CASES:
+        result = rank(case.params, Results(results=case.candidates, manual_search_link=""))
+        ranked_right = result.results[0] is case.candidates[case.correct]
+        baseline += case.correct == 0
+        matched += ranked_right
+        match = best_match(case.params, case.candidates)
+        scored += match.index + 1 if match.confidence >= DEFAULT_THRESHOLD else len(case.candidates)
+        print(f"{case.name:<42} {'ok' if case.correct == 0 else 'wrong':>6} {'ok' if ranked_right else 'wrong':>7} "
+              f"{result.confidence:11.2f}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for case in CASES:
+            best_match(case.params, case.candidates)
+    per_ranking = (time.perf_counter() - start) / (args.repeat * len(CASES))
+
+    candidates = sum(len(case.candidates) for case in CASES)
+    print(f"\ntop-1 accuracy: results[0] {baseline}/{len(CASES)}, ranked {matched}/{len(CASES)}")
+    print(f"candidates scored: {scored} of {candidates} (early exit at {DEFAULT_THRESHOLD})")
+    print(f"{per_ranking * 1e6:.1f} µs per ranking")
+
+
+if __name__ == "__main__":
+    main()
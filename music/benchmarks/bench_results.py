@@ -0,0 +1,82 @@
+"""
+Allocation and latency of the services' result-parsing loops.
+
+    python -m benchmarks.bench_results [--iterations 2000] [--limit 10]
+
+Runs song, album and artist searches through each service against the fake backends in
+benchmarks.fakes (no latency), so the time measured is turning a backend response into results.
+Reports microseconds per search, and the bytes and blocks tracemalloc sees allocated per search. The
+"api" rows add building the pydantic models, which only happens when a result is serialised.
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.fakes import FakeSpotify, FakeYTMusic, FakeYoutubeHttp
+from yt2spotify.models import SearchParams
+from yt2spotify.services.client_pool import ClientPool
+from yt2spotify.services.spotify import SpotifyService
+from yt2spotify.services.youtube_client import build_youtube_client
+from yt2spotify.services.youtube_music import YoutubeMusicService
+from yt2spotify.services.youtube_standard import YoutubeService
+from yt2spotify.services.youtube_ytm import YoutubeYTMService
+
+PARAMS = {
+    "song": SearchParams(name="Yellow", artist="Coldplay", album="Parachutes", search_type_hint="song"),
+    "album": SearchParams(album="Parachutes", artist="Coldplay", search_type_hint="album"),
+    "artist": SearchParams(artist="Coldplay", search_type_hint="artist"),
+}
+
+
+def services():
+    youtube = YoutubeService(build_youtube_client("key", ClientPool(FakeYoutubeHttp, 1)))
+    ytmusic = YoutubeMusicService(FakeYTMusic())
+    return {
+        "spotify": SpotifyService(FakeSpotify()),
+        "youtube_music": ytmusic,
+        "youtube": youtube,
+        "youtube_ytm": YoutubeYTMService(ytmusic, youtube),
+    }
+
+
+def measure(search: Callable[[], object], iterations: int):
+    for _ in range(10):
+        search()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        search()
+    elapsed = time.perf_counter() - start
+
+    # allocations are counted on a shorter run, tracemalloc slows everything down
+    runs = max(1, iterations // 10)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [search() for _ in range(runs)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    del kept
+    return elapsed / iterations * 1e6, size / runs, blocks / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000, help="searches per service and kind")
+    parser.add_argument("--limit", type=int, default=10, help="results per search")
+    args = parser.parse_args()
+
+    print(f"{'service':<14} {'kind':<7} {'path':<8} {'µs/search':>10} {'bytes kept':>11} {'blocks':>8}")
+    for name, service in services().items():
+        for kind, params in PARAMS.items():
+            rows = [("search", lambda: service.search_with_params(params, args.limit)),
+                    ("api", lambda: service.search_with_params(params, args.limit).to_model())]
+            for path, search in rows:
+                micros, size, blocks = measure(search, args.iterations)
+                print(f"{name:<14} {kind:<7} {path:<8} {micros:10.1f} {size:11.0f} {blocks:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import random
+from typing import List, Optional
+
+# IDs taken from links users have actually sent the bot
+SPOTIFY_TRACKS = ["6jBCehpNMkwFVF3dz4nLIW", "4uJSCrI7r0usNJ3aaHAuC6", "4cOdK2wGLETKBW3PvgPWqT", "3AJwUDP919kvQ9QcozQPxg"]
+SPOTIFY_ALBUMS = ["7kjLKy9JLbwM9F7eDQEnd2", "2FeyIYDDAQqcOJKOKhvHdr", "6ZG5lRT77aJ3btmArcykra"]
+SPOTIFY_ARTISTS = ["66CXWjxzNUsdJxJ2JdwvnR", "4gzpq5DPGxSnKTe4SA8HAU"]
+YOUTUBE_VIDEOS = ["dGeEuyG_DIc", "agPV1ZvtLHI", "dQw4w9WgXcQ", "ffxKSjUwKdU", "hT_nvWreIhg", "5waF8YR3GmQ"]
+YOUTUBE_ALBUMS = ["OLAK5uy_nbZjqOa38wTK9K4tvhOgPfyKdRnXnYT_4", "OLAK5uy_l1U925dsiDi2DqlG-KCbODG6BaibpxbQE",
+                  "OLAK5uy_mbiRc-WQKXNRCfAeZBsoA-hILP3Oeu2WU", "PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj"]
+YOUTUBE_CHANNELS = ["UC2XdaAVUannpujzv32jcouQ", "UCoIOOL7QKuBhQHVKL8y7BEQ", "UCaziuyHLR37c2jBkHrYSQMA"]
+YOUTUBE_HANDLES = ["@coldplay", "@taylorswift"]
+
+SHARE_SUFFIXES = ["", "?si=y1dqtIB0SumdJGBqKSASQg", "?si=e4509e1f214946fb&context=spotify%3Asearch%3Aits%2Btricky",
+                  "?utm_source=copy-link", "?nd=1&dlsi=5f2c1e"]
+YT_SUFFIXES = ["", "&feature=share", "&si=klsijOktQeoa4avd", "&t=42s", "&list=RDAMVMdGeEuyG_DIc&index=3"]
+
+NOISE = ["hello", "https://example.com/some/page", "https://open.spotify.com/user/spotify",
+         "https://www.youtube.com/feed/trending", "check this out", "https://music.youtube.com/"]
+
+
+# links exactly as users sent them, share junk and all
+SENT_LINKS = [
+    "https://open.spotify.com/track/6jBCehpNMkwFVF3dz4nLIW?si=y1dqtIB0SumdJGBqKSASQg"
+    "&context=spotify%3Asearch%3Aits%2Btricky",
+    "https://open.spotify.com/track/4uJSCrI7r0usNJ3aaHAuC6?si=e4509e1f214946fb",
+    "https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT",
+    "https://open.spotify.com/album/7kjLKy9JLbwM9F7eDQEnd2",
+    "https://open.spotify.com/album/2FeyIYDDAQqcOJKOKhvHdr",
+    "https://open.spotify.com/artist/66CXWjxzNUsdJxJ2JdwvnR",
+    "https://music.youtube.com/watch?v=dGeEuyG_DIc&feature=share",
+    "https://music.youtube.com/watch?v=agPV1ZvtLHI&si=klsijOktQeoa4avd",
+    "https://music.youtube.com/playlist?list=OLAK5uy_nbZjqOa38wTK9K4tvhOgPfyKdRnXnYT_4&si=ovpniEj_3ETQJTD6",
+    "https://music.youtube.com/playlist?list=OLAK5uy_l1U925dsiDi2DqlG-KCbODG6BaibpxbQE&si=4BaMhBCiremnvdil",
+    "https://music.youtube.com/channel/UC2XdaAVUannpujzv32jcouQ",
+    "https://music.youtube.com/channel/UCoIOOL7QKuBhQHVKL8y7BEQ?si=osCb8S8l7ZmRUPlU",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=ffxKSjUwKdU",
+    "https://www.youtube.com/watch?v=hT_nvWreIhg",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/5waF8YR3GmQ",
+    "https://www.youtube.com/playlist?list=OLAK5uy_mbiRc-WQKXNRCfAeZBsoA-hILP3Oeu2WU",
+    "https://www.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj",
+    "https://m.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj",
+    "https://www.youtube.com/channel/UCaziuyHLR37c2jBkHrYSQMA",
+    "https://www.youtube.com/@coldplay",
+    "https://m.youtube.com/@coldplay",
+]
+
+
+def sample_corpus(size: int = 100_000, path: Optional[str] = None, seed: int = 1) -> List[str]:
+    """
+    `size` links drawn from a sample of real ones: `path` (one per line, e.g. exported from
+    the bot's logs) or SENT_LINKS.
+    """
+    if path is not None:
+        with open(path) as f:
+            sample = [line.strip() for line in f if line.strip()]
+    else:
+        sample = SENT_LINKS
+    rng = random.Random(seed)
+    return [rng.choice(sample) for _ in range(size)]
+
+
+def _spotify(rng: random.Random) -> str:
+    kind, ids = rng.choice([("track", SPOTIFY_TRACKS), ("album", SPOTIFY_ALBUMS), ("artist", SPOTIFY_ARTISTS)])
+    prefix = rng.choice(["https://open.spotify.com", "https://open.spotify.com/intl-de", "open.spotify.com"])
+    return f"{prefix}/{kind}/{rng.choice(ids)}{rng.choice(SHARE_SUFFIXES)}"
+
+
+def _youtube_music(rng: random.Random) -> str:
+    choice = rng.randrange(3)
+    if choice == 0:
+        return f"https://music.youtube.com/watch?v={rng.choice(YOUTUBE_VIDEOS)}{rng.choice(YT_SUFFIXES)}"
+    if choice == 1:
+        return f"https://music.youtube.com/playlist?list={rng.choice(YOUTUBE_ALBUMS)}&si=ovpniEj_3ETQJTD6"
+    return f"https://music.youtube.com/channel/{rng.choice(YOUTUBE_CHANNELS)}?si=osCb8S8l7ZmRUPlU"
+
+
+def _youtube(rng: random.Random) -> str:
+    host = rng.choice(["https://www.youtube.com", "https://m.youtube.com", "https://youtube.com"])
+    choice = rng.randrange(5)
+    if choice == 0:
+        return f"{host}/watch?v={rng.choice(YOUTUBE_VIDEOS)}{rng.choice(YT_SUFFIXES)}"
+    if choice == 1:
+        return f"https://youtu.be/{rng.choice(YOUTUBE_VIDEOS)}?si=klsijOktQeoa4avd"
+    if choice == 2:
+        return f"{host}/playlist?list={rng.choice(YOUTUBE_ALBUMS)}"
+    if choice == 3:
+        return f"{host}/channel/{rng.choice(YOUTUBE_CHANNELS)}"
+    return f"{host}/{rng.choice(YOUTUBE_HANDLES)}"
+
+
+def url_corpus(size: int = 100_000, noise_ratio: float = 0.1, seed: int = 1) -> List[str]:
+    """
+    Real-world shaped links: the IDs above combined with the hosts, locale prefixes and
+    share/tracking parameters the Spotify and YouTube apps add, plus some non-links.
+    """
+    rng = random.Random(seed)
+    generators = [_spotify, _youtube_music, _youtube]
+    corpus = []
+    for _ in range(size):
+        if rng.random() < noise_ratio:
+            corpus.append(rng.choice(NOISE))
+        else:
+            corpus.append(rng.choice(generators)(rng))
+    return corpus
+
+
+CHAT_WORDS = ["lol", "this one", "have you heard", "🔥🔥", "on repeat all week", "same artist as yesterday",
+              "can't find it on spotify", "ok", "the live version is better", "@friend", "thoughts?", "https"]
+
+
+def chat_corpus(size: int = 20_000, seed: int = 1) -> List[str]:
+    """
+    Chat messages: a few words, usually with one link (sometimes none or several) mixed in.
+    """
+    rng = random.Random(seed)
+    generators = [_spotify, _youtube_music, _youtube]
+    messages = []
+    for _ in range(size):
+        words = [rng.choice(CHAT_WORDS) for _ in range(rng.randrange(1, 8))]
+        for _ in range(rng.choices([0, 1, 2, 3], weights=[2, 6, 1, 1])[0]):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(generators)(rng))
+        messages.append(" ".join(words))
+    return messages
@@ -0,0 +1,220 @@
+"""
+Offline stand-ins for the Spotify, YTMusic and YouTube Data API clients.
+
+Responses are synthesised deterministically from the requested IDs / queries in the same shape
+the real APIs return, and every call sleeps for a configurable latency to model the network.
+"""
+import hashlib
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import httplib2
+
+from yt2spotify.services.factory import (MusicServiceFactory, SPOTIFY_BACKEND, YOUTUBE_BACKEND,
+                                         YTMUSIC_BACKEND)
+
+ART_URL = "https://i.scdn.co/image/ab67616d0000b273"
+
+
+def _word(seed: str) -> str:
+    return hashlib.blake2b(seed.encode(), digest_size=4).hexdigest()
+
+
+class FakeBackend:
+    def __init__(self, latency: float = 0.0, playlist_length: int = 500):
+        self.latency = latency
+        self.playlist_length = playlist_length
+        self.calls = 0
+
+    def _network(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class FakeSpotify(FakeBackend):
+    def _track(self, track_id: str) -> dict:
+        return {
+            "id": track_id,
+            "name": f"Song {_word(track_id)}",
+            "uri": f"spotify:track:{track_id}",
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            "album": self._album(f"al{track_id[2:]}"),
+            "artists": [self._artist(f"ar{track_id[2:]}")],
+            "external_ids": {"isrc": f"US{_word(track_id).upper()[:3]}{_word(track_id[::-1])[:7]}"},
+            "duration_ms": 215_000,
+        }
+
+    def _album(self, album_id: str) -> dict:
+        return {
+            "id": album_id,
+            "name": f"Album {_word(album_id)}",
+            "uri": f"spotify:album:{album_id}",
+            "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+            "release_date": "2011-10-24",
+            "images": [{"url": ART_URL}],
+            "artists": [self._artist(f"ar{album_id[2:]}")],
+        }
+
+    def _artist(self, artist_id: str) -> dict:
+        return {
+            "id": artist_id,
+            "name": f"Artist {_word(artist_id)}",
+            "uri": f"spotify:artist:{artist_id}",
+            "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+            "images": [{"url": ART_URL}],
+        }
+
+    def track(self, track_id, market=None):
+        self._network()
+        return self._track(track_id)
+
+    def album(self, album_id, market=None):
+        self._network()
+        return self._album(album_id)
+
+    def artist(self, artist_id):
+        self._network()
+        return self._artist(artist_id)
+
+    def tracks(self, tracks, market=None):
+        self._network()
+        return {"tracks": [self._track(track_id) for track_id in tracks]}
+
+    def albums(self, albums, market=None):
+        self._network()
+        return {"albums": [self._album(album_id) for album_id in albums]}
+
+    def artists(self, artists):
+        self._network()
+        return {"artists": [self._artist(artist_id) for artist_id in artists]}
+
+    def playlist_items(self, playlist_id, fields=None, limit=100, offset=0, market=None,
+                       additional_types=("track", "episode")):
+        self._network()
+        end = min(offset + limit, self.playlist_length)
+        items = [{"track": self._track(f"{i:022d}")} for i in range(offset, end)]
+        more = end < self.playlist_length
+        return {"items": items, "next": f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks?offset={end}"
+                if more else None}
+
+    def search(self, q, limit=10, offset=0, type="track", market=None):
+        self._network()
+        ids = [_word(f"{q}{i}").ljust(22, "0") for i in range(limit)]
+        if type == "album":
+            return {"albums": {"items": [self._album(item_id) for item_id in ids]}}
+        if type == "artist":
+            return {"artists": {"items": [self._artist(item_id) for item_id in ids]}}
+        return {"tracks": {"items": [self._track(item_id) for item_id in ids]}}
+
+
+class FakeYTMusic(FakeBackend):
+    @staticmethod
+    def _thumbnails():
+        return [{"url": "https://lh3.googleusercontent.com/small"}, {"url": "https://lh3.googleusercontent.com/large"}]
+
+    def get_song(self, videoId, signatureTimestamp=None):
+        self._network()
+        return {"videoDetails": {"videoId": videoId, "title": f"Song {_word(videoId)}",
+                                 "author": f"Artist {_word(videoId[::-1])} - Topic", "lengthSeconds": "215"}}
+
+    def get_artist(self, channelId):
+        self._network()
+        return {"name": f"Artist {_word(channelId)}", "channelId": channelId}
+
+    def get_album_browse_id(self, audioPlaylistId):
+        self._network()
+        return f"MPREb_{_word(audioPlaylistId)}"
+
+    def get_album(self, browseId):
+        self._network()
+        return {"title": f"Album {_word(browseId)}", "artists": [{"name": f"Artist {_word(browseId[::-1])}"}],
+                "year": "2011"}
+
+    def get_playlist(self, playlistId, limit=100, related=False, suggestions_limit=0):
+        self._network()
+        count = self.playlist_length if limit is None else min(limit, self.playlist_length)
+        tracks = [{"videoId": f"{i:011d}", "title": f"Song {_word(str(i))}", "album": None,
+                   "artists": [{"name": f"Artist {_word(str(i)[::-1])}"}], "duration_seconds": 215}
+                  for i in range(count)]
+        return {"id": playlistId, "title": f"Playlist {_word(playlistId)}", "trackCount": self.playlist_length,
+                "tracks": tracks}
+
+    def search(self, query, filter=None, scope=None, limit=20, ignore_spelling=False):
+        self._network()
+        results = []
+        for i in range(limit):
+            word = _word(f"{query}{i}")
+            artists = [{"name": f"Artist {word}", "id": f"UC{word.ljust(22, '0')}"}]
+            if filter == "albums":
+                results.append({"browseId": f"MPREb_{word}", "title": f"Album {word}", "year": "2011",
+                                "artists": artists, "thumbnails": self._thumbnails()})
+            elif filter == "artists":
+                results.append({"browseId": f"UC{word.ljust(22, '0')}", "artist": f"Artist {word}",
+                                "thumbnails": self._thumbnails()})
+            else:
+                results.append({"videoId": word.ljust(11, "0")[:11], "title": f"Song {word}",
+                                "album": {"name": f"Album {word}"}, "year": "2011", "artists": artists,
+                                "duration_seconds": 215, "thumbnails": self._thumbnails()})
+        return results
+
+
+class FakeYoutubeHttp(FakeBackend):
+    """
+    httplib2.Http stand-in answering the YouTube Data API v3 endpoints the services call, so the real
+    googleapiclient request building runs on top of it.
+    """
+
+    @staticmethod
+    def _snippet(title: str, channel: str) -> dict:
+        return {"title": title, "channelTitle": channel,
+                "thumbnails": {"high": {"url": "https://i.ytimg.com/vi/x/hqdefault.jpg"}}}
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        self._network()
+        parts = urlsplit(uri)
+        endpoint = parts.path.rsplit("/", 1)[-1]
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+
+        if endpoint == "playlistItems":
+            start = int(query.get("pageToken", 0))
+            end = min(start + int(query.get("maxResults", 5)), self.playlist_length)
+            items = [{"snippet": {"title": f"Song {_word(str(i))}", "videoOwnerChannelTitle": f"Artist {i} - Topic"}}
+                     for i in range(start, end)]
+            body = {"items": items}
+            if end < self.playlist_length:
+                body["nextPageToken"] = str(end)
+            return httplib2.Response({"status": "200", "content-type": "application/json"}), json.dumps(body).encode()
+        if endpoint == "search":
+            limit = int(query.get("maxResults", 5))
+            items = []
+            for i in range(limit):
+                word = _word(f"{query.get('q')}{i}")
+                if query.get("type") == "channel":
+                    item_id = {"kind": "youtube#channel", "channelId": f"UC{word.ljust(22, '0')}"}
+                elif query.get("type") == "video":
+                    item_id = {"kind": "youtube#video", "videoId": word.ljust(11, "0")[:11]}
+                else:
+                    item_id = {"kind": "youtube#playlist", "playlistId": f"PL{word.ljust(32, '0')}"}
+                items.append({"id": item_id, "snippet": self._snippet(f"Result {word}", f"Channel {word}")})
+        else:
+            entity_id = query.get("id") or query.get("forHandle", "")
+            items = [{"id": entity_id, "snippet": self._snippet(f"{endpoint.title()} {_word(entity_id)}",
+                                                                f"Channel {_word(entity_id[::-1])}")}]
+
+        content = json.dumps({"items": items}).encode()
+        return httplib2.Response({"status": "200", "content-type": "application/json"}), content
+
+    def close(self):
+        pass
+
+
+def install_fakes(latency: float = 0.0, pool_size: int = 16):
+    """
+    Route every MusicServiceFactory backend to the fakes above.
+    """
+    MusicServiceFactory.shutdown()
+    MusicServiceFactory.configure_pool(SPOTIFY_BACKEND, pool_size, lambda: FakeSpotify(latency))
+    MusicServiceFactory.configure_pool(YTMUSIC_BACKEND, pool_size, lambda: FakeYTMusic(latency))
+    MusicServiceFactory.configure_pool(YOUTUBE_BACKEND, pool_size, lambda: FakeYoutubeHttp(latency))
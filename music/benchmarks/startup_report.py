@@ -0,0 +1,82 @@
+"""
+Where does bot startup time go?
+
+    python -m benchmarks.startup_report [--module main] [--top 15] [--runs 3]
+
+Imports `--module` in a fresh interpreter under `-X importtime` and summarises the output:
+total import time, self time per top-level package, the cost of each direct import and the
+slowest individual modules.
+The fastest of `--runs` runs is reported to reduce noise from a cold disk cache.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+MUSIC_DIR = Path(__file__).resolve().parent.parent
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def run_importtime(module: str) -> List[ImportRecord]:
+    env = dict(os.environ)
+    # main validates its configuration at import time
+    for var in ("TELE_API_KEY", "SPOTIPY_CLIENT_ID", "SPOTIPY_CLIENT_SECRET", "YOUTUBE_API_KEY"):
+        env.setdefault(var, "startup-report")
+    with tempfile.TemporaryDirectory() as tmp:
+        env["YT2SPOTIFY_CACHE_PATH"] = os.path.join(tmp, "cache.sqlite3")
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=MUSIC_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+
+    records = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(name.strip(), depth, int(self_us), int(cumulative_us)))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [run_importtime(args.module) for _ in range(args.runs)]
+    records = min(runs, key=lambda run: sum(record.self_us for record in run))
+    total_us = sum(record.self_us for record in records)
+    print(f"import {args.module}: {total_us / 1000:.1f} ms across {len(records)} modules\n")
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for record in records:
+        by_package[record.name.split(".")[0]] += record.self_us
+    print(f"{'package':<32} {'self ms':>9} {'share':>7}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<32} {self_us / 1000:9.1f} {self_us / total_us:7.1%}")
+
+    print(f"\n{'direct imports of ' + args.module:<48} {'cumulative ms':>14}")
+    direct = [record for record in records if record.depth == 1]
+    for record in sorted(direct, key=lambda record: -record.cumulative_us)[:args.top]:
+        print(f"{record.name:<48} {record.cumulative_us / 1000:14.1f}")
+
+    print(f"\n{'slowest modules':<48} {'self ms':>14}")
+    for record in sorted(records, key=lambda record: -record.self_us)[:args.top]:
+        print(f"{record.name:<48} {record.self_us / 1000:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
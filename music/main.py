@@ -5,12 +5,26 @@ from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, fil
 from dotenv import load_dotenv
 from pathlib import Path
 import os
+import asyncio
 from uuid import uuid4
 
+from message_links import convert_links, extract_links
+from update_processor import PerChatUpdateProcessor
+
 # Import yt2spotify components
-from yt2spotify.converter import Converter
-from yt2spotify.services.spotify import SpotifyService
-from yt2spotify.services.youtube_music import YoutubeMusicService
+from yt2spotify.cache import ConversionCache
+from yt2spotify.converter import AsyncConverter
+from yt2spotify.debounce import Debouncer, Superseded
+from yt2spotify.entities import EntityKey, is_playlist
+from yt2spotify.errors import NotFoundError
+from yt2spotify.isrc_index import IsrcIndex
+from yt2spotify.link_graph import LinkGraph
+from yt2spotify.negative_cache import NegativeCache
+from yt2spotify.prewarm import Prewarmer, TrafficLog, spotify_new_release_seeds, ytmusic_chart_seeds
+from yt2spotify.quota import QuotaBudget
+from yt2spotify.services.factory import MusicServiceFactory
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.singleflight import SingleFlight
 
 # Load environment variables
 dotenv_path = Path(__file__).parent / "api.env"
@@ -38,62 +52,178 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
-def convert_link(link: str):
+# Persistent conversion cache shared by all handlers
+cache_path = os.getenv("YT2SPOTIFY_CACHE_PATH", str(Path(__file__).parent / "conversion_cache.sqlite3"))
+conversion_cache = ConversionCache(cache_path)
+# Recordings already converted through another link are answered without a search
+isrc_index = IsrcIndex(cache_path)
+# Confirmed conversions in both directions, so bouncing a link between services needs no API call
+link_graph = LinkGraph(cache_path)
+# Dead links and links without a match, so posting them again costs no API calls
+negative_cache = NegativeCache(capacity=int(os.getenv("NEGATIVE_CACHE_CAPACITY", "1000000")))
+# YouTube Data API spend is tracked in the same file so the daily total survives restarts
+youtube_quota = QuotaBudget(cache_path, daily_limit=int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000")))
+MusicServiceFactory.configure_quota(youtube_quota)
+# Identical conversions already in flight are shared instead of repeated
+single_flight = SingleFlight()
+# Inline queries arrive on nearly every keystroke; only convert once the user pauses
+inline_debouncer = Debouncer(float(os.getenv("INLINE_DEBOUNCE_SECONDS", "0.3")))
+# Links from one message converted at the same time
+message_link_concurrency = int(os.getenv("MESSAGE_LINK_CONCURRENCY", "4"))
+# Playlist tracks converted at the same time, and how many finish between progress updates
+playlist_concurrency = int(os.getenv("PLAYLIST_CONCURRENCY", "8"))
+playlist_progress_every = int(os.getenv("PLAYLIST_PROGRESS_EVERY", "25"))
+# Candidates fetched per search: chat replies send the best one but rank a few, inline shows three.
+# Every cached conversion fetches the chat count, so it can answer either.
+chat_candidates = int(os.getenv("CHAT_CANDIDATES", "5"))
+inline_candidates = 3
+# Requests per source entity, so the most popular links can be converted ahead of time
+traffic_log = TrafficLog(cache_path)
+# Which service converts each supported link
+link_router = MusicServiceFactory.router()
+
+def target_service(source: EntityKey) -> ServiceNameEnum:
+    """The service a link is converted to: YouTube Music for Spotify links, Spotify otherwise."""
+    return ServiceNameEnum.YOUTUBE_MUSIC if source.service == ServiceNameEnum.SPOTIFY else ServiceNameEnum.SPOTIFY
+
+async def convert_link(link: str, limit: int = chat_candidates):
     """
-    Converts a link between Spotify and YouTube Music.
-    Returns the first search result (music item) or an error message.
+    Converts a Spotify link to YouTube Music, or a YouTube Music or YouTube link to Spotify.
+    Returns the search results (best match first, at most `limit`) or an error message.
     """
-    # Detect the source service
-    for cls in [SpotifyService, YoutubeMusicService]:
-        if cls.detect(link):
-            from_service = cls.name
-            break
-    else:
-        return "Unsupported link. Please provide a valid Spotify or YouTube Music link."
+    route = link_router.route(link)
+    if route is None:
+        return "Unsupported link. Please provide a valid Spotify, YouTube Music or YouTube link."
+    source = route.key
+    if is_playlist(source):
+        return "Playlists can only be converted by sending the link in a chat with the bot."
+    await asyncio.to_thread(traffic_log.record, source)
 
     try:
-        # Determine the target service
-        to_service = "youtube_music" if from_service == "spotify" else "spotify"
-
         # Perform the conversion
-        converter = Converter.by_names(from_service_name=from_service, to_service_name=to_service)
-        result = converter.convert(link)
+        result = await convert_to(link, target_service(source), limit)
 
         # Check if there are results
         if hasattr(result, 'results') and len(result.results) > 0:
-            return result.results[0]  # Return the first result
+            return result
         else:
             return "No results found for the given link."
 
+    except NotFoundError as e:
+        return f"{e}."
     except Exception as e:
         logger.error(f"Error during link conversion: {e}")
         return "An error occurred while converting the link. Please try again later."
 
+async def convert_to(link: str, to_service: ServiceNameEnum, limit: int = chat_candidates):
+    """Convert a supported link to `to_service` through the shared caches."""
+    converter = AsyncConverter.by_names(from_service_name=link_router.route(link).service, to_service_name=to_service,
+                                        cache=conversion_cache, single_flight=single_flight,
+                                        isrc_index=isrc_index, link_graph=link_graph, negative_cache=negative_cache,
+                                        fetch_limit=chat_candidates)
+    return await converter.convert(link, limit)
+
+def prewarm_seed_sources():
+    """Chart and new-release seeds, when PREWARM_CHARTS_COUNTRY is set ("ZZ" for global charts)."""
+    country = os.getenv("PREWARM_CHARTS_COUNTRY", "")
+    if not country:
+        return []
+    spotify_country = None if country == "ZZ" else country
+    return [
+        lambda: ytmusic_chart_seeds(MusicServiceFactory.create(ServiceNameEnum.YOUTUBE_MUSIC).ytm_client, country),
+        lambda: spotify_new_release_seeds(MusicServiceFactory.create(ServiceNameEnum.SPOTIFY).sp_client,
+                                          spotify_country),
+    ]
+
+# Popular links are converted in the background, slowly and only while no user conversion is running
+prewarm_interval = float(os.getenv("PREWARM_INTERVAL_SECONDS", "3600"))
+prewarmer = Prewarmer(convert_to, target_service, conversion_cache, traffic_log,
+                      seed_sources=prewarm_seed_sources(), top=int(os.getenv("PREWARM_TOP", "200")),
+                      rate=float(os.getenv("PREWARM_RATE", "0.5")), quota=youtube_quota,
+                      busy=lambda: single_flight.stats().in_flight > 0)
+
 # Command Handlers
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a welcome message when the /start command is issued."""
-    await update.message.reply_text("Welcome! Send me a Spotify or YouTube Music link, and I'll convert it for you.")
+    await update.message.reply_text(
+        "Welcome! Send me a Spotify, YouTube Music or YouTube link, and I'll convert it for you.")
+
+async def convert_playlist(update: Update, link: str):
+    """
+    Convert a playlist track by track, posting the converted links in batches and keeping one
+    progress message up to date.
+    """
+    route = link_router.route(link)
+    to_service = target_service(route.key)
+    from_service = route.service
+    if route.key.service == ServiceNameEnum.YOUTUBE_MUSIC:
+        # YouTube Music lists only the first max_playlist_tracks; this service pages the rest from the Data API
+        from_service = ServiceNameEnum.YOUTUBE_YTM
+    progress = await update.message.reply_text("Converting playlist...")
+    batch = []
+    done = 0
+    found = 0
+    try:
+        converter = AsyncConverter.by_names(from_service_name=from_service, to_service_name=to_service,
+                                            isrc_index=isrc_index)
+        async for result in converter.convert_playlist(link, playlist_concurrency, chat_candidates):
+            done += 1
+            if isinstance(result, Exception):
+                logger.error(f"Error during playlist track conversion: {result}")
+            elif result.results:
+                found += 1
+                batch.append(result.results[0].url)
+            if done % playlist_progress_every == 0:
+                if batch:
+                    await update.message.reply_text("\n".join(batch))
+                    batch = []
+                await progress.edit_text(f"Converting playlist... {done} tracks done")
+    except Exception as e:
+        logger.error(f"Error during playlist conversion: {e}")
+        await progress.edit_text("An error occurred while converting the playlist. Please try again later.")
+        return
+
+    if batch:
+        await update.message.reply_text("\n".join(batch))
+    await progress.edit_text(f"Converted {found} of {done} playlist tracks.")
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle regular chat messages."""
-    user_message = update.message.text
-    converted_link = convert_link(user_message)
+    """Handle regular chat messages: convert every link concurrently and answer in one reply."""
+    links = extract_links(update.message)
+    playlists = [link for link in links if (route := link_router.route(link)) and is_playlist(route.key)]
+    links = [link for link in links if link not in playlists]
+    for playlist in playlists:
+        await convert_playlist(update, playlist)
+    if not links:
+        return
+    # replies carry only the best match, which the link graph can answer without searching
+    converted_links = await convert_links(links, lambda link: convert_link(link, 1), message_link_concurrency)
 
-    if isinstance(converted_link, str):  # Error message
-        await update.message.reply_text(converted_link)
-    else:
-        await update.message.reply_text(converted_link.url)
+    lines = []
+    for link, converted_link in zip(links, converted_links):
+        if isinstance(converted_link, Exception):
+            logger.error(f"Error during link conversion: {converted_link}")
+            converted_link = "An error occurred while converting the link. Please try again later."
+        if isinstance(converted_link, str):  # Error message
+            # name the link when there are several, so the user knows which one failed
+            lines.append(converted_link if len(links) == 1 else f"{link}: {converted_link}")
+        else:
+            lines.append(converted_link.results[0].url)
+    await update.message.reply_text("\n".join(lines))
 
 # Inline Query Handler
 async def inline_convert(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle inline queries."""
-    query = update.inline_query.query
+    query = update.inline_query.query.strip()
     if not query:  # Empty query should not be handled
         return
+    if link_router.route(query) is None:  # Partial or unsupported link, not worth a conversion
+        return
 
     results = []
     try:
-        converted_music = convert_link(query)
+        user_id = update.inline_query.from_user.id
+        converted_music = await inline_debouncer.run(user_id, lambda: convert_link(query, inline_candidates))
 
         if isinstance(converted_music, str):  # Error message
             results.append(
@@ -105,17 +235,19 @@ async def inline_convert(update: Update, context: ContextTypes.DEFAULT_TYPE):
             )
         else:
             # Add multiple results if available (e.g., top 3 matches)
-            for item in getattr(converted_music, 'results', [])[:3]:  # Limit to top 3 results
+            for item in converted_music.results:
                 results.append(
                     InlineQueryResultArticle(
                         id=str(uuid4()),
                         title=item.description1,
                         description=f"{item.description2} - {item.description3}",
-                        thumbnail_url=item.art_url,
+                        thumbnail_url=item.thumbnail_url,
                         input_message_content=InputTextMessageContent(item.url),
                     )
                 )
 
+    except Superseded:
+        return  # A newer query from the same user replaced this one
     except Exception as e:
         logger.error(f"Error during inline query: {e}")
         results.append(
@@ -128,6 +260,50 @@ async def inline_convert(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await context.bot.answer_inline_query(update.inline_query.id, results)
 
+# Lifecycle hooks
+async def on_startup(application):
+    """Warm the backend clients in the background so update processing starts right away."""
+    application.create_task(
+        asyncio.to_thread(MusicServiceFactory.startup, ServiceNameEnum.SPOTIFY, ServiceNameEnum.YOUTUBE_MUSIC,
+                          ServiceNameEnum.YOUTUBE_YTM)
+    )
+    application.create_task(asyncio.to_thread(conversion_cache.purge_expired))
+    if prewarm_interval > 0:
+        application.bot_data["prewarm_task"] = asyncio.create_task(prewarmer.run(prewarm_interval))
+
+async def on_shutdown(application):
+    """Release the pooled backend clients and report cache effectiveness."""
+    prewarm_task = application.bot_data.pop("prewarm_task", None)
+    if prewarm_task is not None:
+        prewarm_task.cancel()
+        await asyncio.gather(prewarm_task, return_exceptions=True)
+    MusicServiceFactory.shutdown()
+    stats = conversion_cache.stats()
+    logger.info(f"Conversion cache: {stats.entries} entries, {stats.size_bytes} bytes, hit rate {stats.hit_rate:.1%}")
+    conversion_cache.close()
+    isrc_stats = isrc_index.stats()
+    logger.info(f"ISRC index: {isrc_stats.entries} recordings, hit rate {isrc_stats.hit_rate:.1%}")
+    isrc_index.close()
+    link_stats = link_graph.stats()
+    logger.info(f"Link graph: {link_stats.entries} links, hit rate {link_stats.hit_rate:.1%}")
+    link_graph.close()
+    negative = negative_cache.stats()
+    logger.info(f"Negative cache: {negative.entries} failures remembered, {negative.size_bytes} bytes, "
+                f"hit rate {negative.hit_rate:.1%}")
+    prewarm = prewarmer.stats()
+    logger.info(f"Pre-warming: {prewarm.warmed} links converted ahead of requests in {prewarm.runs} runs, "
+                f"{prewarm.cached} already cached, {prewarm.deferred} deferred for quota, {prewarm.errors} failed")
+    traffic_log.close()
+    flights = single_flight.stats()
+    logger.info(f"Single-flight: {flights.coalesced} of {flights.calls} conversions coalesced")
+    spotify_limit = MusicServiceFactory.spotify_rate_limit().stats()
+    logger.info(f"Spotify rate limit: {spotify_limit.throttled} of {spotify_limit.calls} calls waited "
+                f"{spotify_limit.wait_seconds:.1f}s in total (max {spotify_limit.max_wait_seconds:.2f}s), "
+                f"{spotify_limit.rate_limited} 429 responses")
+    quota = youtube_quota.stats()
+    logger.info(f"YouTube quota {quota.day}: {quota.spent} of {quota.daily_limit} units spent")
+    youtube_quota.close()
+
 # Global Error Handler
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Log errors caused by updates."""
@@ -136,7 +312,16 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # Main Function
 if __name__ == '__main__':
     # Build the application
-    application = ApplicationBuilder().token(tele_api_key).build()
+    # Conversions no longer block the loop, so let updates be handled concurrently (in order per chat)
+    max_concurrent_updates = int(os.getenv("MAX_CONCURRENT_UPDATES", "256"))
+    application = (
+        ApplicationBuilder()
+        .token(tele_api_key)
+        .concurrent_updates(PerChatUpdateProcessor(max_concurrent_updates))
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
 
     # Register handlers
     application.add_handler(CommandHandler("start", start))
@@ -146,5 +331,19 @@ if __name__ == '__main__':
     # Add global error handler
     application.add_error_handler(error_handler)
 
-    # Start polling
-    application.run_polling()
\ No newline at end of file
+    if os.getenv("BOT_MODE", "polling") == "webhook":
+        # Receive updates on a local HTTP server (put a TLS-terminating proxy in front of it)
+        webhook_url = os.getenv("WEBHOOK_URL")
+        if not webhook_url:
+            raise ValueError("Missing required environment variable: WEBHOOK_URL")
+        application.run_webhook(
+            listen=os.getenv("WEBHOOK_LISTEN", "127.0.0.1"),
+            port=int(os.getenv("WEBHOOK_PORT", "8443")),
+            url_path=os.getenv("WEBHOOK_PATH", ""),
+            webhook_url=webhook_url,
+            secret_token=os.getenv("WEBHOOK_SECRET_TOKEN"),
+            max_connections=int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40")),
+        )
+    else:
+        # Start polling
+        application.run_polling()
\ No newline at end of file
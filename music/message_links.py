@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+from telegram import Message, MessageEntity
+
+from yt2spotify.entities import parse_url
+
+
+def extract_links(message: Message) -> List[str]:
+    """
+    The links in a message, in order, from Telegram's URL and TEXT_LINK entities. Links to the
+    same entity are kept once. A message without link entities (e.g. a bare spotify: URI) is
+    treated as a single link.
+    """
+    entities = message.parse_entities([MessageEntity.URL, MessageEntity.TEXT_LINK])
+    links = [entity.url if entity.type == MessageEntity.TEXT_LINK else text for entity, text in entities.items()]
+    if not links and message.text:
+        links = [message.text.strip()]
+
+    unique = []
+    seen = set()
+    for link in links:
+        # unsupported links are kept as-is so they can be reported
+        key = parse_url(link) or link
+        if key not in seen:
+            seen.add(key)
+            unique.append(link)
+    return unique
+
+
+async def convert_links(links: List[str], convert: Callable[[str], Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    Run `convert` on every link with at most `limit` in flight, returning results in link order.
+    A failing link yields its exception instead of failing the others.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def one(link: str):
+        async with semaphore:
+            return await convert(link)
+
+    return await asyncio.gather(*(one(link) for link in links), return_exceptions=True)
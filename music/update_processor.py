@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes up to `max_concurrent_updates` updates at once while keeping the updates of any
+    single chat strictly in arrival order, so replies in one chat never overtake each other.
+    Updates without a chat (e.g. inline queries) run fully concurrently.
+
+    An update for a chat that is already busy is queued behind it and its concurrency slot given
+    back at once; the chat's running update works through the queue. Each chat thus holds at
+    most one slot, and a chat sending many updates cannot hold up the others.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        # chat id -> updates of that chat not yet finished, the running one first
+        self._chat_queues: Dict[int, Deque[Awaitable[Any]]] = {}
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            await coroutine
+            return
+
+        queue = self._chat_queues.get(chat.id)
+        if queue is not None:
+            queue.append(coroutine)
+            return
+
+        queue = self._chat_queues[chat.id] = deque([coroutine])
+        try:
+            while queue:
+                try:
+                    await queue[0]
+                except Exception:
+                    # the rest of the chat's updates still have to run
+                    logger.exception("Error processing an update of chat %s", chat.id)
+                queue.popleft()
+        finally:
+            del self._chat_queues[chat.id]
+            for pending in queue:
+                # cancelled: close the queued updates' coroutines so they are not left un-awaited
+                if asyncio.iscoroutine(pending):
+                    pending.close()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
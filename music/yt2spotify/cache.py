@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from yt2spotify.models import Results
+from yt2spotify.services.service_names import ServiceNameEnum
+
+DAY = 24 * 60 * 60
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ConversionCache:
+    """
+    Persistent SQLite (WAL mode) cache of conversion results, keyed on the source entity and
+    target service, so popular links survive restarts without costing any API calls.
+    """
+    default_ttls: Dict[str, int] = {
+        "song": 30 * DAY,
+        "album": 30 * DAY,
+        "artist": 7 * DAY,
+    }
+    default_ttl = 7 * DAY
+
+    def __init__(self, path: str, ttls: Optional[Dict[str, int]] = None, clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self.ttls = {**self.default_ttls, **(ttls or {})}
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS conversions ("
+            " source TEXT NOT NULL,"
+            " target TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (source, target))"
+        )
+
+    def get(self, source: str, target: ServiceNameEnum) -> Optional[Results]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM conversions WHERE source = ? AND target = ? AND expires_at > ?",
+                (source, target.value, self.clock()),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return Results.from_json(row[0])
+
+    def contains(self, source: str, target: ServiceNameEnum) -> bool:
+        """
+        Whether a live entry exists, without counting as a hit or miss.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM conversions WHERE source = ? AND target = ? AND expires_at > ?",
+                (source, target.value, self.clock()),
+            ).fetchone()
+        return row is not None
+
+    def set(self, source: str, target: ServiceNameEnum, kind: Optional[str], result: Results) -> None:
+        expires_at = self.clock() + self.ttls.get(kind, self.default_ttl)
+        payload = result.to_json()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO conversions (source, target, result, expires_at) VALUES (?, ?, ?, ?)",
+                (source, target.value, payload, expires_at),
+            )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM conversions WHERE expires_at <= ?", (self.clock(),)).rowcount
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM conversions").fetchone()[0]
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            return CacheStats(hits=self.hits, misses=self.misses, entries=entries, size_bytes=page_count * page_size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,20 +1,208 @@
-from yt2spotify.services.abstract_service import MusicService
+import asyncio
+from dataclasses import replace
+from typing import AsyncIterator, Optional, Union
+
+from yt2spotify.cache import ConversionCache
+from yt2spotify.entities import EntityKey, parse_url
+from yt2spotify.errors import NotFoundError
+from yt2spotify.isrc_index import IsrcIndex
+from yt2spotify.link_graph import LinkGraph, source_item
+from yt2spotify.matching import rank
+from yt2spotify.models import Results, SearchParams
+from yt2spotify.negative_cache import NO_RESULTS, NOT_FOUND, NegativeCache
+from yt2spotify.playlist import convert_tracks
+from yt2spotify.services.abstract_service import AsyncMusicService, MusicService
 from yt2spotify.services.factory import MusicServiceFactory
-from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.service_names import FormattedServiceNameEnum, ServiceNameEnum
+from yt2spotify.singleflight import SingleFlight
+
 
+class BaseConverter:
+    """
+    Conversions that are cached or shared between callers always fetch at least `fetch_limit`
+    candidates, so whichever caller's limit fetched them, they serve every limit up to it in full.
+    """
 
-class Converter:
-    def __init__(self, from_service: MusicService, to_service: MusicService):
+    def __init__(self, from_service, to_service, cache: Optional[ConversionCache] = None,
+                 isrc_index: Optional[IsrcIndex] = None, link_graph: Optional[LinkGraph] = None,
+                 negative_cache: Optional[NegativeCache] = None, fetch_limit: int = MusicService.default_limit):
         self.from_service = from_service
         self.to_service = to_service
+        self.cache = cache
+        self.isrc_index = isrc_index
+        self.link_graph = link_graph
+        self.negative_cache = negative_cache
+        self.fetch_limit = fetch_limit
+
+    def _fetch_limit(self, limit: int) -> int:
+        return max(limit, self.fetch_limit)
+
+    def _cached(self, source: Optional[EntityKey], limit: int) -> Optional[Results]:
+        if source is None:
+            return None
+        # stored conversions may hold fewer candidates than a limit above fetch_limit asks for
+        complete = limit <= self.fetch_limit
+        if self.cache is not None and complete:
+            cached = self.cache.get(str(source), self.to_service.name)
+            if cached is not None:
+                return cached
+        # the graph knows the one entity linked to the source, not a ranked list of candidates
+        if self.link_graph is not None and limit == 1:
+            linked = self.link_graph.get(source, self.to_service.name)
+            if linked is not None:
+                return linked
+        if self.negative_cache is not None:
+            # recent failures are repeated without calling the services again
+            failure = self.negative_cache.get(str(source), self.to_service.name)
+            if failure == NOT_FOUND:
+                raise NotFoundError(source.kind, FormattedServiceNameEnum[source.service.name])
+            if failure == NO_RESULTS:
+                return Results()
+        return None
+
+    def _not_found(self, source: Optional[EntityKey]):
+        if self.negative_cache is not None and source is not None:
+            self.negative_cache.add(NOT_FOUND, str(source), self.to_service.name)
+
+    def _remember(self, source: Optional[EntityKey], search_params: SearchParams, search_results: Results):
+        if source is None:
+            return
+        if not search_results.results:
+            if self.negative_cache is not None:
+                self.negative_cache.add(NO_RESULTS, str(source), self.to_service.name)
+            return
+        if self.cache is not None:
+            self.cache.set(str(source), self.to_service.name, source.kind, search_results)
+        target = parse_url(search_results.results[0].url)
+        if self.link_graph is not None and target is not None and search_results.confidence is not None:
+            self.link_graph.set(source, source_item(source, search_params), target, search_results.results[0],
+                                search_results.confidence,
+                                source_search_link=self.from_service.manual_search_link(search_params),
+                                target_search_link=search_results.manual_search_link)
+
+    @staticmethod
+    def _limited(search_results: Results, limit: int) -> Results:
+        # cached and coalesced results are fetched with at least fetch_limit
+        if len(search_results.results) <= limit:
+            return search_results
+        return replace(search_results, results=search_results.results[:limit])
+
+    def _indexed(self, search_params: SearchParams) -> Optional[Results]:
+        if self.isrc_index is None or not search_params.isrc:
+            return None
+        return self.isrc_index.get(search_params.isrc, self.to_service.name)
+
+    def _index(self, search_params: SearchParams, search_results: Results):
+        if self.isrc_index is None or not search_params.isrc or not search_results.results:
+            return
+        self.isrc_index.set(search_params.isrc, self.to_service.name, search_results)
+
+
+class Converter(BaseConverter):
+    def __init__(self, from_service: MusicService, to_service: MusicService,
+                 cache: Optional[ConversionCache] = None, isrc_index: Optional[IsrcIndex] = None,
+                 link_graph: Optional[LinkGraph] = None, negative_cache: Optional[NegativeCache] = None,
+                 fetch_limit: int = MusicService.default_limit):
+        super().__init__(from_service, to_service, cache=cache, isrc_index=isrc_index, link_graph=link_graph,
+                         negative_cache=negative_cache, fetch_limit=fetch_limit)
 
     @classmethod
-    def by_names(cls, from_service_name: ServiceNameEnum, to_service_name: ServiceNameEnum):
+    def by_names(cls, from_service_name: ServiceNameEnum, to_service_name: ServiceNameEnum,
+                 cache: Optional[ConversionCache] = None, isrc_index: Optional[IsrcIndex] = None,
+                 link_graph: Optional[LinkGraph] = None, negative_cache: Optional[NegativeCache] = None,
+                 fetch_limit: int = MusicService.default_limit):
         from_service = MusicServiceFactory.create(from_service_name)
         to_service = MusicServiceFactory.create(to_service_name)
-        return cls(from_service, to_service)
+        return cls(from_service, to_service, cache=cache, isrc_index=isrc_index, link_graph=link_graph,
+                   negative_cache=negative_cache, fetch_limit=fetch_limit)
+
+    def convert(self, url, limit: int = MusicService.default_limit):
+        """
+        Convert `url`, returning at most `limit` candidates, best first.
+        """
+        source = parse_url(url)
+        cached = self._cached(source, limit)
+        if cached is not None:
+            return self._limited(cached, limit)
 
-    def convert(self, url):
-        search_params = self.from_service.url_to_search_params(url)
-        search_results = self.to_service.search_with_params(search_params)
+        try:
+            search_params = self.from_service.url_to_search_params(url)
+        except NotFoundError:
+            self._not_found(source)
+            raise
+        search_results = self._indexed(search_params)
+        if search_results is None:
+            search_results = rank(search_params,
+                                  self.to_service.search_with_params(search_params, self._fetch_limit(limit)))
+            self._index(search_params, search_results)
+
+        self._remember(source, search_params, search_results)
+        return self._limited(search_results, limit)
+
+
+class AsyncConverter(BaseConverter):
+    def __init__(self, from_service: AsyncMusicService, to_service: AsyncMusicService,
+                 cache: Optional[ConversionCache] = None, single_flight: Optional[SingleFlight] = None,
+                 isrc_index: Optional[IsrcIndex] = None, link_graph: Optional[LinkGraph] = None,
+                 negative_cache: Optional[NegativeCache] = None, fetch_limit: int = MusicService.default_limit):
+        super().__init__(from_service, to_service, cache=cache, isrc_index=isrc_index, link_graph=link_graph,
+                         negative_cache=negative_cache, fetch_limit=fetch_limit)
+        self.single_flight = single_flight
+
+    @classmethod
+    def by_names(cls, from_service_name: ServiceNameEnum, to_service_name: ServiceNameEnum,
+                 cache: Optional[ConversionCache] = None, single_flight: Optional[SingleFlight] = None,
+                 isrc_index: Optional[IsrcIndex] = None, link_graph: Optional[LinkGraph] = None,
+                 negative_cache: Optional[NegativeCache] = None, fetch_limit: int = MusicService.default_limit):
+        from_service = MusicServiceFactory.create_async(from_service_name)
+        to_service = MusicServiceFactory.create_async(to_service_name)
+        return cls(from_service, to_service, cache=cache, single_flight=single_flight, isrc_index=isrc_index,
+                   link_graph=link_graph, negative_cache=negative_cache, fetch_limit=fetch_limit)
+
+    async def convert(self, url, limit: int = MusicService.default_limit):
+        """
+        Convert `url`, returning at most `limit` candidates, best first.
+        """
+        source = parse_url(url)
+        # the stores are SQLite-backed, so they are read and written off the event loop
+        cached = await asyncio.to_thread(self._cached, source, limit) if source is not None else None
+        if cached is not None:
+            return self._limited(cached, limit)
+
+        fetch_limit = self._fetch_limit(limit)
+        if self.single_flight is None or source is None:
+            return self._limited(await self._convert(url, source, fetch_limit), limit)
+        # callers fetching the same number of candidates share one conversion
+        search_results = await self.single_flight.do((source, self.to_service.name, fetch_limit),
+                                                     lambda: self._convert(url, source, fetch_limit))
+        return self._limited(search_results, limit)
+
+    async def _convert(self, url, source: Optional[EntityKey], limit: int):
+        try:
+            search_params = await self.from_service.url_to_search_params(url)
+        except NotFoundError:
+            await asyncio.to_thread(self._not_found, source)
+            raise
+        search_results = await self._search(search_params, limit)
+
+        await asyncio.to_thread(self._remember, source, search_params, search_results)
         return search_results
+
+    async def _search(self, search_params: SearchParams, limit: int = MusicService.default_limit) -> Results:
+        # tracks the index cannot hold skip the thread hops
+        indexable = self.isrc_index is not None and search_params.isrc
+        search_results = await asyncio.to_thread(self._indexed, search_params) if indexable else None
+        if search_results is None:
+            search_results = rank(search_params, await self.to_service.search_with_params(search_params, limit))
+            if indexable:
+                await asyncio.to_thread(self._index, search_params, search_results)
+        return search_results
+
+    def convert_playlist(self, url, concurrency: int = 8,
+                         limit: int = MusicService.default_limit) -> AsyncIterator[Union[Results, Exception]]:
+        """
+        Convert a playlist track by track, yielding each track's search results (or the exception
+        it failed with) in playlist order.
+        """
+        return convert_tracks(self.from_service.playlist_tracks(url),
+                              lambda search_params: self._search(search_params, limit), concurrency)
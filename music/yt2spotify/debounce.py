@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class Superseded(Exception):
+    """
+    Raised to a caller whose call was replaced by a newer one with the same key.
+    """
+
+
+class Debouncer:
+    """
+    Per-key debouncing for bursts such as inline queries sent on every keystroke: a call only
+    starts after `delay` seconds without a newer call for the same key, and a newer call
+    cancels the older one whether it is still waiting or already running.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.superseded = 0
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self._replaced: Set[asyncio.Task] = set()
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        previous = self._pending.get(key)
+        if previous is not None and not previous.done():
+            self._replaced.add(previous)
+            previous.cancel()
+            self.superseded += 1
+
+        task = asyncio.ensure_future(self._delayed(fn))
+        self._pending[key] = task
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task in self._replaced:
+                raise Superseded() from None
+            raise
+        finally:
+            self._replaced.discard(task)
+            if self._pending.get(key) is task:
+                del self._pending[key]
+
+    async def _delayed(self, fn: Callable[[], Awaitable[T]]) -> T:
+        await asyncio.sleep(self.delay)
+        return await fn()
@@ -0,0 +1,179 @@
+import re
+from typing import Callable, Dict, NamedTuple, Optional
+
+from yt2spotify.services.service_names import ServiceNameEnum
+
+# IDs have fixed lengths, so a half-pasted link is rejected instead of producing a bogus key
+_ID_PATTERN = re.compile(r"[-\w]+")
+_SPOTIFY_ID_PATTERN = re.compile(r"[0-9A-Za-z]{22}")
+_VIDEO_ID_PATTERN = re.compile(r"[-\w]{11}")
+_CHANNEL_ID_PATTERN = re.compile(r"UC[-\w]{22}")
+_HANDLE_PATTERN = re.compile(r"@[-\w.]{3,}")
+
+_SPOTIFY_KINDS = {"track": "song", "album": "album", "artist": "artist", "playlist": "playlist"}
+# YouTube serves albums as playlists too; theirs are the only list IDs with this prefix
+ALBUM_LIST_PREFIX = "OLAK5uy_"
+# YouTube Music's own album pages (/browse/<id>), which its search links to; YouTube has no such IDs
+ALBUM_BROWSE_PREFIX = "MPREb_"
+
+
+class EntityKey(NamedTuple):
+    """
+    Canonical identity of a music entity on one service, e.g. (spotify, song, 4cOdK2wGLETKBW3PvgPWqT).
+    Two links to the same entity always produce equal keys, whatever tracking junk they carry.
+    """
+    service: ServiceNameEnum
+    kind: str
+    id: str
+
+    def __str__(self):
+        return f"{self.service.value}:{self.kind}:{self.id}"
+
+    @classmethod
+    def from_str(cls, text: str) -> "EntityKey":
+        """
+        The key `str(key)` was made from.
+        """
+        service, kind, entity_id = text.split(":", 2)
+        return cls(ServiceNameEnum(service), kind, entity_id)
+
+
+def _query_param(query: str, name: str) -> Optional[str]:
+    prefix = f"{name}="
+    for pair in query.split("&"):
+        if pair.startswith(prefix):
+            return pair[len(prefix):]
+    return None
+
+
+def _valid(value: Optional[str], pattern: re.Pattern = _ID_PATTERN) -> Optional[str]:
+    if value and pattern.fullmatch(value):
+        return value
+    return None
+
+
+def _parse_spotify(path: str, query: str) -> Optional[EntityKey]:
+    segments = [segment for segment in path.split("/") if segment]
+    # localised links look like /intl-de/track/<id>
+    if segments and segments[0].startswith("intl-"):
+        segments = segments[1:]
+    if len(segments) < 2 or segments[0] not in _SPOTIFY_KINDS:
+        return None
+    entity_id = _valid(segments[1], _SPOTIFY_ID_PATTERN)
+    if entity_id is None:
+        return None
+    return EntityKey(ServiceNameEnum.SPOTIFY, _SPOTIFY_KINDS[segments[0]], entity_id)
+
+
+def _parse_youtube_paths(service: ServiceNameEnum, path: str, query: str) -> Optional[EntityKey]:
+    if path == "/watch":
+        video_id = _valid(_query_param(query, "v"), _VIDEO_ID_PATTERN)
+        return EntityKey(service, "song", video_id) if video_id else None
+    if path == "/playlist":
+        playlist_id = _valid(_query_param(query, "list"))
+        return EntityKey(service, "album", playlist_id) if playlist_id else None
+    if path.startswith("/channel/"):
+        channel_id = _valid(path[len("/channel/"):].split("/", 1)[0], _CHANNEL_ID_PATTERN)
+        return EntityKey(service, "artist", channel_id) if channel_id else None
+    if service == ServiceNameEnum.YOUTUBE_MUSIC and path.startswith(f"/browse/{ALBUM_BROWSE_PREFIX}"):
+        browse_id = _valid(path[len("/browse/"):].split("/", 1)[0])
+        return EntityKey(service, "album", browse_id) if browse_id else None
+    if service == ServiceNameEnum.YOUTUBE_STANDARD and path.startswith("/@"):
+        handle = _valid(path[1:].split("/", 1)[0], _HANDLE_PATTERN)
+        return EntityKey(service, "artist", handle) if handle else None
+    return None
+
+
+def _parse_youtube_music(path: str, query: str) -> Optional[EntityKey]:
+    return _parse_youtube_paths(ServiceNameEnum.YOUTUBE_MUSIC, path, query)
+
+
+def _parse_youtube(path: str, query: str) -> Optional[EntityKey]:
+    return _parse_youtube_paths(ServiceNameEnum.YOUTUBE_STANDARD, path, query)
+
+
+def _parse_youtube_short_link(path: str, query: str) -> Optional[EntityKey]:
+    video_id = _valid(path[1:].split("/", 1)[0], _VIDEO_ID_PATTERN)
+    return EntityKey(ServiceNameEnum.YOUTUBE_STANDARD, "song", video_id) if video_id else None
+
+
+_HOST_PARSERS: Dict[str, Callable[[str, str], Optional[EntityKey]]] = {
+    "open.spotify.com": _parse_spotify,
+    "play.spotify.com": _parse_spotify,
+    "music.youtube.com": _parse_youtube_music,
+    "youtube.com": _parse_youtube,
+    "www.youtube.com": _parse_youtube,
+    "m.youtube.com": _parse_youtube,
+    "youtu.be": _parse_youtube_short_link,
+}
+
+
+def parse_url(url: str) -> Optional[EntityKey]:
+    """
+    Parse any supported Spotify / YouTube Music / YouTube link (or spotify: URI) into its EntityKey
+    in a single pass. Returns None for anything that is not a link to a supported entity.
+    """
+    url = url.strip()
+    if url.startswith("spotify:"):
+        segments = url.split(":")
+        if len(segments) != 3 or segments[1] not in _SPOTIFY_KINDS:
+            return None
+        entity_id = _valid(segments[2], _SPOTIFY_ID_PATTERN)
+        return EntityKey(ServiceNameEnum.SPOTIFY, _SPOTIFY_KINDS[segments[1]], entity_id) if entity_id else None
+
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        rest = url
+    elif scheme.lower() not in ("https", "http"):
+        return None
+    rest = rest.partition("#")[0]
+    host, slash, path = rest.partition("/")
+    path, _, query = f"{slash}{path}".partition("?")
+    if "?" in host:
+        host, _, query = host.partition("?")
+    parser = _HOST_PARSERS.get(host.lower())
+    if parser is None:
+        return None
+    return parser(path, query)
+
+
+_ENTITY_URLS = {
+    ServiceNameEnum.SPOTIFY: {
+        "song": "https://open.spotify.com/track/{}",
+        "album": "https://open.spotify.com/album/{}",
+        "artist": "https://open.spotify.com/artist/{}",
+        "playlist": "https://open.spotify.com/playlist/{}",
+    },
+    ServiceNameEnum.YOUTUBE_MUSIC: {
+        "song": "https://music.youtube.com/watch?v={}",
+        "album": "https://music.youtube.com/playlist?list={}",
+        "artist": "https://music.youtube.com/channel/{}",
+    },
+    ServiceNameEnum.YOUTUBE_STANDARD: {
+        "song": "https://www.youtube.com/watch?v={}",
+        "album": "https://www.youtube.com/playlist?list={}",
+        "artist": "https://www.youtube.com/channel/{}",
+    },
+}
+
+
+def entity_url(key: EntityKey) -> str:
+    """
+    The canonical link for `key`; parse_url(entity_url(key)) == key.
+    """
+    if key.kind == "artist" and key.id.startswith("@"):
+        return f"https://www.youtube.com/{key.id}"
+    if key.kind == "album" and key.id.startswith(ALBUM_BROWSE_PREFIX):
+        return f"https://music.youtube.com/browse/{key.id}"
+    return _ENTITY_URLS[key.service][key.kind].format(key.id)
+
+
+def is_playlist(key: EntityKey) -> bool:
+    """
+    Whether `key` is a user playlist, to be converted track by track. YouTube list links are keyed
+    as albums, since that is how they convert as a single link, but only OLAK5uy_ lists really are.
+    """
+    if key.kind == "playlist":
+        return True
+    return (key.kind == "album" and key.service != ServiceNameEnum.SPOTIFY
+            and not key.id.startswith((ALBUM_LIST_PREFIX, ALBUM_BROWSE_PREFIX)))
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+from typing import Optional
+
+from yt2spotify.cache import CacheStats
+from yt2spotify.models import Results
+from yt2spotify.services.service_names import ServiceNameEnum
+
+
+class IsrcIndex:
+    """
+    Persistent SQLite (WAL mode) index from a recording's ISRC to its conversion on each target
+    service. Different links to the same recording (the single, the album track, a compilation)
+    share an ISRC, so only the first of them costs a search. Recordings do not change, so entries
+    never expire; for the same reason only matches of at least `min_confidence` are stored, since
+    a bad one would answer every link to the recording for good.
+    """
+
+    def __init__(self, path: str, min_confidence: float = 0.8):
+        self.path = str(path)
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS isrc_matches ("
+            " isrc TEXT NOT NULL,"
+            " target TEXT NOT NULL,"
+            " result TEXT NOT NULL,"
+            " PRIMARY KEY (isrc, target))"
+        )
+
+    def get(self, isrc: str, target: ServiceNameEnum) -> Optional[Results]:
+        with self._lock:
+            row = self._db.execute("SELECT result FROM isrc_matches WHERE isrc = ? AND target = ?",
+                                   (isrc.upper(), target.value)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return Results.from_json(row[0])
+
+    def set(self, isrc: str, target: ServiceNameEnum, result: Results) -> None:
+        """
+        Record `result` as the conversion of `isrc`, unless its best match is unconfident or unranked.
+        """
+        if result.confidence is None or result.confidence < self.min_confidence:
+            return
+        payload = result.to_json()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO isrc_matches (isrc, target, result) VALUES (?, ?, ?)",
+                             (isrc.upper(), target.value, payload))
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM isrc_matches").fetchone()[0]
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            return CacheStats(hits=self.hits, misses=self.misses, entries=entries, size_bytes=page_count * page_size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
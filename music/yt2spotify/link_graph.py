@@ -0,0 +1,178 @@
+import re
+import sqlite3
+import threading
+from dataclasses import replace
+from typing import Dict, Optional
+
+from yt2spotify.cache import CacheStats
+from yt2spotify.entities import ALBUM_BROWSE_PREFIX, EntityKey, entity_url
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.service_names import ServiceNameEnum
+
+_YTM_SEARCH = "https://music.youtube.com/search?q="
+_YOUTUBE_SEARCH = "https://www.youtube.com/results?search_query="
+_YOUTUBE_SEARCH_PATTERN = re.compile(r"https://(?:www\.)?youtube\.com/results\?search_query=")
+
+# conversions to YOUTUBE_YTM produce standard YouTube links
+_LINK_SERVICES = {ServiceNameEnum.YOUTUBE_YTM: ServiceNameEnum.YOUTUBE_STANDARD}
+# YouTube Music and YouTube share video, album list and channel IDs
+_TWIN_SERVICES = {
+    ServiceNameEnum.YOUTUBE_MUSIC: ServiceNameEnum.YOUTUBE_STANDARD,
+    ServiceNameEnum.YOUTUBE_STANDARD: ServiceNameEnum.YOUTUBE_MUSIC,
+}
+
+
+def _twin(key: EntityKey) -> Optional[EntityKey]:
+    service = _TWIN_SERVICES.get(key.service)
+    # @handles only exist on YouTube, album browse IDs only on YouTube Music
+    if service is None or key.id.startswith(("@", ALBUM_BROWSE_PREFIX)):
+        return None
+    return EntityKey(service, key.kind, key.id)
+
+
+def _twin_search_link(twin: EntityKey, search_link: str) -> str:
+    # the same search on the twin's service
+    if twin.service == ServiceNameEnum.YOUTUBE_STANDARD:
+        return search_link.replace(_YTM_SEARCH, _YOUTUBE_SEARCH)
+    return _YOUTUBE_SEARCH_PATTERN.sub(_YTM_SEARCH, search_link)
+
+
+def source_item(key: EntityKey, params: SearchParams) -> ResultItem:
+    """
+    A result describing the entity a conversion started from, for when it is the answer of the
+    reverse conversion. Filled the way the services fill their search results.
+    """
+    url = entity_url(key)
+    if key.kind == "album":
+        return ResultItem(url=url, uri=url, description1=params.album or "", description2=params.year or "",
+                          description3=params.artist, description4="Album")
+    if key.kind == "artist":
+        return ResultItem(url=url, uri=url, description1=params.artist or "", description4="Artist")
+    album = f"{params.album} ({params.year})" if params.album and params.year else params.album or ""
+    return ResultItem(url=url, uri=url, description1=params.name or "", description2=album,
+                      description3=params.artist, description4="Track", duration_ms=params.duration_ms)
+
+
+class LinkGraph:
+    """
+    Persistent SQLite (WAL mode) graph of confirmed conversions. Each mapping is recorded in both
+    directions and joined with everything already linked to either end, so after converting a
+    Spotify track to YouTube Music, converting the video back to Spotify, or on to YouTube, is a
+    local lookup. Each edge carries the matcher's confidence, multiplied along the path for links
+    inferred transitively; only mappings and lookups of at least `min_confidence` are used.
+    """
+
+    def __init__(self, path: str, min_confidence: float = 0.8):
+        self.path = str(path)
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS link_nodes ("
+            " key TEXT PRIMARY KEY,"
+            " item TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            " source TEXT NOT NULL,"
+            " target TEXT NOT NULL,"
+            " target_service TEXT NOT NULL,"
+            " confidence REAL NOT NULL,"
+            " PRIMARY KEY (source, target))"
+        )
+
+    def get(self, source: EntityKey, target: ServiceNameEnum) -> Optional[Results]:
+        """
+        The best-linked entity on `target` for `source`, as a single result with the manual search
+        link recorded for it. The graph holds no other candidates.
+        """
+        target = _LINK_SERVICES.get(target, target)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT link_nodes.item, links.confidence FROM links JOIN link_nodes ON link_nodes.key = links.target"
+                " WHERE links.source = ? AND links.target_service = ? AND links.confidence >= ?"
+                " ORDER BY links.confidence DESC LIMIT 1",
+                (str(source), target.value, self.min_confidence),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        node = Results.from_json(row[0])
+        return Results(results=node.results[:1], manual_search_link=node.manual_search_link, confidence=row[1])
+
+    def set(self, source: EntityKey, source_result: ResultItem, target: EntityKey, target_result: ResultItem,
+            confidence: float, source_search_link: str = "", target_search_link: str = "") -> None:
+        """
+        Record that `source` converts to `target` with the given confidence. The search links are
+        each entity's manual search link on its own service.
+        """
+        if confidence < self.min_confidence or source.service == target.service:
+            return
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                # search results describe an entity better than the source's own params do
+                sources = self._component(source, source_result, source_search_link, overwrite=False)
+                targets = self._component(target, target_result, target_search_link, overwrite=True)
+                for side in (sources, targets):
+                    for a, a_confidence in side.items():
+                        for b, b_confidence in side.items():
+                            self._link(a, b, a_confidence * b_confidence)
+                for a, a_confidence in sources.items():
+                    for b, b_confidence in targets.items():
+                        self._link(a, b, a_confidence * confidence * b_confidence)
+                        self._link(b, a, a_confidence * confidence * b_confidence)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _component(self, key: EntityKey, item: ResultItem, search_link: str,
+                   overwrite: bool) -> Dict[EntityKey, float]:
+        """
+        `key`, its YouTube twin and everything linked to either, with their confidence to `key`.
+        Stores the node for `key` and its twin.
+        """
+        members = {key: 1.0}
+        self._store(key, item, search_link, overwrite)
+        twin = _twin(key)
+        if twin is not None:
+            members[twin] = 1.0
+            twin_item = replace(item, url=entity_url(twin), uri=entity_url(twin))
+            self._store(twin, twin_item, _twin_search_link(twin, search_link), overwrite=False)
+        for member in list(members):
+            rows = self._db.execute("SELECT target, confidence FROM links WHERE source = ?", (str(member),))
+            for target, confidence in rows.fetchall():
+                linked = EntityKey.from_str(target)
+                members[linked] = max(members.get(linked, 0.0), confidence)
+        return members
+
+    def _store(self, key: EntityKey, item: ResultItem, search_link: str, overwrite: bool) -> None:
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        self._db.execute(f"{verb} INTO link_nodes (key, item) VALUES (?, ?)",
+                         (str(key), Results(results=[item], manual_search_link=search_link).to_json()))
+
+    def _link(self, source: EntityKey, target: EntityKey, confidence: float) -> None:
+        if source.service == target.service:
+            return
+        self._db.execute(
+            "INSERT INTO links (source, target, target_service, confidence) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (source, target) DO UPDATE SET confidence = max(confidence, excluded.confidence)",
+            (str(source), str(target), target.service.value, confidence),
+        )
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+            page_count = self._db.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._db.execute("PRAGMA page_size").fetchone()[0]
+            return CacheStats(hits=self.hits, misses=self.misses, entries=entries, size_bytes=page_count * page_size)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
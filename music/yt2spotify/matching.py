@@ -0,0 +1,156 @@
+import re
+import unicodedata
+from dataclasses import dataclass, replace
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from yt2spotify.models import ResultItem, Results, SearchParams
+
+# a candidate scoring at least this is taken without looking at the rest
+DEFAULT_THRESHOLD = 0.9
+# relative weight of each signal; signals missing on either side are left out
+WEIGHTS: Dict[str, float] = {
+    "title": 0.45,
+    "artist": 0.30,
+    "album": 0.10,
+    "year": 0.05,
+    "duration": 0.10,
+}
+# versions users almost never want unless the source is one too
+VERSION_MARKERS = ("live", "cover", "karaoke", "instrumental", "remix", "acoustic", "sped up", "slowed",
+                   "8d audio", "nightcore")
+VERSION_PENALTY = 0.5
+# any other bracketed qualifier the source lacks, e.g. "(Deluxe)" or "(Taylor's Version)"
+QUALIFIER_PENALTY = 0.9
+# durations further apart than this score zero
+DURATION_TOLERANCE_MS = 30_000
+
+_BRACKETED = re.compile(r"[(\[][^)\]]*[)\]]")
+_BRACKETED_CONTENT = re.compile(r"[(\[]([^)\]]*)[)\]]")
+_NOISE = re.compile(r"\b(official (music )?(video|audio)|lyrics?( video)?|visualizer|hd|4k|remaster(ed)?( \d{4})?)\b")
+_FEATURING = re.compile(r"\b(feat|ft|featuring)\b.*$")
+_NON_WORD = re.compile(r"[^\w\s]")
+_YEAR = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
+@dataclass
+class Match:
+    item: ResultItem
+    index: int
+    confidence: float
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    Lowercase, unaccented and stripped of decorations that differ between services:
+    bracketed suffixes, "feat." credits, "- Topic", "Official Video", "Remastered 2011"...
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.removesuffix(" - topic")
+    text = _BRACKETED.sub(" ", text)
+    text = _FEATURING.sub(" ", text)
+    text = text.replace(" - ", " ")
+    text = _NOISE.sub(" ", text)
+    text = _NON_WORD.sub(" ", text)
+    return " ".join(text.split())
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    a, b = normalize(a), normalize(b)
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    # token overlap forgives reordering ("Artist - Song" titles), the ratio small typos
+    a_tokens, b_tokens = set(a.split()), set(b.split())
+    overlap = len(a_tokens & b_tokens) / min(len(a_tokens), len(b_tokens))
+    return max(overlap * 0.95, SequenceMatcher(None, a, b).ratio())
+
+
+def _versions(text: Optional[str]) -> set:
+    text = (text or "").lower()
+    return {marker for marker in VERSION_MARKERS if re.search(rf"\b{marker}\b", text)}
+
+
+def _qualifiers(text: Optional[str]) -> set:
+    # normalize() drops noise such as "Official Video" and "feat." credits
+    return set(normalize(" ".join(_BRACKETED_CONTENT.findall(text or ""))).split())
+
+
+def _candidate_fields(params: SearchParams, item: ResultItem) -> Tuple[str, str, str, Optional[str]]:
+    """
+    (title, artist, album, year) of a candidate. Services fill the description fields differently
+    per kind, e.g. YouTube videos carry the channel in description2.
+    """
+    year_match = _YEAR.search(item.description2 or "")
+    year = year_match.group(0) if year_match else None
+    if params.search_type_hint == "album":
+        return item.description1, item.description3 or "", item.description1, year
+    if params.search_type_hint == "artist":
+        return "", item.description1, "", None
+    artist = item.description3 or item.description2 or ""
+    album = _YEAR.sub("", item.description2 or "").strip(" ()") if item.description3 else ""
+    return item.description1, artist, album, year
+
+
+def score(params: SearchParams, item: ResultItem) -> float:
+    """
+    Confidence in [0, 1] that `item` is the entity described by `params`.
+    """
+    title, artist, album, year = _candidate_fields(params, item)
+    signals: Dict[str, float] = {}
+    if params.search_type_hint == "album":
+        signals["title"] = similarity(params.album, title)
+    elif params.search_type_hint != "artist":
+        signals["title"] = similarity(params.name, title)
+    if params.artist and artist:
+        # video uploads often only name the artist in the title ("Artist - Song")
+        in_title = f" {normalize(params.artist)} " in f" {normalize(title)} "
+        signals["artist"] = 1.0 if in_title else similarity(params.artist, artist)
+    if params.album and album and params.search_type_hint == "song":
+        signals["album"] = similarity(params.album, album)
+    if params.year and year:
+        signals["year"] = 1.0 if params.year == year else 0.0
+    if params.duration_ms and item.duration_ms:
+        signals["duration"] = max(0.0, 1 - abs(params.duration_ms - item.duration_ms) / DURATION_TOLERANCE_MS)
+    if not signals:
+        return 0.0
+
+    confidence = sum(WEIGHTS[name] * value for name, value in signals.items()) / sum(WEIGHTS[name] for name in signals)
+    source_title = params.album if params.search_type_hint == "album" else params.name
+    if _versions(title) - _versions(source_title):
+        confidence *= VERSION_PENALTY
+    elif _qualifiers(title) - _qualifiers(source_title):
+        confidence *= QUALIFIER_PENALTY
+    return confidence
+
+
+def best_match(params: SearchParams, items: List[ResultItem],
+               threshold: float = DEFAULT_THRESHOLD) -> Optional[Match]:
+    """
+    The highest-scoring candidate, stopping at the first one that clears `threshold`.
+    """
+    best = None
+    for index, item in enumerate(items):
+        if not isinstance(item, ResultItem):
+            continue
+        confidence = score(params, item)
+        if best is None or confidence > best.confidence:
+            best = Match(item, index, confidence)
+            if confidence >= threshold:
+                break
+    return best
+
+
+def rank(params: SearchParams, result: Results, threshold: float = DEFAULT_THRESHOLD) -> Results:
+    """
+    Move the best match to the front of `result` and record its confidence.
+    """
+    match = best_match(params, result.results, threshold)
+    if match is None:
+        return result
+    results = [match.item] + result.results[:match.index] + result.results[match.index + 1:]
+    return replace(result, results=results, confidence=round(match.confidence, 3))
@@ -1,3 +1,5 @@
+import json
+from dataclasses import dataclass, field
 from pydantic import field_validator, BaseModel, Field, validator
 from typing import List, Optional, Union
 
@@ -5,6 +7,8 @@ from pydantic_core.core_schema import FieldValidationInfo
 
 from yt2spotify.services.service_names import ServiceNameEnum
 
+DEFAULT_ART_URL = "/static/images/musical-note.png"
+
 
 class ConvertRequest(BaseModel):
     url: str = Field(..., description="URL to convert")
@@ -23,6 +27,10 @@ class SearchParams(BaseModel):
     album: Optional[str] = Field(default=None)
     artist: Optional[str] = Field(default=None)
     search_type_hint: Optional[str] = Field(default=None)
+    # exact-match hints for songs, when the source knows them
+    isrc: Optional[str] = Field(default=None)
+    duration_ms: Optional[int] = Field(default=None)
+    year: Optional[str] = Field(default=None)
 
 
 class SearchResultItem(BaseModel):
@@ -32,7 +40,7 @@ class SearchResultItem(BaseModel):
     @field_validator("art_url")
     def validate_art_url(cls, art_url: str):
         if art_url is None or art_url == "":
-            art_url = "/static/images/musical-note.png"
+            art_url = DEFAULT_ART_URL
         return art_url
 
     art_url: str = Field(default=None)
@@ -40,6 +48,7 @@ class SearchResultItem(BaseModel):
     description2: Optional[str] = Field(default="")
     description3: Optional[str] = Field(default="")
     description4: Optional[str] = Field(default="")
+    duration_ms: Optional[int] = Field(default=None)
 
 
 class ArtistSearchResult(BaseModel):
@@ -53,3 +62,69 @@ class ArtistSearchResult(BaseModel):
 class SearchResult(BaseModel):
     results: List[Union[SearchResultItem, ArtistSearchResult]] = Field(default=[])
     manual_search_link: str = Field(...)
+    # how sure the matcher is that results[0] is the right entity, when it has ranked them
+    confidence: Optional[float] = Field(default=None)
+
+
+@dataclass(slots=True)
+class ResultItem:
+    """
+    What the services build while parsing a search response, and what conversion passes around.
+    Nothing is validated here; the pydantic SearchResultItem is built by to_model() when needed.
+    """
+    url: str
+    uri: str
+    description1: str
+    description2: Optional[str] = ""
+    description3: Optional[str] = ""
+    description4: Optional[str] = ""
+    art_url: Optional[str] = None
+    duration_ms: Optional[int] = None
+
+    @property
+    def thumbnail_url(self) -> str:
+        return self.art_url or DEFAULT_ART_URL
+
+    def to_model(self) -> SearchResultItem:
+        return SearchResultItem(url=self.url, uri=self.uri, description1=self.description1,
+                                description2=self.description2, description3=self.description3,
+                                description4=self.description4, art_url=self.thumbnail_url,
+                                duration_ms=self.duration_ms)
+
+
+@dataclass(slots=True)
+class Results:
+    """
+    Search results as they flow through conversion, the slotted counterpart of SearchResult.
+    """
+    results: List[ResultItem] = field(default_factory=list)
+    manual_search_link: str = ""
+    # how sure the matcher is that results[0] is the right entity, when it has ranked them
+    confidence: Optional[float] = None
+
+    def to_model(self) -> SearchResult:
+        return SearchResult(results=[item.to_model() for item in self.results],
+                            manual_search_link=self.manual_search_link, confidence=self.confidence)
+
+    def to_json(self) -> str:
+        """
+        The shape SearchResult.model_dump_json(exclude_none=True) writes, without building the models.
+        """
+        data = {
+            "results": [{name: getattr(item, name) for name in ResultItem.__slots__ if getattr(item, name) is not None}
+                        for item in self.results],
+            "manual_search_link": self.manual_search_link,
+        }
+        if self.confidence is not None:
+            data["confidence"] = self.confidence
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "Results":
+        """
+        Read what to_json() (or an older SearchResult.model_dump_json) wrote. The payload is our own,
+        so it is not validated again.
+        """
+        data = json.loads(payload)
+        return cls(results=[ResultItem(**item) for item in data["results"]],
+                   manual_search_link=data["manual_search_link"], confidence=data.get("confidence"))
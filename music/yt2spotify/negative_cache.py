@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from hashlib import blake2b
+from typing import Callable, Dict, Optional
+
+from yt2spotify.cache import DAY, CacheStats
+from yt2spotify.services.service_names import ServiceNameEnum
+
+HOUR = 60 * 60
+# the source link points at nothing (deleted song, album or artist)
+NOT_FOUND = "not_found"
+# the source exists but the target service had no match for it
+NO_RESULTS = "no_results"
+
+
+class BloomFilter:
+    """
+    Fixed-size set of strings that may report false positives (at about `error_rate` once
+    `capacity` keys are in) but never false negatives. A million keys at 0.1% take 1.8 MB.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        # double hashing: k positions from two independent 64-bit hashes
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class _Generations:
+    """
+    Two Bloom filters, swapped every ttl / 2, since a Bloom filter cannot forget single keys:
+    keys are added to the current one and looked up in both, so each lives between ttl / 2 and ttl.
+    """
+
+    def __init__(self, ttl: float, capacity: int, error_rate: float, now: float):
+        self.span = ttl / 2
+        self.capacity = capacity
+        # both filters are consulted, so each gets half the error budget
+        self.error_rate = error_rate / 2
+        self.current = BloomFilter(capacity, self.error_rate)
+        self.previous = BloomFilter(capacity, self.error_rate)
+        self.rotated_at = now
+
+    def rotate(self, now: float) -> None:
+        elapsed = now - self.rotated_at
+        if elapsed < self.span:
+            return
+        if elapsed >= 2 * self.span:
+            self.previous = BloomFilter(self.capacity, self.error_rate)
+        else:
+            self.previous = self.current
+        self.current = BloomFilter(self.capacity, self.error_rate)
+        self.rotated_at = now
+
+
+class NegativeCache:
+    """
+    Remembers conversions that failed, per error class and with that class's TTL, so a dead link
+    posted again is answered without calling any API. Keys are kept in rotating Bloom filters: a
+    fixed few MB for millions of keys, at the price of a link being wrongly treated as failed with
+    probability `error_rate` until its filter rotates out.
+    """
+    default_ttls: Dict[str, float] = {
+        NOT_FOUND: DAY,
+        # the target service may add the entity later
+        NO_RESULTS: 6 * HOUR,
+    }
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001, ttls: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ttls = {**self.default_ttls, **(ttls or {})}
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        now = clock()
+        self._generations = {error_class: _Generations(ttl, capacity, error_rate, now)
+                             for error_class, ttl in self.ttls.items()}
+
+    @staticmethod
+    def _key(source: str, target: ServiceNameEnum) -> str:
+        # per target even for dead links, so a wrong not found (or a false positive) blocks one direction
+        return f"{source}>{target.value}"
+
+    def add(self, error_class: str, source: str, target: ServiceNameEnum) -> None:
+        with self._lock:
+            generations = self._generations[error_class]
+            generations.rotate(self.clock())
+            generations.current.add(self._key(source, target))
+
+    def get(self, source: str, target: ServiceNameEnum) -> Optional[str]:
+        """
+        The error class converting `source` to `target` recently failed with, if any.
+        """
+        now = self.clock()
+        key = self._key(source, target)
+        with self._lock:
+            for error_class, generations in self._generations.items():
+                generations.rotate(now)
+                if key in generations.current or key in generations.previous:
+                    self.hits += 1
+                    return error_class
+            self.misses += 1
+            return None
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            entries = sum(g.current.count + g.previous.count for g in self._generations.values())
+            size = sum(g.current.size_bytes + g.previous.size_bytes for g in self._generations.values())
+            return CacheStats(hits=self.hits, misses=self.misses, entries=entries, size_bytes=size)
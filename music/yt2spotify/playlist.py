@@ -0,0 +1,35 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, TypeVar, Union
+
+from yt2spotify.models import SearchParams
+
+T = TypeVar("T")
+
+
+async def _settle(awaitable: Awaitable[T]) -> Union[T, Exception]:
+    try:
+        return await awaitable
+    except Exception as e:
+        return e
+
+
+async def convert_tracks(tracks: AsyncIterator[SearchParams], convert: Callable[[SearchParams], Awaitable[T]],
+                         concurrency: int) -> AsyncIterator[Union[T, Exception]]:
+    """
+    Yield `convert(params)` for every track, in playlist order, with at most `concurrency`
+    conversions in flight. Tracks are pulled from `tracks` only as slots free up, so memory stays
+    bounded whatever the playlist length. A failed track yields its exception.
+    """
+    pending: Deque[asyncio.Future] = deque()
+    try:
+        async for params in tracks:
+            pending.append(asyncio.ensure_future(_settle(convert(params))))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # the consumer stopped early
+        for future in pending:
+            future.cancel()
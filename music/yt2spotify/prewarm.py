@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, List, Optional, Sequence
+
+from yt2spotify.cache import ConversionCache
+from yt2spotify.entities import EntityKey, entity_url
+from yt2spotify.quota import quota_cost
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.youtube_standard import LOOKUP_METHOD, SEARCH_METHOD, resolves_through_ytm
+
+if TYPE_CHECKING:
+    from yt2spotify.quota import QuotaBudget
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficLog:
+    """
+    Per-day request counts for each source entity, in SQLite (WAL mode) next to the conversion
+    cache, so the pre-warmer knows which links are popular even right after a restart. Days older
+    than `window_days` are dropped.
+    """
+
+    def __init__(self, path: str, window_days: int = 7, clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self.window_days = window_days
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS traffic ("
+            " source TEXT NOT NULL,"
+            " day TEXT NOT NULL,"
+            " hits INTEGER NOT NULL,"
+            " PRIMARY KEY (source, day))"
+        )
+
+    def _day(self, days_ago: int = 0) -> str:
+        return (datetime.fromtimestamp(self.clock(), timezone.utc).date() - timedelta(days=days_ago)).isoformat()
+
+    def record(self, source: EntityKey) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO traffic (source, day, hits) VALUES (?, ?, 1) "
+                "ON CONFLICT (source, day) DO UPDATE SET hits = hits + 1",
+                (str(source), self._day()),
+            )
+
+    def top(self, limit: int) -> List[EntityKey]:
+        """
+        The `limit` most requested entities within the window, most requested first.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT source FROM traffic WHERE day > ? GROUP BY source ORDER BY SUM(hits) DESC LIMIT ?",
+                (self._day(self.window_days), limit),
+            ).fetchall()
+        return [EntityKey.from_str(row[0]) for row in rows]
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM traffic WHERE day <= ?", (self._day(self.window_days),)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def ytmusic_chart_seeds(ytm_client, country: str = "ZZ") -> List[EntityKey]:
+    """
+    Songs, videos, trending videos and artists on the YouTube Music charts for `country`
+    ("ZZ" is global).
+    """
+    charts = ytm_client.get_charts(country)
+    keys = []
+    for section in ("songs", "videos", "trending"):
+        for item in (charts.get(section) or {}).get("items", []):
+            if item.get("videoId"):
+                keys.append(EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, "song", item["videoId"]))
+    for item in (charts.get("artists") or {}).get("items", []):
+        if item.get("browseId"):
+            keys.append(EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, "artist", item["browseId"]))
+    return keys
+
+
+def spotify_new_release_seeds(sp_client, country: Optional[str] = None, limit: int = 50) -> List[EntityKey]:
+    """
+    Albums on Spotify's new releases page for `country` (every market when None).
+    """
+    page = sp_client.new_releases(country=country, limit=limit)
+    return [EntityKey(ServiceNameEnum.SPOTIFY, "album", album["id"]) for album in page["albums"]["items"]]
+
+
+@dataclass
+class PrewarmStats:
+    runs: int = 0
+    # conversions made ahead of any request
+    warmed: int = 0
+    # seeds already in the cache
+    cached: int = 0
+    # seeds left for a later run because they would eat into the YouTube quota
+    deferred: int = 0
+    errors: int = 0
+
+
+class Prewarmer:
+    """
+    Converts popular links before anyone asks for them: the most requested entities in the
+    `traffic` log, then whatever `seed_sources` return (e.g. charts and new releases). Each seed is
+    converted to `target_for(key)` through `convert(url, target)` unless the cache already has it.
+
+    Pre-warming yields to users: conversions run one at a time, at most `rate` per second, and
+    wait while `busy()` reports user conversions in flight; backend calls still go through the
+    shared rate limiters. Seeds touching the YouTube Data API are deferred unless the `quota`
+    budget has `quota_headroom` units to spare beyond its own reserve.
+    """
+
+    def __init__(self, convert: Callable[[str, ServiceNameEnum], Awaitable[Any]],
+                 target_for: Callable[[EntityKey], ServiceNameEnum], cache: ConversionCache, traffic: TrafficLog,
+                 seed_sources: Sequence[Callable[[], Iterable[EntityKey]]] = (), top: int = 200, rate: float = 0.5,
+                 quota: Optional["QuotaBudget"] = None, quota_headroom: int = 2000,
+                 busy: Optional[Callable[[], bool]] = None, idle_poll: float = 1.0):
+        self.convert = convert
+        self.target_for = target_for
+        self.cache = cache
+        self.traffic = traffic
+        self.seed_sources = seed_sources
+        self.top = top
+        self.rate = rate
+        self.quota = quota
+        self.quota_headroom = quota_headroom
+        self.busy = busy
+        self.idle_poll = idle_poll
+        self._stats = PrewarmStats()
+
+    async def seeds(self) -> List[EntityKey]:
+        """
+        Every seed, most requested first, each once.
+        """
+        await asyncio.to_thread(self.traffic.purge_expired)
+        keys = await asyncio.to_thread(self.traffic.top, self.top)
+        for source in self.seed_sources:
+            try:
+                keys.extend(await asyncio.to_thread(lambda: list(source())))
+            except Exception as e:
+                logger.warning(f"Pre-warm seed source failed: {e}")
+        return list(dict.fromkeys(keys))
+
+    def _affordable(self, key: EntityKey, target: ServiceNameEnum) -> bool:
+        if self.quota is None:
+            return True
+        cost = 0
+        if key.service == ServiceNameEnum.YOUTUBE_STANDARD and not resolves_through_ytm(key):
+            cost += quota_cost(LOOKUP_METHOD)
+        if target == ServiceNameEnum.YOUTUBE_STANDARD:
+            cost += quota_cost(SEARCH_METHOD)
+        return cost == 0 or self.quota.can_spend(cost + self.quota_headroom)
+
+    async def run_once(self) -> None:
+        self._stats.runs += 1
+        for key in await self.seeds():
+            target = self.target_for(key)
+            if await asyncio.to_thread(self.cache.contains, str(key), target):
+                self._stats.cached += 1
+                continue
+            if not await asyncio.to_thread(self._affordable, key, target):
+                self._stats.deferred += 1
+                continue
+            while self.busy is not None and self.busy():
+                await asyncio.sleep(self.idle_poll)
+            try:
+                await self.convert(entity_url(key), target)
+                self._stats.warmed += 1
+            except Exception as e:
+                self._stats.errors += 1
+                logger.debug(f"Pre-warming {key} failed: {e}")
+            # an asyncio sleep, so pacing holds no executor thread that user conversions need
+            await asyncio.sleep(1 / self.rate)
+
+    async def run(self, interval: float) -> None:
+        """
+        Pre-warm now and then every `interval` seconds, until cancelled.
+        """
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pre-warm run failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> PrewarmStats:
+        return replace(self._stats)
@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+# YouTube Data API units per call (https://developers.google.com/youtube/v3/determine_quota_cost);
+# every other read costs 1
+QUOTA_COSTS = {
+    "youtube.search.list": 100,
+}
+DEFAULT_COST = 1
+# the daily quota resets at midnight Pacific time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+
+def quota_cost(method_id: str) -> int:
+    return QUOTA_COSTS.get(method_id, DEFAULT_COST)
+
+
+@dataclass
+class QuotaStats:
+    day: str
+    spent: int
+    remaining: int
+    daily_limit: int
+
+
+class QuotaBudget:
+    """
+    Running total of YouTube Data API units spent today, persisted in SQLite so it survives
+    restarts and is shared by every process using the same file.
+
+    `can_spend` keeps `reserve` units back, so callers can switch to quota-free paths before
+    the API starts rejecting requests.
+    """
+
+    def __init__(self, path: str = ":memory:", daily_limit: int = 10_000, reserve: int = 500,
+                 clock: Callable[[], float] = time.time):
+        self.path = str(path)
+        self.daily_limit = daily_limit
+        self.reserve = reserve
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS youtube_quota (day TEXT PRIMARY KEY, units INTEGER NOT NULL)")
+
+    def _today(self) -> str:
+        return datetime.fromtimestamp(self.clock(), QUOTA_TIMEZONE).date().isoformat()
+
+    def record(self, method_id: str) -> int:
+        """
+        Account for one call to `method_id` (e.g. "youtube.search.list") and return its cost.
+        """
+        cost = quota_cost(method_id)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO youtube_quota (day, units) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET units = units + excluded.units",
+                (self._today(), cost),
+            )
+        return cost
+
+    def spent(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT units FROM youtube_quota WHERE day = ?", (self._today(),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self) -> int:
+        return max(self.daily_limit - self.spent(), 0)
+
+    def can_spend(self, cost: int) -> bool:
+        return self.remaining() - cost >= self.reserve
+
+    def can_call(self, method_id: str) -> bool:
+        return self.can_spend(quota_cost(method_id))
+
+    def stats(self) -> QuotaStats:
+        spent = self.spent()
+        return QuotaStats(day=self._today(), spent=spent, remaining=max(self.daily_limit - spent, 0),
+                          daily_limit=self.daily_limit)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
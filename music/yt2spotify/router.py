@@ -0,0 +1,39 @@
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Type
+
+from yt2spotify.entities import EntityKey, parse_url
+from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.services.service_names import ServiceNameEnum
+
+
+class Route(NamedTuple):
+    key: EntityKey
+    # the service to convert the link from
+    service: ServiceNameEnum
+
+
+class LinkRouter:
+    """
+    Finds the service that converts a link. The link is parsed once, by parse_url's host table,
+    and its (namespace, kind) looked up in a table filled from the services' `reads`; when several
+    services read the same entities, the one registered first gets them.
+    """
+
+    def __init__(self, services: Iterable[Type[MusicService]] = ()):
+        self._table: Dict[Tuple[ServiceNameEnum, str], ServiceNameEnum] = {}
+        for service in services:
+            self.register(service)
+
+    def register(self, service: Type[MusicService]) -> None:
+        for namespace, kinds in service.reads.items():
+            for kind in kinds:
+                self._table.setdefault((namespace, kind), service.name)
+
+    def route(self, url: str) -> Optional[Route]:
+        """
+        The route for `url`, or None when it is not a link any registered service reads.
+        """
+        key = parse_url(url)
+        if key is None:
+            return None
+        service = self._table.get((key.service, key.kind))
+        return Route(key, service) if service is not None else None
@@ -1,13 +1,73 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterator, Tuple
 
-from yt2spotify.models import SearchParams, SearchResult
+from yt2spotify.entities import parse_url
+from yt2spotify.models import Results, SearchParams
+from yt2spotify.services.service_names import ServiceNameEnum
+
+
+def search_query(params: SearchParams) -> str:
+    """
+    The free text the services search for `params` with.
+    """
+    if params.search_type_hint == "album":
+        return f"{params.album} {params.artist}"
+    if params.search_type_hint == "artist":
+        return f"{params.artist}"
+    return f"{params.name} {params.artist}"
 
 
 class MusicService(ABC):
+    # entity kinds of each link namespace (EntityKey.service) the service can convert from;
+    # LinkRouter dispatches links with it
+    reads: Dict[ServiceNameEnum, Tuple[str, ...]] = {}
+
+    @classmethod
+    def detect(cls, url: str) -> bool:
+        key = parse_url(url)
+        return key is not None and key.kind in cls.reads.get(key.service, ())
+
     @abstractmethod
     def url_to_search_params(self, url: str) -> SearchParams:
         pass
 
+    # candidates a search returns unless the caller asks for fewer
+    default_limit = 10
+
+    @abstractmethod
+    def search_with_params(self, params: SearchParams, limit: int = default_limit) -> Results:
+        """
+        Search for `params`, returning at most `limit` candidates; backends are asked for no more.
+        """
+        pass
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        """
+        A link to the service's own search for `params`, for users to look further themselves.
+        """
+        return ""
+
+    def playlist_tracks(self, url: str) -> Iterator[SearchParams]:
+        """
+        Search params for each track of a playlist, fetched page by page as the iterator is consumed.
+        """
+        raise NotImplementedError(f"{self.name} does not support playlists")
+
+
+class AsyncMusicService(ABC):
+    """
+    Non-blocking counterpart of MusicService for use inside an event loop.
+    """
+    @abstractmethod
+    async def url_to_search_params(self, url: str) -> SearchParams:
+        pass
+
     @abstractmethod
-    def search_with_params(self, params: SearchParams) -> SearchResult:
+    async def search_with_params(self, params: SearchParams, limit: int = MusicService.default_limit) -> Results:
         pass
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        return ""
+
+    def playlist_tracks(self, url: str) -> AsyncIterator[SearchParams]:
+        raise NotImplementedError(f"{self.name} does not support playlists")
@@ -0,0 +1,111 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def close_client(client) -> None:
+    """
+    Best-effort release of the HTTP connections held by a backend client.
+    """
+    close = getattr(client, "close", None)
+    if callable(close):
+        close()
+        return
+    session = getattr(client, "_session", None)
+    if session is not None:
+        session.close()
+
+
+class ClientPool(Generic[T]):
+    """
+    Thread-safe pool of long-lived backend clients. Clients are created lazily up to `size`;
+    callers block in `checkout` until one is returned when the pool is exhausted.
+    """
+
+    def __init__(self, factory: Callable[[], T], size: int, close: Callable[[T], None] = close_client):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.factory = factory
+        self.size = size
+        self._close = close
+        self._idle: Deque[T] = deque()
+        self._created = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    def checkout(self, timeout: Optional[float] = None) -> T:
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                if self._closed:
+                    raise RuntimeError("Client pool is closed")
+                if not self._available.wait(timeout):
+                    raise TimeoutError("Timed out waiting for a pooled client")
+            if self._closed:
+                raise RuntimeError("Client pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self.factory()
+        except BaseException:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def checkin(self, client: T) -> None:
+        with self._available:
+            if not self._closed:
+                self._idle.append(client)
+                self._available.notify()
+                return
+        self._close(client)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        client = self.checkout(timeout)
+        try:
+            yield client
+        finally:
+            self.checkin(client)
+
+    def warm(self, count: int = 1) -> None:
+        """
+        Create up to `count` clients ahead of the first request.
+        """
+        clients = []
+        with self._available:
+            missing = min(count, self.size) - self._created
+        for _ in range(max(missing, 0)):
+            clients.append(self.checkout())
+        for client in clients:
+            self.checkin(client)
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+        for client in idle:
+            self._close(client)
+
+
+class PooledClient:
+    """
+    Stands in for a single backend client: every method call borrows a client from the pool
+    for the duration of that call only, so one service object can be shared across threads.
+    """
+
+    def __init__(self, pool: ClientPool):
+        self._pool = pool
+
+    def __getattr__(self, name: str):
+        def call(*args, **kwargs):
+            with self._pool.lease() as client:
+                return getattr(client, name)(*args, **kwargs)
+
+        return call
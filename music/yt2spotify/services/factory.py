@@ -1,36 +1,239 @@
 import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional
 
-import spotipy
-from spotipy import SpotifyClientCredentials
-
-from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.services.abstract_service import AsyncMusicService, MusicService
+from yt2spotify.services.client_pool import ClientPool, PooledClient
 from yt2spotify.services.service_names import ServiceNameEnum
-from yt2spotify.services.spotify import SpotifyService
-from yt2spotify.services.youtube_standard import YoutubeService
-from yt2spotify.services.youtube_music import YoutubeMusicService
+from yt2spotify.services.threaded import ThreadedMusicService
+
+if TYPE_CHECKING:
+    from yt2spotify.quota import QuotaBudget
+    from yt2spotify.router import LinkRouter
+    from yt2spotify.services.rate_limit import TokenBucket
+    from yt2spotify.services.spotify_batch import SpotifyMetadataBatcher
+    from yt2spotify.services.spotify_token import SharedTokenCredentials
+
+SPOTIFY_BACKEND = "spotify"
+YTMUSIC_BACKEND = "ytmusic"
+YOUTUBE_BACKEND = "youtube"
+
+# backends each service draws clients from
+SERVICE_BACKENDS = {
+    ServiceNameEnum.SPOTIFY: (SPOTIFY_BACKEND,),
+    ServiceNameEnum.YOUTUBE_MUSIC: (YTMUSIC_BACKEND,),
+    ServiceNameEnum.YOUTUBE_STANDARD: (YOUTUBE_BACKEND, YTMUSIC_BACKEND),
+    ServiceNameEnum.YOUTUBE_YTM: (YTMUSIC_BACKEND, YOUTUBE_BACKEND),
+}
+
+
+# Backend libraries (spotipy, ytmusicapi, googleapiclient) and the service modules are imported on
+# first use of each backend / ServiceNameEnum rather than at import time, to keep bot startup fast.
+
+def _spotify_client_factory(credentials: "SharedTokenCredentials", bucket: "TokenBucket") -> Callable:
+    import spotipy
+    from yt2spotify.services.rate_limit import RateLimitedSpotify, without_retry_after
+
+    # 429s are left to RateLimitedSpotify, which backs off every pooled client at once
+    return lambda: RateLimitedSpotify(without_retry_after(
+        spotipy.Spotify(auth_manager=credentials, status_forcelist=(500, 502, 503, 504))), bucket)
+
+
+def _ytmusic_client_factory() -> Callable:
+    from ytmusicapi import YTMusic
+    return YTMusic
 
-import googleapiclient.discovery
 
-from yt2spotify.services.youtube_ytm import YoutubeYTMService
+def _youtube_http_factory() -> Callable:
+    from googleapiclient.http import build_http
+    return build_http
 
 
 class MusicServiceFactory:
+    """
+    Builds services on top of process-wide, pooled backend clients, so creating a service per
+    request costs no token fetches, client setup or discovery document parsing.
+    """
+    default_pool_size = int(os.environ.get("YT2SPOTIFY_POOL_SIZE", "8"))
+
+    _pool_sizes: Dict[str, int] = {}
+    _client_factories: Dict[str, Callable] = {}
+    _pools: Dict[str, ClientPool] = {}
+    _youtube_client = None
+    _spotify_batcher: Optional["SpotifyMetadataBatcher"] = None
+    _quota: Optional["QuotaBudget"] = None
+    _spotify_bucket: Optional["TokenBucket"] = None
+    _spotify_credentials: Optional["SharedTokenCredentials"] = None
+    _router: Optional["LinkRouter"] = None
+    _lock = threading.RLock()
+
+    @classmethod
+    def configure_pool(cls, backend: str, size: Optional[int] = None, client_factory: Optional[Callable] = None):
+        """
+        Set the pool size and/or client constructor for a backend. Takes effect the next time
+        the pool is created, i.e. before startup() or after shutdown().
+        """
+        with cls._lock:
+            if size is not None:
+                cls._pool_sizes[backend] = size
+            if client_factory is not None:
+                cls._client_factories[backend] = client_factory
+
+    @classmethod
+    def configure_quota(cls, budget: "QuotaBudget"):
+        """
+        Account YouTube Data API calls against `budget`. Takes effect for clients built afterwards.
+        """
+        with cls._lock:
+            cls._quota = budget
+            cls._youtube_client = None
+
+    @classmethod
+    def quota(cls) -> "QuotaBudget":
+        with cls._lock:
+            if cls._quota is None:
+                from yt2spotify.quota import QuotaBudget
+                cls._quota = QuotaBudget(os.environ.get("YOUTUBE_QUOTA_PATH", ":memory:"),
+                                         daily_limit=int(os.environ.get("YOUTUBE_DAILY_QUOTA", "10000")))
+            return cls._quota
+
+    @classmethod
+    def spotify_rate_limit(cls) -> "TokenBucket":
+        """
+        The token bucket shared by all Spotify API calls in this process.
+        """
+        with cls._lock:
+            if cls._spotify_bucket is None:
+                from yt2spotify.services.rate_limit import TokenBucket
+                cls._spotify_bucket = TokenBucket(float(os.environ.get("SPOTIFY_RATE_LIMIT", "10")),
+                                                  float(os.environ.get("SPOTIFY_RATE_BURST", "20")))
+            return cls._spotify_bucket
+
+    @classmethod
+    def spotify_credentials(cls) -> "SharedTokenCredentials":
+        """
+        The client-credentials token shared by all Spotify clients, and by every process on the
+        host using the same SPOTIFY_TOKEN_CACHE_PATH. Credentials come from environment variables.
+        """
+        with cls._lock:
+            if cls._spotify_credentials is None:
+                from yt2spotify.services.spotify_token import SharedTokenCredentials
+                cls._spotify_credentials = SharedTokenCredentials(path=os.environ.get("SPOTIFY_TOKEN_CACHE_PATH"))
+            return cls._spotify_credentials
+
+    @classmethod
+    def _default_client_factory(cls, backend: str) -> Callable:
+        if backend == SPOTIFY_BACKEND:
+            return _spotify_client_factory(cls.spotify_credentials(), cls.spotify_rate_limit())
+        elif backend == YTMUSIC_BACKEND:
+            return _ytmusic_client_factory()
+        elif backend == YOUTUBE_BACKEND:
+            return _youtube_http_factory()
+        raise ValueError(f"Unknown backend: {backend}")
+
+    @classmethod
+    def pool(cls, backend: str) -> ClientPool:
+        with cls._lock:
+            if backend not in cls._pools:
+                factory = cls._client_factories.get(backend) or cls._default_client_factory(backend)
+                size = cls._pool_sizes.get(backend, cls.default_pool_size)
+                cls._pools[backend] = ClientPool(factory, size)
+            return cls._pools[backend]
+
+    @classmethod
+    def spotify_batcher(cls) -> "SpotifyMetadataBatcher":
+        """
+        Spotify client shared by all SpotifyService instances, so concurrent conversions' metadata
+        lookups are coalesced into bulk requests.
+        """
+        with cls._lock:
+            if cls._spotify_batcher is None:
+                from yt2spotify.services.spotify_batch import SpotifyMetadataBatcher
+                window = float(os.environ.get("SPOTIFY_BATCH_WINDOW_MS", "5")) / 1000
+                cls._spotify_batcher = SpotifyMetadataBatcher(PooledClient(cls.pool(SPOTIFY_BACKEND)), window)
+            return cls._spotify_batcher
+
+    @classmethod
+    def _yt_client(cls):
+        with cls._lock:
+            if cls._youtube_client is None:
+                from yt2spotify.services.youtube_client import build_youtube_client
+                api_key = os.environ.get("YOUTUBE_API_KEY")
+                cls._youtube_client = build_youtube_client(api_key, cls.pool(YOUTUBE_BACKEND), cls.quota())
+            return cls._youtube_client
+
+    @classmethod
+    def startup(cls, *names: ServiceNameEnum):
+        """
+        Create one client per backend used by `names` (all services if none are given),
+        so the first conversion does not pay for client setup or the Spotify token fetch, and
+        keep the Spotify token refreshed in the background from then on.
+        """
+        for name in names or tuple(ServiceNameEnum):
+            for backend in SERVICE_BACKENDS[name]:
+                cls.pool(backend).warm()
+                if backend == YOUTUBE_BACKEND:
+                    cls._yt_client()
+                elif backend == SPOTIFY_BACKEND:
+                    with cls.pool(backend).lease() as client:
+                        auth_manager = getattr(client, "auth_manager", None)
+                        if auth_manager is not None:
+                            auth_manager.get_access_token(as_dict=False)
+                            if hasattr(auth_manager, "start_refresher"):
+                                auth_manager.start_refresher()
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+            cls._youtube_client = None
+            cls._spotify_batcher = None
+            credentials = cls._spotify_credentials
+        if credentials is not None:
+            credentials.stop_refresher()
+        for pool in pools:
+            pool.close()
+
     @classmethod
     def create(cls, name: ServiceNameEnum) -> MusicService:
         if name == ServiceNameEnum.SPOTIFY:
-            # auth manager gets creds from environment variables
-            auth_manager = SpotifyClientCredentials()
-            spotify_client = spotipy.Spotify(auth_manager=auth_manager)
-            return SpotifyService(spotify_client)
+            from yt2spotify.services.spotify import SpotifyService
+            return SpotifyService(cls.spotify_batcher())
         elif name == ServiceNameEnum.YOUTUBE_MUSIC:
-            return YoutubeMusicService()
+            from yt2spotify.services.youtube_music import YoutubeMusicService
+            return YoutubeMusicService(PooledClient(cls.pool(YTMUSIC_BACKEND)))
         elif name == ServiceNameEnum.YOUTUBE_STANDARD:
-            api_key = os.environ.get("YOUTUBE_API_KEY")
-            yt_client = googleapiclient.discovery.build("youtube", "v3", developerKey=api_key)
-            return YoutubeService(yt_client)
+            return cls._youtube_service()
         elif name == ServiceNameEnum.YOUTUBE_YTM:
-            ytm_service = YoutubeMusicService()
-            api_key = os.environ.get("YOUTUBE_API_KEY")
-            yt_client = googleapiclient.discovery.build("youtube", "v3", developerKey=api_key)
-            yt_service = YoutubeService(yt_client)
-            return YoutubeYTMService(ytm_service, yt_service)
\ No newline at end of file
+            from yt2spotify.services.youtube_ytm import YoutubeYTMService
+            yt_service = cls._youtube_service()
+            return YoutubeYTMService(yt_service.ytm_fallback, yt_service)
+
+    @classmethod
+    def _youtube_service(cls) -> MusicService:
+        from yt2spotify.services.youtube_music import YoutubeMusicService
+        from yt2spotify.services.youtube_standard import YoutubeService
+        # falls back to YouTube Music when the Data API quota runs low
+        ytm_service = YoutubeMusicService(PooledClient(cls.pool(YTMUSIC_BACKEND)))
+        return YoutubeService(cls._yt_client(), quota=cls.quota(), ytm_fallback=ytm_service)
+
+    @classmethod
+    def router(cls) -> "LinkRouter":
+        """
+        Routes links to the services above. YouTube links go to the service searching YouTube
+        Music, which spends no Data API quota.
+        """
+        with cls._lock:
+            if cls._router is None:
+                from yt2spotify.router import LinkRouter
+                from yt2spotify.services.spotify import SpotifyService
+                from yt2spotify.services.youtube_music import YoutubeMusicService
+                from yt2spotify.services.youtube_standard import YoutubeService
+                from yt2spotify.services.youtube_ytm import YoutubeYTMService
+                cls._router = LinkRouter([SpotifyService, YoutubeMusicService, YoutubeYTMService, YoutubeService])
+            return cls._router
+
+    @classmethod
+    def create_async(cls, name: ServiceNameEnum) -> AsyncMusicService:
+        return ThreadedMusicService(cls.create(name))
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitStats:
+    calls: int = 0
+    # calls that had to wait for a token or a Retry-After pause
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    # 429 responses received despite the bucket
+    rate_limited: int = 0
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.wait_seconds / self.calls if self.calls else 0.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`.
+
+    `acquire()` blocks instead of failing. Callers are served in arrival order, since each one
+    reserves the next free token (letting the balance go negative) and then sleeps until it is due.
+    `pause(seconds)` holds back every caller, e.g. while the server's Retry-After runs.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = RateLimitStats()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting as long as necessary. Returns the seconds spent waiting.
+        """
+        with self._lock:
+            start = self.clock()
+            self._refill(start)
+            self._tokens -= 1
+            due = start + max(-self._tokens / self.rate, 0.0)
+        while True:
+            # re-check after sleeping: a pause may have started meanwhile
+            remaining = max(due, self._paused_until) - self.clock()
+            if remaining <= 0:
+                break
+            self.sleep(remaining)
+        waited = self.clock() - start
+        with self._lock:
+            self._stats.calls += 1
+            if waited > 0:
+                self._stats.throttled += 1
+                self._stats.wait_seconds += waited
+                self._stats.max_wait_seconds = max(self._stats.max_wait_seconds, waited)
+        return waited
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._stats.rate_limited += 1
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def stats(self) -> RateLimitStats:
+        with self._lock:
+            return RateLimitStats(**vars(self._stats))
+
+
+def _retry_after(error: Exception, default: float) -> float:
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", default))
+    except (TypeError, ValueError):
+        return default
+
+
+def without_retry_after(client):
+    """
+    Remount `client`'s (a spotipy.Spotify) session with its own retry settings, except that
+    Retry-After is ignored. urllib3 otherwise retries any 429 carrying Retry-After, whatever the
+    status_forcelist, sleeping in the calling thread and dropping the headers once it gives up.
+    """
+    import requests
+    import urllib3
+
+    retry = urllib3.Retry(
+        total=client.retries,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+        status=client.status_retries,
+        backoff_factor=client.backoff_factor,
+        status_forcelist=client.status_forcelist,
+        respect_retry_after_header=False,
+    )
+    adapter = requests.adapters.HTTPAdapter(max_retries=retry)
+    client._session.mount("http://", adapter)
+    client._session.mount("https://", adapter)
+    return client
+
+
+class RateLimitedSpotify:
+    """
+    Wraps a spotipy.Spotify client so every API call first takes a token from `bucket`.
+
+    A 429 pauses the whole bucket for the server's Retry-After and the call is retried, up to
+    `max_retries` times. Build the client with 429 removed from `status_forcelist` and pass it
+    through `without_retry_after`, otherwise urllib3 retries it internally and only the calling
+    thread backs off.
+    """
+
+    def __init__(self, client, bucket: TokenBucket, max_retries: int = 3, default_retry_after: float = 1.0):
+        self._client = client
+        self._bucket = bucket
+        self._max_retries = max_retries
+        self._default_retry_after = default_retry_after
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            for attempt in range(self._max_retries + 1):
+                self._bucket.acquire()
+                try:
+                    return attr(*args, **kwargs)
+                except Exception as e:
+                    if getattr(e, "http_status", None) != 429 or attempt == self._max_retries:
+                        raise
+                    retry_after = _retry_after(e, self._default_retry_after)
+                    logger.warning(f"Spotify rate limit hit in {name}, retrying in {retry_after:.1f}s")
+                    self._bucket.pause(retry_after)
+        return call
@@ -10,4 +10,6 @@ class ServiceNameEnum(str, Enum):
 class FormattedServiceNameEnum(str, Enum):
     YOUTUBE_MUSIC = 'YouTube Music'
     SPOTIFY = 'Spotify'
+    YOUTUBE_STANDARD = 'YouTube'
+    YOUTUBE_YTM = 'YouTube'
 
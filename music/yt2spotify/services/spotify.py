@@ -1,13 +1,15 @@
 import configparser
-import re
-from typing import Optional, Tuple
-from urllib.parse import urljoin, urlparse
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Tuple
 
-from spotipy import Spotify
+from yt2spotify.entities import parse_url
+from yt2spotify.errors import NotFoundError
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.abstract_service import MusicService, search_query
+from yt2spotify.services.service_names import FormattedServiceNameEnum, ServiceNameEnum
+from yt2spotify.services.spotify_batch import LookupNotFound
 
-from yt2spotify.models import SearchParams, SearchResult, SearchResultItem
-from yt2spotify.services.abstract_service import MusicService
-from yt2spotify.services.service_names import ServiceNameEnum
+if TYPE_CHECKING:
+    from spotipy import Spotify
 
 
 def read_spotify_config(config_path: str) -> Tuple[str, str]:
@@ -20,45 +22,83 @@ def read_spotify_config(config_path: str) -> Tuple[str, str]:
 
 
 class SpotifyService(MusicService):
-    spotifypattern = re.compile(r'(?:https://)?open\.spotify\.com/(track|artist|album)/.+')
     name = ServiceNameEnum.SPOTIFY
+    reads = {ServiceNameEnum.SPOTIFY: ("song", "album", "artist", "playlist")}
 
-    def __init__(self, sp_client: Optional[Spotify] = None):
-        self.sp_client = sp_client if sp_client is not None else Spotify()
-
-    @classmethod
-    def detect(cls, url: str) -> bool:
-        if not cls.spotifypattern.match(url):
-            return False
-        return True
+    def __init__(self, sp_client: Optional["Spotify"] = None):
+        if sp_client is None:
+            from spotipy import Spotify
+            sp_client = Spotify()
+        self.sp_client = sp_client
 
     def url_to_search_params(self, url: str) -> SearchParams:
-        url = urljoin(url, urlparse(url).path)
+        key = parse_url(url)
+        if key is None or key.service != self.name:
+            raise ValueError(f"Not a Spotify link: {url}")
 
-        url_type = self.spotifypattern.findall(url)[0]
-        if url_type == "track":
-            track_info = self.sp_client.track(url)
+        if key.kind == "song":
+            track_info = self._lookup("song", self.sp_client.track, key.id)
             track_name = track_info['name']
             track_album = track_info['album']['name']
             track_artist = track_info['artists'][0]['name']
-            return SearchParams(name=track_name, album=track_album, artist=track_artist, search_type_hint="song")
-        elif url_type == "artist":
-            artist_info = self.sp_client.artist(url)
+            return SearchParams(name=track_name, album=track_album, artist=track_artist, search_type_hint="song",
+                                isrc=track_info.get('external_ids', {}).get('isrc'),
+                                duration_ms=track_info.get('duration_ms'),
+                                year=track_info['album'].get('release_date', '')[:4] or None)
+        elif key.kind == "artist":
+            artist_info = self._lookup("artist", self.sp_client.artist, key.id)
             artist_name = artist_info['name']
             return SearchParams(artist=artist_name, search_type_hint="artist")
+        elif key.kind == "playlist":
+            raise ValueError(f"Playlists are converted track by track: {url}")
         else:
-            album_info = self.sp_client.album(url)
+            album_info = self._lookup("album", self.sp_client.album, key.id)
             album_name = album_info['name']
             album_artist = album_info['artists'][0]['name']
-            return SearchParams(album=album_name, artist=album_artist, search_type_hint="album")
-
-    def search_with_params(self, params: SearchParams) -> SearchResult:
+            return SearchParams(album=album_name, artist=album_artist, search_type_hint="album",
+                                year=album_info.get('release_date', '')[:4] or None)
+
+    @staticmethod
+    def _lookup(kind: str, fetch: Callable[[str], Any], entity_id: str):
+        try:
+            return fetch(entity_id)
+        except LookupNotFound:
+            raise NotFoundError(kind, FormattedServiceNameEnum.SPOTIFY)
+        except Exception as e:
+            # spotipy's SpotifyException, without importing spotipy
+            if getattr(e, "http_status", None) == 404:
+                raise NotFoundError(kind, FormattedServiceNameEnum.SPOTIFY)
+            raise
+
+    def playlist_tracks(self, url: str) -> Iterator[SearchParams]:
+        key = parse_url(url)
+        if key is None or key.service != self.name or key.kind != "playlist":
+            raise ValueError(f"Not a Spotify playlist link: {url}")
+
+        fields = "items(track(name,album(name),artists(name),external_ids(isrc),duration_ms)),next"
+        offset = 0
+        while True:
+            page = self.sp_client.playlist_items(key.id, fields=fields, limit=100, offset=offset,
+                                                 additional_types=("track",))
+            for item in page["items"]:
+                track = item.get("track")
+                # removed tracks come back as null, local files without artists
+                if not track or not track.get("artists"):
+                    continue
+                yield SearchParams(name=track["name"], album=track["album"]["name"],
+                                   artist=track["artists"][0]["name"], search_type_hint="song",
+                                   isrc=(track.get("external_ids") or {}).get("isrc"),
+                                   duration_ms=track.get("duration_ms"))
+            if not page.get("next"):
+                return
+            offset += len(page["items"])
+
+    def search_with_params(self, params: SearchParams, limit: int = MusicService.default_limit) -> Results:
         if params.search_type_hint == "album":
-            search_query = f"{params.album} {params.artist}"
-            results = self.sp_client.search(search_query, limit=10, type="album")
+            results = self.sp_client.search(search_query(params), limit=limit, type="album")
             response = []
             for item in results['albums']['items']:
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=item['external_urls']['spotify'] if 'external_urls' in item else "",
                     uri=item['uri'],
                     description1=item['name'],
@@ -71,11 +111,10 @@ class SpotifyService(MusicService):
                 response.append(resp_item)
 
         elif params.search_type_hint == "artist":
-            search_query = f"{params.artist}"
-            results = self.sp_client.search(search_query, limit=10, type="artist")
+            results = self.sp_client.search(search_query(params), limit=limit, type="artist")
             response = []
             for item in results['artists']['items']:
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=item['external_urls']['spotify'],
                     uri=item['uri'],
                     description1=item['name'],
@@ -86,11 +125,10 @@ class SpotifyService(MusicService):
                 response.append(resp_item)
 
         else:
-            search_query = f"{params.name} {params.artist}"
-            results = self.sp_client.search(search_query, limit=10, type="track")
+            results = self.sp_client.search(search_query(params), limit=limit, type="track")
             response = []
             for item in results['tracks']['items']:
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=item['external_urls']['spotify'],
                     uri=item['uri'],
                     description1=item['name'],
@@ -98,9 +136,12 @@ class SpotifyService(MusicService):
                     description3=", ".join([artist['name'] for artist in item['artists']]),
                     description4="Track",
                     art_url=item['album']['images'][0]['url'],
+                    duration_ms=item.get('duration_ms'),
                 )
 
                 response.append(resp_item)
 
-        manual_search_link = f"https://open.spotify.com/search/{search_query}"
-        return SearchResult.parse_obj({'results': response, 'manual_search_link': manual_search_link})
+        return Results(results=response, manual_search_link=self.manual_search_link(params))
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        return f"https://open.spotify.com/search/{search_query(params)}"
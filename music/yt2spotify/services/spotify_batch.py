@@ -0,0 +1,109 @@
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+# bulk endpoint, response key and maximum IDs per request for each single-ID method
+BULK_ENDPOINTS = {
+    "track": ("tracks", "tracks", 50),
+    "album": ("albums", "albums", 20),
+    "artist": ("artists", "artists", 50),
+}
+
+
+@dataclass
+class BatchStats:
+    lookups: int = 0
+    requests: int = 0
+
+    @property
+    def lookups_per_request(self) -> float:
+        return self.lookups / self.requests if self.requests else 0.0
+
+
+class LookupNotFound(LookupError):
+    pass
+
+
+class _Batch:
+    def __init__(self):
+        self.waiters: Dict[str, List[Future]] = {}
+
+
+class SpotifyMetadataBatcher:
+    """
+    Drop-in wrapper for a spotipy.Spotify client that coalesces concurrent `track`, `album` and
+    `artist` lookups into calls to the multi-ID endpoints.
+
+    The first lookup of a kind opens a batch and waits `window` seconds for others to join; later
+    lookups just wait for the result. A batch is sent early once it reaches the endpoint's limit.
+    Every other attribute is passed through to the client.
+    """
+
+    def __init__(self, client, window: float = 0.005):
+        self.client = client
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _Batch] = {}
+        self._stats = BatchStats()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def track(self, track_id: str, market=None) -> dict:
+        return self._lookup("track", track_id) if market is None else self.client.track(track_id, market=market)
+
+    def album(self, album_id: str, market=None) -> dict:
+        return self._lookup("album", album_id) if market is None else self.client.album(album_id, market=market)
+
+    def artist(self, artist_id: str) -> dict:
+        return self._lookup("artist", artist_id)
+
+    def _lookup(self, kind: str, entity_id: str) -> dict:
+        future = Future()
+        full = None
+        with self._lock:
+            self._stats.lookups += 1
+            batch = self._pending.get(kind)
+            leader = batch is None
+            if leader:
+                batch = self._pending[kind] = _Batch()
+            batch.waiters.setdefault(entity_id, []).append(future)
+            if len(batch.waiters) >= BULK_ENDPOINTS[kind][2]:
+                full = self._pending.pop(kind)
+
+        if full is not None:
+            self._send(kind, full)
+        elif leader:
+            time.sleep(self.window)
+            with self._lock:
+                # still ours unless it filled up and was sent meanwhile
+                due = self._pending.pop(kind) if self._pending.get(kind) is batch else None
+            if due is not None:
+                self._send(kind, due)
+        return future.result()
+
+    def _send(self, kind: str, batch: _Batch):
+        method, key, _ = BULK_ENDPOINTS[kind]
+        ids = list(batch.waiters)
+        with self._lock:
+            self._stats.requests += 1
+        try:
+            items = getattr(self.client, method)(ids)[key]
+        except Exception as e:
+            for futures in batch.waiters.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        for i, entity_id in enumerate(ids):
+            item = items[i] if i < len(items) else None
+            for future in batch.waiters[entity_id]:
+                if item is None:
+                    future.set_exception(LookupNotFound(f"Spotify {kind} not found: {entity_id}"))
+                else:
+                    future.set_result(item)
+
+    def stats(self) -> BatchStats:
+        with self._lock:
+            return BatchStats(**vars(self._stats))
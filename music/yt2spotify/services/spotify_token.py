@@ -0,0 +1,127 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from spotipy.cache_handler import MemoryCacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+logger = logging.getLogger(__name__)
+
+# spotipy treats a token as expired 60 seconds early; never hand out one closer to expiry than that
+MIN_VALIDITY = 60
+RETRY_DELAY = 30
+
+
+def default_token_path(client_id: Optional[str] = None) -> str:
+    """
+    Host-wide token file, one per client id so different apps never share a token.
+    """
+    client_id = client_id or os.environ.get("SPOTIPY_CLIENT_ID", "")
+    digest = hashlib.sha256(client_id.encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"yt2spotify-spotify-token-{digest}.json")
+
+
+class SharedTokenCredentials(SpotifyClientCredentials):
+    """
+    Client-credentials auth manager whose token lives in a file shared by every process on the host.
+
+    Refreshes happen under an exclusive file lock and re-read the file first, so when several
+    workers find the token stale at once only one of them calls the token endpoint.
+    `start_refresher()` renews the token `refresh_margin` seconds before it expires, so requests
+    always find a valid token in memory.
+    """
+
+    def __init__(self, client_id: Optional[str] = None, client_secret: Optional[str] = None,
+                 path: Optional[str] = None, refresh_margin: float = 300, clock: Callable[[], float] = time.time,
+                 **kwargs):
+        # the shared file replaces spotipy's own cache
+        super().__init__(client_id, client_secret, cache_handler=MemoryCacheHandler(), **kwargs)
+        self.path = Path(path or default_token_path(self.client_id))
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.fetches = 0
+        self._token: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def _valid_for(self, token: Optional[dict]) -> float:
+        return token["expires_at"] - self.clock() if token else float("-inf")
+
+    def get_access_token(self, as_dict=False, check_cache=True):
+        token = self._token
+        if not check_cache or self._valid_for(token) <= MIN_VALIDITY:
+            token = self.refresh(MIN_VALIDITY if check_cache else float("inf"))
+        return token if as_dict else token["access_token"]
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Optional[dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, token: dict):
+        # write-then-rename so readers never see a partial file; the token is a secret, so 0600
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(token, f)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, margin: float) -> dict:
+        """
+        Make sure the token is valid for more than `margin` seconds, fetching a new one only if
+        neither this process nor another one on the host already has.
+        """
+        with self._lock:
+            if self._valid_for(self._token) > margin:
+                return self._token
+            with self._file_lock():
+                token = self._read()
+                if self._valid_for(token) <= margin:
+                    token = self._add_custom_values_to_token_info(self._request_access_token())
+                    self._write(token)
+                    self.fetches += 1
+            self._token = token
+            return token
+
+    def start_refresher(self):
+        if self._refresher is not None:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="spotify-token-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop_refresher(self):
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def _refresh_loop(self):
+        delay = 0.0
+        while not self._stop.wait(delay):
+            try:
+                token = self.refresh(self.refresh_margin)
+                delay = max(self._valid_for(token) - self.refresh_margin, 1.0)
+            except Exception:
+                logger.exception("Spotify token refresh failed")
+                delay = RETRY_DELAY
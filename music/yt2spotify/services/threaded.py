@@ -0,0 +1,60 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, Optional
+
+from yt2spotify.models import Results, SearchParams
+from yt2spotify.services.abstract_service import AsyncMusicService, MusicService
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def default_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool the blocking backend clients run on. Sized by YT2SPOTIFY_MAX_WORKERS
+    because conversions spend nearly all their time waiting on HTTP, not on the CPU.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = int(os.environ.get("YT2SPOTIFY_MAX_WORKERS", "64"))
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yt2spotify")
+        return _executor
+
+
+class ThreadedMusicService(AsyncMusicService):
+    """
+    Adapts a blocking MusicService to the async contract by running each call on a worker thread,
+    so the event loop keeps serving other chats while spotipy / ytmusicapi wait on the network.
+    """
+
+    def __init__(self, service: MusicService, executor: Optional[Executor] = None):
+        self.service = service
+        self.name = service.name
+        self.executor = executor
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        executor = self.executor if self.executor is not None else default_executor()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+    async def url_to_search_params(self, url: str) -> SearchParams:
+        return await self._run(self.service.url_to_search_params, url)
+
+    async def search_with_params(self, params: SearchParams, limit: int = MusicService.default_limit) -> Results:
+        return await self._run(self.service.search_with_params, params, limit)
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        return self.service.manual_search_link(params)
+
+    async def playlist_tracks(self, url: str) -> AsyncIterator[SearchParams]:
+        # each next() may fetch a page, so it runs on a worker thread too
+        tracks = await self._run(self.service.playlist_tracks, url)
+        while True:
+            params = await self._run(next, tracks, None)
+            if params is None:
+                return
+            yield params
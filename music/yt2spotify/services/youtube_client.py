@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import googleapiclient.discovery
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import HttpRequest, build_http
+
+from yt2spotify.quota import QuotaBudget
+from yt2spotify.services.client_pool import ClientPool
+
+_document = None
+_document_lock = threading.Lock()
+
+
+def youtube_discovery_document() -> dict:
+    """
+    The YouTube Data API v3 discovery document, read and parsed once per process.
+
+    Read from the file named by YOUTUBE_DISCOVERY_DOCUMENT if set, otherwise from the copy bundled
+    with google-api-python-client, so building a client never touches the network.
+    """
+    global _document
+    with _document_lock:
+        if _document is None:
+            path = os.environ.get("YOUTUBE_DISCOVERY_DOCUMENT")
+            text = Path(path).read_text() if path else get_static_doc("youtube", "v3")
+            if text is None:
+                raise RuntimeError("No YouTube Data API discovery document available")
+            document = json.loads(text)
+            # googleapiclient fills in default parameters on the document the first time each resource
+            # is built; do that once here so clients sharing the document never mutate it concurrently
+            resource = googleapiclient.discovery.build_from_document(document, http=build_http())
+            for name in document.get("resources", {}):
+                getattr(resource, name)()
+            _document = document
+        return _document
+
+
+def build_youtube_client(api_key: str, http_pool: Optional[ClientPool] = None, quota: Optional[QuotaBudget] = None):
+    """
+    Build a YouTube Data API resource from the shared discovery document.
+
+    With `http_pool`, the resource is safe to share between threads: the discovery resource itself
+    is immutable once built, but the httplib2.Http it would normally execute on is not thread-safe,
+    so every request borrows a connection from the pool only for the duration of `execute()`.
+    With `quota`, the cost of every executed request is recorded against the daily budget.
+    """
+    def request_builder(http, postproc, uri, **kwargs) -> HttpRequest:
+        return AccountedHttpRequest(http_pool, quota, http, postproc, uri, **kwargs)
+
+    return googleapiclient.discovery.build_from_document(youtube_discovery_document(), developerKey=api_key,
+                                                         requestBuilder=request_builder)
+
+
+class AccountedHttpRequest(HttpRequest):
+    def __init__(self, http_pool: Optional[ClientPool], quota: Optional[QuotaBudget], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.http_pool = http_pool
+        self.quota = quota
+
+    def execute(self, http=None, num_retries=0):
+        # the API charges for a request whether or not it succeeds
+        if self.quota is not None:
+            self.quota.record(self.methodId)
+        if http is not None or self.http_pool is None:
+            return super().execute(http=http, num_retries=num_retries)
+        with self.http_pool.lease() as pooled_http:
+            return super().execute(http=pooled_http, num_retries=num_retries)
@@ -1,50 +1,50 @@
-import re
-from typing import Optional
+from typing import TYPE_CHECKING, Generator, Iterator, List, Optional
 from urllib.parse import quote_plus
 
-from ytmusicapi import YTMusic
-
+from yt2spotify.entities import ALBUM_BROWSE_PREFIX, parse_url
 from yt2spotify.errors import NotFoundError
-from yt2spotify.models import SearchParams, SearchResult, SearchResultItem
-from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.abstract_service import MusicService, search_query
 from yt2spotify.services.service_names import ServiceNameEnum, FormattedServiceNameEnum
 
+if TYPE_CHECKING:
+    from ytmusicapi import YTMusic
+
 
 class YoutubeMusicService(MusicService):
-    ytmpattern = re.compile(r'(?:https://)?music\.youtube\.com/watch\?.*(?<=v=)([-\w]+).*')
-    ytmchannel_pattern = re.compile(r'(?:https://)?music\.youtube\.com/channel/([-\w]+).*')
-    ytmplaylist_pattern = re.compile(r'(?:https://)?music\.youtube\.com/playlist\?.*(?<=list=)([-\w]+).*')
     name = ServiceNameEnum.YOUTUBE_MUSIC
+    # ytmusicapi cannot page through a playlist, so longer ones are cut here to bound memory;
+    # YoutubeYTMService lists the rest through the Data API
+    max_playlist_tracks = 1000
+    reads = {ServiceNameEnum.YOUTUBE_MUSIC: ("song", "album", "artist")}
 
-    def __init__(self, ytm_client: Optional[YTMusic] = None):
-        self.ytm_client = ytm_client if ytm_client is not None else YTMusic()
-
-    @classmethod
-    def detect(cls, url: str) -> bool:
-        if not cls.ytmpattern.match(url) and not cls.ytmchannel_pattern.match(url) and not cls.ytmplaylist_pattern.match(
-                url):
-            return False
-        return True
+    def __init__(self, ytm_client: Optional["YTMusic"] = None):
+        if ytm_client is None:
+            from ytmusicapi import YTMusic
+            ytm_client = YTMusic()
+        self.ytm_client = ytm_client
 
     def url_to_search_params(self, url: str) -> SearchParams:
-        video = self.ytmpattern.findall(url)
-        if len(video) > 0:
-            video_id = video[0]
+        key = parse_url(url)
+        if key is None or key.service != self.name:
+            raise ValueError(f"Not a YouTube Music link: {url}")
+
+        if key.kind == "song":
             try:
-                song = self.ytm_client.get_song(videoId=video_id)
+                song = self.ytm_client.get_song(videoId=key.id)
             except Exception as e:
                 if "not found" in str(e).lower() or "404" in str(e):
                     raise NotFoundError("song", FormattedServiceNameEnum.YOUTUBE_MUSIC)
                 raise e
             song_title = song['videoDetails']['title']
             song_artist = song['videoDetails']['author'].removesuffix(" - Topic")
-            return SearchParams(name=song_title, artist=song_artist, search_type_hint="song")
+            length = song['videoDetails'].get('lengthSeconds')
+            return SearchParams(name=song_title, artist=song_artist, search_type_hint="song",
+                                duration_ms=int(length) * 1000 if length else None)
 
-        channel = self.ytmchannel_pattern.findall(url)
-        if len(channel) > 0:
-            channel_id = channel[0]
+        elif key.kind == "artist":
             try:
-                artist = self.ytm_client.get_artist(channelId=channel_id)
+                artist = self.ytm_client.get_artist(channelId=key.id)
             except Exception as e:
                 if "not found" in str(e).lower() or "404" in str(e):
                     raise NotFoundError("artist", FormattedServiceNameEnum.YOUTUBE_MUSIC)
@@ -52,10 +52,10 @@ class YoutubeMusicService(MusicService):
             artist_name = artist['name']
             return SearchParams(artist=artist_name, search_type_hint="artist")
 
-        playlist = self.ytmplaylist_pattern.findall(url)
-        if len(playlist) > 0:
-            playlist_id = playlist[0]
-            album_browse_id = self.ytm_client.get_album_browse_id(audioPlaylistId=playlist_id)
+        else:
+            album_browse_id = key.id
+            if not key.id.startswith(ALBUM_BROWSE_PREFIX):
+                album_browse_id = self.ytm_client.get_album_browse_id(audioPlaylistId=key.id)
             try:
                 album = self.ytm_client.get_album(browseId=album_browse_id)
             except Exception as e:
@@ -64,16 +64,43 @@ class YoutubeMusicService(MusicService):
                 raise e
             album_name = album['title']
             album_artist = album['artists'][0]['name']
-            return SearchParams(artist=album_artist, album=album_name, search_type_hint="album")
-
-    def search_with_params(self, params: SearchParams) -> SearchResult:
-        limit = 10
+            return SearchParams(artist=album_artist, album=album_name, search_type_hint="album",
+                                year=album.get('year'))
+
+    def playlist_tracks(self, url: str) -> Generator[SearchParams, None, Optional[int]]:
+        """
+        The playlist's tracks. When it is longer than max_playlist_tracks, the generator returns the
+        number of playlist entries listed, so the caller can fetch the rest elsewhere.
+        """
+        key = parse_url(url)
+        if key is None or key.service != self.name or key.kind != "album":
+            raise ValueError(f"Not a YouTube Music playlist link: {url}")
+
+        playlist = self.ytm_client.get_playlist(playlistId=key.id, limit=self.max_playlist_tracks)
+        tracks = playlist["tracks"]
+        yield from self._track_params(tracks)
+        track_count = playlist.get("trackCount")
+        if len(tracks) >= self.max_playlist_tracks and (track_count is None or track_count > len(tracks)):
+            return len(tracks)
+        return None
+
+    @staticmethod
+    def _track_params(tracks: List[dict]) -> Iterator[SearchParams]:
+        for track in tracks:
+            if not track.get("title") or not track.get("artists"):
+                continue
+            album = track.get("album")
+            duration = track.get("duration_seconds")
+            yield SearchParams(name=track["title"], album=album["name"] if album else None,
+                               artist=track["artists"][0]["name"], search_type_hint="song",
+                               duration_ms=duration * 1000 if duration else None)
+
+    def search_with_params(self, params: SearchParams, limit: int = MusicService.default_limit) -> Results:
         if params.search_type_hint == "album":
-            search_query = f"{params.album} {params.artist}"
-            results = self.ytm_client.search(search_query, filter="albums", limit=limit)
+            results = self.ytm_client.search(search_query(params), filter="albums", limit=limit)
             response = []
             for i, item in enumerate(results[:limit]):
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=f"https://music.youtube.com/browse/{item['browseId']}",
                     uri=f"https://music.youtube.com/browse/{item['browseId']}",
                     description1=item['title'],
@@ -86,12 +113,11 @@ class YoutubeMusicService(MusicService):
                 response.append(resp_item)
 
         elif params.search_type_hint == "artist":
-            search_query = f"{params.artist}"
-            results = self.ytm_client.search(search_query, filter="artists", limit=limit)
+            results = self.ytm_client.search(search_query(params), filter="artists", limit=limit)
 
             response = []
             for i, item in enumerate(results[:limit]):
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=f"https://music.youtube.com/channel/{item['browseId']}",
                     uri=f"https://music.youtube.com/channel/{item['browseId']}",
                     description1=item['artist'],
@@ -101,11 +127,10 @@ class YoutubeMusicService(MusicService):
 
                 response.append(resp_item)
         else:
-            search_query = f"{params.name} {params.artist}"
-            results = self.ytm_client.search(search_query, filter="songs", limit=limit)
+            results = self.ytm_client.search(search_query(params), filter="songs", limit=limit)
             response = []
             for i, item in enumerate(results[:limit]):
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=f"https://music.youtube.com/watch?v={item['videoId']}",
                     uri=f"https://music.youtube.com/watch?v={item['videoId']}",
                     description1=item['title'],
@@ -113,9 +138,12 @@ class YoutubeMusicService(MusicService):
                     description3=", ".join([artist['name'] for artist in item['artists']]),
                     description4="Track",
                     art_url=item['thumbnails'][-1]['url'],
+                    duration_ms=item['duration_seconds'] * 1000 if item.get('duration_seconds') else None,
                 )
 
                 response.append(resp_item)
 
-        manual_search_link = f"https://music.youtube.com/search?q={quote_plus(search_query)}"
-        return SearchResult.parse_obj({'results': response, 'manual_search_link': manual_search_link})
+        return Results(results=response, manual_search_link=self.manual_search_link(params))
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        return f"https://music.youtube.com/search?q={quote_plus(search_query(params))}"
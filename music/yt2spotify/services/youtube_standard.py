@@ -1,80 +1,169 @@
 import os
-import re
+from dataclasses import replace
+from typing import TYPE_CHECKING, Iterator, Optional
 from urllib.parse import quote_plus
 
-import googleapiclient.discovery
-
-from yt2spotify.models import SearchParams, SearchResult, SearchResultItem
-from yt2spotify.services.abstract_service import MusicService
-from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.entities import ALBUM_LIST_PREFIX, EntityKey, entity_url, parse_url
+from yt2spotify.errors import NotFoundError
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.abstract_service import MusicService, search_query
+from yt2spotify.services.service_names import FormattedServiceNameEnum, ServiceNameEnum
+
+if TYPE_CHECKING:
+    from yt2spotify.quota import QuotaBudget
+
+SEARCH_METHOD = "youtube.search.list"
+LOOKUP_METHOD = "youtube.videos.list"
+PLAYLIST_METHOD = "youtube.playlistItems.list"
+# partial responses: only the parts of each resource the service reads are sent
+SEARCH_FIELDS = "items(id,snippet(title,channelTitle,thumbnails/high/url))"
+LOOKUP_FIELDS = "items/snippet(title,channelTitle)"
+# a channel's snippet has no channelTitle; asking for it is a 400
+CHANNEL_FIELDS = "items/snippet(title)"
+PLAYLIST_FIELDS = "nextPageToken,items/snippet(title,videoOwnerChannelTitle)"
+PAGE_TOKEN_FIELDS = "nextPageToken"
+PLAYLIST_PAGE_SIZE = 50
+
+
+def resolves_through_ytm(key: EntityKey) -> bool:
+    """
+    Whether YouTube Music can look up the YouTube entity `key`: videos, channels by ID and album
+    lists share IDs between the two. Handles and user playlists need the Data API.
+    """
+    if key.kind == "artist":
+        return not key.id.startswith("@")
+    if key.kind == "album":
+        return key.id.startswith(ALBUM_LIST_PREFIX)
+    return True
+
+
+def youtube_result_from_ytm(ytm_result: Results) -> Results:
+    """
+    Convert a YouTube Music search result to standard YouTube links.
+    """
+    results = [replace(item, url=item.url.replace("music.", ""), uri=item.uri.replace("music.", ""))
+               for item in ytm_result.results]
+    manual_search_link = ytm_result.manual_search_link.replace("music.", "")
+    manual_search_link = manual_search_link.replace("search?q=", "results?search_query=")
+    return replace(ytm_result, results=results, manual_search_link=manual_search_link)
 
 
 class YoutubeService(MusicService):
-    ytpattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/watch\?.*(?<=v=)([-\w]+).*')
-    ytpattern_short_link = re.compile(r'(?:https://)?youtu\.be/([-_\w]+).*')
-    ytchannel_pattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/(?:(@[-\w]+)|channel/([-\w]+).*)')
-    ytplaylist_pattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/playlist\?.*(?<=list=)([-\w]+).*')
+    """
+    YouTube Data API service. Given a `quota` budget and a YouTube Music `ytm_fallback`, calls the
+    budget can no longer afford are answered through YouTube Music instead, which costs no quota.
+    """
     name = ServiceNameEnum.YOUTUBE_STANDARD
+    reads = {ServiceNameEnum.YOUTUBE_STANDARD: ("song", "album", "artist")}
 
-    def __init__(self, yt_client = None):
+    def __init__(self, yt_client = None, quota: Optional["QuotaBudget"] = None,
+                 ytm_fallback: Optional[MusicService] = None):
         if yt_client is None:
+            from yt2spotify.services.youtube_client import build_youtube_client
             api_key = os.environ.get("YOUTUBE_API_KEY")
-            self.yt_client = googleapiclient.discovery.build("youtube", "v3", developerKey=api_key)
+            self.yt_client = build_youtube_client(api_key, quota=quota)
         else:
             self.yt_client = yt_client
+        self.quota = quota
+        self.ytm_fallback = ytm_fallback
+
+    def _use_fallback(self, method_id: str) -> bool:
+        return self.quota is not None and self.ytm_fallback is not None and not self.quota.can_call(method_id)
 
-    @classmethod
-    def detect(cls, url: str) -> bool:
-        if (
-                not cls.ytpattern.match(url)
-                and not cls.ytchannel_pattern.match(url)
-                and not cls.ytplaylist_pattern.match(url)
-                and not cls.ytpattern_short_link.match(url)
-        ):
-            return False
-        return True
+    @staticmethod
+    def _snippet(resp: dict, kind: str) -> dict:
+        # deleted and private entities come back without items
+        if not resp.get("items"):
+            raise NotFoundError(kind, FormattedServiceNameEnum.YOUTUBE_STANDARD)
+        return resp["items"][0]["snippet"]
 
     def url_to_search_params(self, url: str) -> SearchParams:
-        if self.ytpattern_short_link.match(url):
-            url = url.replace("youtu.be/", "youtube.com/watch?v=")
-        video = self.ytpattern.findall(url)
-        if len(video) > 0:
-            video_id = video[0]
-            resp = self.yt_client.videos().list(part="snippet", id=video_id).execute()
-            song_title = resp["items"][0]["snippet"]["title"]
-            song_artist = resp["items"][0]["snippet"]["channelTitle"]
+        key = parse_url(url)
+        if key is None or key.service != ServiceNameEnum.YOUTUBE_STANDARD:
+            raise ValueError(f"Not a YouTube link: {url}")
+
+        # the reserve is kept for lookups YouTube Music cannot answer, e.g. handles and user playlists
+        if resolves_through_ytm(key) and self._use_fallback(LOOKUP_METHOD):
+            ytm_key = EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, key.kind, key.id)
+            return self.ytm_fallback.url_to_search_params(entity_url(ytm_key))
+
+        if key.kind == "song":
+            resp = self.yt_client.videos().list(part="snippet", id=key.id, fields=LOOKUP_FIELDS).execute()
+            snippet = self._snippet(resp, key.kind)
+            song_title = snippet["title"]
+            song_artist = snippet["channelTitle"]
             return SearchParams(name=song_title, artist=song_artist, search_type_hint="song")
 
-        channel = self.ytchannel_pattern.findall(url)
-        if len(channel) > 0:
-            channel_id = channel[0][0] if channel[0][0] != "" else channel[0][1]
-            if channel_id.startswith("@"):
-                resp = self.yt_client.channels().list(part="snippet", forHandle=channel_id).execute()
+        elif key.kind == "artist":
+            if key.id.startswith("@"):
+                resp = self.yt_client.channels().list(part="snippet", forHandle=key.id, fields=CHANNEL_FIELDS).execute()
             else:
-                resp = self.yt_client.channels().list(part="snippet", id=channel_id).execute()
-            artist_name = resp["items"][0]["snippet"]["title"]
+                resp = self.yt_client.channels().list(part="snippet", id=key.id, fields=CHANNEL_FIELDS).execute()
+            artist_name = self._snippet(resp, key.kind)["title"]
             return SearchParams(artist=artist_name, search_type_hint="artist")
 
-        playlist = self.ytplaylist_pattern.findall(url)
-        if len(playlist) > 0:
-            playlist_id = playlist[0]
-            resp = self.yt_client.playlists().list(part="snippet", id=playlist_id).execute()
-            album_name = resp["items"][0]["snippet"]["title"]
-            album_artist = resp["items"][0]["snippet"]["channelTitle"]
+        else:
+            resp = self.yt_client.playlists().list(part="snippet", id=key.id, fields=LOOKUP_FIELDS).execute()
+            snippet = self._snippet(resp, key.kind)
+            album_name = snippet["title"]
+            album_artist = snippet["channelTitle"]
             if album_artist.lower() == "youtube":
                 album_artist = ""
             return SearchParams(artist=album_artist, album=album_name, search_type_hint="album")
 
-    def search_with_params(self, params: SearchParams) -> SearchResult:
-        limit = 10
+    def playlist_tracks(self, url: str, start: int = 0) -> Iterator[SearchParams]:
+        """
+        The playlist's tracks, from its `start`th entry on.
+        """
+        key = parse_url(url)
+        if key is None or key.service != ServiceNameEnum.YOUTUBE_STANDARD or key.kind != "album":
+            raise ValueError(f"Not a YouTube playlist link: {url}")
+        if self._use_fallback(PLAYLIST_METHOD):
+            if start:
+                # YouTube Music only lists a playlist's first max_playlist_tracks entries
+                return iter(())
+            ytm_key = EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, key.kind, key.id)
+            return self.ytm_fallback.playlist_tracks(entity_url(ytm_key))
+        return self._playlist_pages(key.id, start)
+
+    def _playlist_pages(self, playlist_id: str, start: int = 0) -> Iterator[SearchParams]:
+        page_token = None
+        # pages wholly before `start` are only walked for their next-page tokens
+        for _ in range(start // PLAYLIST_PAGE_SIZE):
+            resp = self.yt_client.playlistItems().list(part="id", playlistId=playlist_id, maxResults=PLAYLIST_PAGE_SIZE,
+                                                       pageToken=page_token, fields=PAGE_TOKEN_FIELDS).execute()
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                return
+        skip = start % PLAYLIST_PAGE_SIZE
+        while True:
+            resp = self.yt_client.playlistItems().list(part="snippet", playlistId=playlist_id,
+                                                       maxResults=PLAYLIST_PAGE_SIZE, pageToken=page_token,
+                                                       fields=PLAYLIST_FIELDS).execute()
+            for item in resp["items"][skip:]:
+                snippet = item["snippet"]
+                # deleted and private videos have no owner
+                if "videoOwnerChannelTitle" not in snippet:
+                    continue
+                artist = snippet["videoOwnerChannelTitle"].removesuffix(" - Topic")
+                yield SearchParams(name=snippet["title"], artist=artist, search_type_hint="song")
+            skip = 0
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                return
+
+    def search_with_params(self, params: SearchParams, limit: int = MusicService.default_limit) -> Results:
+        if self._use_fallback(SEARCH_METHOD):
+            return youtube_result_from_ytm(self.ytm_fallback.search_with_params(params, limit))
+
         if params.search_type_hint == "album":
-            search_query = f"{params.album} {params.artist}"
-            result = self.yt_client.search().list(q=search_query, type="album", part="snippet", maxResults=limit).execute()
+            result = self.yt_client.search().list(q=search_query(params), type="album", part="snippet",
+                                                    maxResults=limit, fields=SEARCH_FIELDS).execute()
             response = []
             for i, item in enumerate(result["items"]):
                 if item["id"]["kind"] != "youtube#playlist":
                     continue
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=f"https://youtube.com/playlist?list={item['id']['playlistId']}",
                     uri=f"https://youtube.com/playlist?list={item['id']['playlistId']}",
                     description1=item["snippet"]["title"],
@@ -87,12 +176,12 @@ class YoutubeService(MusicService):
                 response.append(resp_item)
 
         elif params.search_type_hint == "artist":
-            search_query = f"{params.artist}"
-            results = self.yt_client.search().list(q=search_query, type="channel", part="snippet", maxResults=limit).execute()
+            results = self.yt_client.search().list(q=search_query(params), type="channel", part="snippet",
+                                                     maxResults=limit, fields=SEARCH_FIELDS).execute()
 
             response = []
             for i, item in enumerate(results["items"]):
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=f"https://youtube.com/channel/{item['id']['channelId']}",
                     uri=f"https://youtube.com/channel/{item['id']['channelId']}",
                     description1=item["snippet"]["title"],
@@ -102,11 +191,11 @@ class YoutubeService(MusicService):
 
                 response.append(resp_item)
         else:
-            search_query = f"{params.name} {params.artist}"
-            results = self.yt_client.search().list(q=search_query, type="video", part="snippet", maxResults=limit).execute()
+            results = self.yt_client.search().list(q=search_query(params), type="video", part="snippet",
+                                                     maxResults=limit, fields=SEARCH_FIELDS).execute()
             response = []
             for i, item in enumerate(results["items"]):
-                resp_item = SearchResultItem(
+                resp_item = ResultItem(
                     url=f"https://youtube.com/watch?v={item['id']['videoId']}",
                     uri=f"https://youtube.com/watch?v={item['id']['videoId']}",
                     description1=item["snippet"]["title"],
@@ -118,5 +207,7 @@ class YoutubeService(MusicService):
 
                 response.append(resp_item)
 
-        manual_search_link = f"https://www.youtube.com/results?search_query={quote_plus(search_query)}"
-        return SearchResult(results=response, manual_search_link=manual_search_link)
+        return Results(results=response, manual_search_link=self.manual_search_link(params))
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        return f"https://www.youtube.com/results?search_query={quote_plus(search_query(params))}"
@@ -1,64 +1,86 @@
-import re
+import logging
+from typing import Iterator
 
-from yt2spotify.models import SearchParams, SearchResult
+from yt2spotify.entities import EntityKey, entity_url, parse_url
+from yt2spotify.errors import NotFoundError
+from yt2spotify.models import Results, SearchParams
 from yt2spotify.services.abstract_service import MusicService
-from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.service_names import FormattedServiceNameEnum, ServiceNameEnum
 from yt2spotify.services.youtube_music import YoutubeMusicService
-from yt2spotify.services.youtube_standard import YoutubeService
+from yt2spotify.services.youtube_standard import YoutubeService, resolves_through_ytm, youtube_result_from_ytm
+
+logger = logging.getLogger(__name__)
 
 
 class YoutubeYTMService(MusicService):
     """
     YouTube Client that uses the YTM client to search for songs, artists, and albums
-    to avoid using up the standard client's quota. Uses the YT client to convert the
-    url to search params.
+    to avoid using up the standard client's quota. Links are looked up through the YTM
+    client too, and through the YT client only when YTM cannot resolve them.
     """
-    ytpattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/watch\?.*(?<=v=)([-\w]+).*')
-    ytpattern_short_link = re.compile(r'(?:https://)?youtu\.be/([-_\w]+).*')
-    ytchannel_pattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/(?:(@[-\w]+)|channel/([-\w]+).*)')
-    ytplaylist_pattern = re.compile(r'(?:https://)?(?:www\.)?youtube\.com/playlist\?.*(?<=list=)([-\w]+).*')
     name = ServiceNameEnum.YOUTUBE_YTM
+    reads = {ServiceNameEnum.YOUTUBE_STANDARD: ("song", "album", "artist")}
 
     def __init__(self, ytm_service: YoutubeMusicService, yt_service: YoutubeService):
         self.ytm_service = ytm_service
         self.yt_service = yt_service
 
-    @classmethod
-    def detect(cls, url: str) -> bool:
-        # convert mobile youtube links to standard Youtube links
-        url = url.replace("m.youtube.com", "youtube.com")
+    def url_to_search_params(self, url: str) -> SearchParams:
+        # mobile and short links are normalised by the shared parser
+        key = parse_url(url)
+        if key is None or key.service != ServiceNameEnum.YOUTUBE_STANDARD:
+            raise ValueError(f"Not a YouTube link: {url}")
+        if resolves_through_ytm(key):
+            try:
+                return self.ytm_service.url_to_search_params(entity_url(self._ytm_key(key)))
+            except Exception as e:
+                # e.g. age-restricted videos, channels without a YTM page and uploads YTM does not carry
+                logger.debug(f"YouTube Music could not resolve {key}, using the Data API: {e}")
+        try:
+            return self.yt_service.url_to_search_params(url)
+        except NotFoundError:
+            # the Data API defers to YouTube Music when quota is low, but the link is a YouTube one
+            raise NotFoundError(key.kind, FormattedServiceNameEnum.YOUTUBE_STANDARD)
+
+    def playlist_tracks(self, url: str) -> Iterator[SearchParams]:
+        # YouTube Music playlist links are read too: the two share playlist IDs
+        key = parse_url(url)
+        youtube = (ServiceNameEnum.YOUTUBE_STANDARD, ServiceNameEnum.YOUTUBE_MUSIC)
+        if key is None or key.service not in youtube or key.kind != "album":
+            raise ValueError(f"Not a YouTube playlist link: {url}")
+        return self._playlist_tracks(EntityKey(ServiceNameEnum.YOUTUBE_STANDARD, key.kind, key.id))
 
-        if (
-                not cls.ytpattern.match(url)
-                and not cls.ytchannel_pattern.match(url)
-                and not cls.ytplaylist_pattern.match(url)
-                and not cls.ytpattern_short_link.match(url)
-        ):
-            return False
-        return True
+    def _playlist_tracks(self, key: EntityKey) -> Iterator[SearchParams]:
+        url = entity_url(key)
+        tracks = self.ytm_service.playlist_tracks(entity_url(self._ytm_key(key)))
+        try:
+            # YTM fetches the list with the first track, so a failure shows here rather than mid-playlist
+            first = next(tracks)
+        except StopIteration:
+            return
+        except Exception as e:
+            logger.debug(f"YouTube Music could not list {key}, using the Data API: {e}")
+            yield from self.yt_service.playlist_tracks(url)
+            return
+        yield first
+        listed = yield from tracks
+        if listed is not None:
+            # YouTube Music stopped at its cap; the Data API pages through the rest
+            yield from self.yt_service.playlist_tracks(url, start=listed)
 
-    def url_to_search_params(self, url: str) -> SearchParams:
-        # url = url.replace("youtube.com", "music.youtube.com").replace("www.", "")
-        # return self.ytm_service.url_to_search_params(url)
-        
-        # convert mobile youtube links to standard Youtube links
-        url = url.replace("m.youtube.com", "youtube.com")
-        return self.yt_service.url_to_search_params(url)
+    @staticmethod
+    def _ytm_key(key: EntityKey) -> EntityKey:
+        return EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, key.kind, key.id)
 
-    def search_with_params(self, params: SearchParams) -> SearchResult:
-        search_result = self.ytm_service.search_with_params(params)
+    def search_with_params(self, params: SearchParams, limit: int = MusicService.default_limit) -> Results:
+        search_result = self.ytm_service.search_with_params(params, limit)
         return self._convert_ytm_result_to_youtube_result(search_result)
 
-    def _convert_ytm_result_to_youtube_result(self, ytm_result: SearchResult) -> SearchResult:
+    def manual_search_link(self, params: SearchParams) -> str:
+        return self.yt_service.manual_search_link(params)
+
+    def _convert_ytm_result_to_youtube_result(self, ytm_result: Results) -> Results:
         """
         Convert the search result from YTM to YT
         """
-        # iterate through results and convert urls/uris to standard YouTube urls by removing the music subdomain
-        for result in ytm_result.results:
-            result.url = result.url.replace("music.", "")
-            result.uri = result.uri.replace("music.", "")
-
-        ytm_result.manual_search_link = ytm_result.manual_search_link.replace("music.", "")
-        ytm_result.manual_search_link = ytm_result.manual_search_link.replace("search?q=", "results?search_query=")
-
-        return ytm_result
+        return youtube_result_from_ytm(ytm_result)
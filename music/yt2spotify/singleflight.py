@@ -0,0 +1,46 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int
+    coalesced: int
+    in_flight: int
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the work and everyone
+    arriving while it is in flight awaits the same result (or exception) instead of repeating it.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        # shielded so one impatient caller cancelling does not cancel the work for everyone else
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # mark the exception as retrieved in case every caller has gone away
+            task.exception()
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(calls=self.calls, coalesced=self.coalesced, in_flight=len(self._in_flight))
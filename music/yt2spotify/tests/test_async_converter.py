@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+from yt2spotify.converter import AsyncConverter
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.threaded import ThreadedMusicService
+
+
+class SlowService(MusicService):
+    name = ServiceNameEnum.SPOTIFY
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+    def url_to_search_params(self, url: str) -> SearchParams:
+        self._enter()
+        return SearchParams(name=url, artist="Artist", search_type_hint="song")
+
+    def search_with_params(self, params: SearchParams, limit: int = 10) -> Results:
+        self._enter()
+        item = ResultItem(url=f"https://example.com/{params.name}", uri=params.name, description1=params.name)
+        return Results(results=[item], manual_search_link="https://example.com/search")
+
+
+def test_convert_returns_target_results():
+    service = SlowService(delay=0)
+    converter = AsyncConverter(ThreadedMusicService(service), ThreadedMusicService(service))
+
+    result = asyncio.run(converter.convert("song-1"))
+
+    assert result.results[0].url == "https://example.com/song-1"
+
+
+def test_conversions_run_concurrently():
+    from_service = SlowService()
+    to_service = SlowService()
+    converter = AsyncConverter(ThreadedMusicService(from_service), ThreadedMusicService(to_service))
+
+    async def run_all():
+        return await asyncio.gather(*(converter.convert(f"song-{i}") for i in range(20)))
+
+    results = asyncio.run(run_all())
+
+    assert len(results) == 20
+    assert from_service.max_in_flight > 1
+    assert to_service.max_in_flight > 1
+
+
+def test_event_loop_is_not_blocked():
+    converter = AsyncConverter(ThreadedMusicService(SlowService()), ThreadedMusicService(SlowService()))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        await converter.convert("song")
+        tick_task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 10
+
+
+def test_limit_reaches_the_backend(tmp_path):
+    from benchmarks.fakes import FakeSpotify, FakeYTMusic
+    from yt2spotify.cache import ConversionCache
+    from yt2spotify.services.spotify import SpotifyService
+    from yt2spotify.services.youtube_music import YoutubeMusicService
+    from yt2spotify.singleflight import SingleFlight
+
+    class RecordingSpotify(FakeSpotify):
+        limits = []
+
+        def search(self, q, limit=10, offset=0, type="track", market=None):
+            self.limits.append(limit)
+            return super().search(q, limit=limit, offset=offset, type=type)
+
+    spotify = RecordingSpotify()
+    converter = AsyncConverter(ThreadedMusicService(YoutubeMusicService(FakeYTMusic())),
+                               ThreadedMusicService(SpotifyService(spotify)),
+                               cache=ConversionCache(tmp_path / "cache.sqlite3"), single_flight=SingleFlight(),
+                               fetch_limit=5)
+    url = "https://music.youtube.com/watch?v=yKNxeF4KMsY"
+
+    async def inline_and_chat():
+        return await asyncio.gather(converter.convert(url, limit=3), converter.convert(url, limit=5))
+
+    # a short inline conversion fetches, shares and caches enough for chat
+    inline, chat = asyncio.run(inline_and_chat())
+    assert (len(inline.results), len(chat.results)) == (3, 5)
+    assert len(asyncio.run(converter.convert(url, limit=5)).results) == 5
+    assert spotify.limits == [5]
+
+    # more than the cache holds
+    assert len(asyncio.run(converter.convert(url, limit=8)).results) == 8
+    assert spotify.limits == [5, 8]
+
+
+def test_stores_are_used_off_the_event_loop(tmp_path):
+    from yt2spotify.cache import ConversionCache
+
+    class RecordingCache(ConversionCache):
+        threads = []
+
+        def get(self, *args):
+            self.threads.append(threading.get_ident())
+            return super().get(*args)
+
+        def set(self, *args):
+            self.threads.append(threading.get_ident())
+            return super().set(*args)
+
+    service = SlowService(delay=0)
+    cache = RecordingCache(tmp_path / "cache.sqlite3")
+    converter = AsyncConverter(ThreadedMusicService(service), ThreadedMusicService(service), cache=cache)
+
+    async def convert_twice():
+        await converter.convert("https://open.spotify.com/track/6jBCehpNMkwFVF3dz4nLIW")
+        await converter.convert("https://open.spotify.com/track/6jBCehpNMkwFVF3dz4nLIW")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(convert_twice())
+    assert len(cache.threads) == 3
+    assert loop_thread not in cache.threads
@@ -0,0 +1,86 @@
+from yt2spotify.cache import ConversionCache, DAY
+from yt2spotify.converter import Converter
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.services.service_names import ServiceNameEnum
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingService(MusicService):
+    name = ServiceNameEnum.YOUTUBE_MUSIC
+
+    def __init__(self):
+        self.calls = 0
+
+    def url_to_search_params(self, url: str) -> SearchParams:
+        self.calls += 1
+        return SearchParams(name="Yellow", artist="Coldplay", search_type_hint="song")
+
+    def search_with_params(self, params: SearchParams, limit: int = 10) -> Results:
+        self.calls += 1
+        item = ResultItem(url="https://music.youtube.com/watch?v=yKNxeF4KMsY", uri="yKNxeF4KMsY",
+                          description1=params.name, description3=params.artist)
+        return Results(results=[item], manual_search_link="https://music.youtube.com/search?q=Yellow")
+
+
+def make_result(url="https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg"):
+    item = ResultItem(url=url, uri="spotify:track:3AJwUDP919kvQ9QcozQPxg", description1="Yellow")
+    return Results(results=[item], manual_search_link="https://open.spotify.com/search/Yellow")
+
+
+def test_roundtrip_and_persistence(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ConversionCache(path)
+    cache.set("open.spotify.com/track/x", ServiceNameEnum.SPOTIFY, "song", make_result())
+    cache.close()
+
+    reopened = ConversionCache(path)
+    assert reopened.get("open.spotify.com/track/x", ServiceNameEnum.SPOTIFY) == make_result()
+    assert reopened.get("open.spotify.com/track/x", ServiceNameEnum.YOUTUBE_MUSIC) is None
+
+    stats = reopened.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+    assert stats.hit_rate == 0.5
+    assert stats.size_bytes > 0
+
+
+def test_ttl_depends_on_entity_type(tmp_path):
+    clock = Clock()
+    cache = ConversionCache(tmp_path / "cache.sqlite3", clock=clock)
+    cache.set("song", ServiceNameEnum.SPOTIFY, "song", make_result())
+    cache.set("artist", ServiceNameEnum.SPOTIFY, "artist", make_result())
+
+    clock.now += 8 * DAY
+
+    assert cache.get("song", ServiceNameEnum.SPOTIFY) is not None
+    assert cache.get("artist", ServiceNameEnum.SPOTIFY) is None
+    assert cache.purge_expired() == 1
+
+
+def test_converter_consults_cache_first(tmp_path):
+    service = CountingService()
+    converter = Converter(service, service, cache=ConversionCache(tmp_path / "cache.sqlite3"))
+
+    first = converter.convert("https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg?si=abc")
+    second = converter.convert("https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg")
+
+    assert first == second
+    assert service.calls == 2
+
+
+def test_results_serialise_like_the_api_models():
+    result = make_result()
+    result.confidence = 0.93
+    model = result.to_model()
+
+    assert Results.from_json(result.to_json()) == result
+    assert Results.from_json(model.model_dump_json(exclude_none=True)).to_model() == model
+    assert model.results[0].art_url == "/static/images/musical-note.png"
+    assert result.results[0].thumbnail_url == model.results[0].art_url
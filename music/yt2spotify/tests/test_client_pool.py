@@ -0,0 +1,101 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from yt2spotify.services.client_pool import ClientPool, PooledClient
+from yt2spotify.services.factory import MusicServiceFactory, SPOTIFY_BACKEND
+from yt2spotify.services.service_names import ServiceNameEnum
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+        self.calls = 0
+
+    def track(self, track_id):
+        self.calls += 1
+        time.sleep(0.01)
+        return {"id": track_id}
+
+    def tracks(self, tracks):
+        return {"tracks": [self.track(track_id) for track_id in tracks]}
+
+    def close(self):
+        self.closed = True
+
+
+def test_clients_are_reused():
+    created = []
+    pool = ClientPool(lambda: created.append(FakeClient()) or created[-1], size=2)
+
+    for _ in range(5):
+        with pool.lease():
+            pass
+
+    assert len(created) == 1
+
+
+def test_pool_never_exceeds_size():
+    created = []
+    pool = ClientPool(lambda: created.append(FakeClient()) or created[-1], size=3)
+    proxy = PooledClient(pool)
+
+    threads = [threading.Thread(target=proxy.track, args=(str(i),)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 1 <= len(created) <= 3
+    assert sum(client.calls for client in created) == 20
+
+
+def test_checkout_times_out_when_exhausted():
+    pool = ClientPool(FakeClient, size=1)
+    client = pool.checkout()
+
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.05)
+
+    pool.checkin(client)
+    assert pool.checkout(timeout=0.05) is client
+
+
+def test_close_releases_idle_clients():
+    pool = ClientPool(FakeClient, size=2)
+    pool.warm(2)
+    clients = list(pool._idle)
+
+    pool.close()
+
+    assert all(client.closed for client in clients)
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+
+
+def test_factory_shares_clients_between_services():
+    created = []
+    MusicServiceFactory.configure_pool(SPOTIFY_BACKEND, size=1,
+                                       client_factory=lambda: created.append(FakeClient()) or created[-1])
+    try:
+        MusicServiceFactory.startup(ServiceNameEnum.SPOTIFY)
+        for i in range(3):
+            MusicServiceFactory.create(ServiceNameEnum.SPOTIFY).sp_client.track(str(i))
+        assert len(created) == 1
+    finally:
+        MusicServiceFactory.shutdown()
+        MusicServiceFactory._client_factories.pop(SPOTIFY_BACKEND)
+        MusicServiceFactory._pool_sizes.pop(SPOTIFY_BACKEND)
+    assert created[0].closed
+
+
+def test_backends_are_imported_lazily():
+    code = ("import sys, yt2spotify.converter; "
+            "print(any(m in sys.modules for m in ('spotipy', 'ytmusicapi', 'googleapiclient')))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parents[2]).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from yt2spotify.debounce import Debouncer, Superseded
+
+
+def test_only_last_call_in_burst_runs():
+    debouncer = Debouncer(delay=0.05)
+    started = []
+
+    async def convert(query):
+        started.append(query)
+        return query.upper()
+
+    async def run():
+        calls = []
+        for query in ["h", "ht", "https://x"]:
+            calls.append(asyncio.ensure_future(debouncer.run("user", lambda q=query: convert(q))))
+            await asyncio.sleep(0.01)
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert isinstance(results[0], Superseded)
+    assert isinstance(results[1], Superseded)
+    assert results[2] == "HTTPS://X"
+    assert started == ["https://x"]
+    assert debouncer.superseded == 2
+
+
+def test_newer_call_cancels_running_conversion():
+    debouncer = Debouncer(delay=0)
+    finished = []
+
+    async def slow(query):
+        await asyncio.sleep(0.1)
+        finished.append(query)
+        return query
+
+    async def run():
+        first = asyncio.ensure_future(debouncer.run("user", lambda: slow("first")))
+        await asyncio.sleep(0.02)
+        second = await debouncer.run("user", lambda: slow("second"))
+        with pytest.raises(Superseded):
+            await first
+        return second
+
+    assert asyncio.run(run()) == "second"
+    assert finished == ["second"]
+
+
+def test_users_are_independent():
+    debouncer = Debouncer(delay=0.01)
+
+    async def echo(value):
+        return value
+
+    async def run():
+        return await asyncio.gather(debouncer.run(1, lambda: echo("a")), debouncer.run(2, lambda: echo("b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
@@ -0,0 +1,61 @@
+import pytest
+
+from yt2spotify.entities import EntityKey, parse_url
+from yt2spotify.services.service_names import ServiceNameEnum
+
+SPOTIFY = ServiceNameEnum.SPOTIFY
+YOUTUBE_MUSIC = ServiceNameEnum.YOUTUBE_MUSIC
+YOUTUBE = ServiceNameEnum.YOUTUBE_STANDARD
+
+
+@pytest.mark.parametrize("test_url,expected_key",
+    [
+        ("https://open.spotify.com/track/6jBCehpNMkwFVF3dz4nLIW?si=y1dqtIB0SumdJGBqKSASQg&context=spotify%3Asearch%3Aits%2Btricky",
+         EntityKey(SPOTIFY, "song", "6jBCehpNMkwFVF3dz4nLIW")),
+        ("open.spotify.com/intl-de/album/7kjLKy9JLbwM9F7eDQEnd2", EntityKey(SPOTIFY, "album", "7kjLKy9JLbwM9F7eDQEnd2")),
+        ("spotify:artist:66CXWjxzNUsdJxJ2JdwvnR", EntityKey(SPOTIFY, "artist", "66CXWjxzNUsdJxJ2JdwvnR")),
+        ("https://music.youtube.com/watch?v=dGeEuyG_DIc&feature=share", EntityKey(YOUTUBE_MUSIC, "song", "dGeEuyG_DIc")),
+        ("https://music.youtube.com/playlist?list=OLAK5uy_nbZjqOa38wTK9K4tvhOgPfyKdRnXnYT_4&si=ovpniEj_3ETQJTD6",
+         EntityKey(YOUTUBE_MUSIC, "album", "OLAK5uy_nbZjqOa38wTK9K4tvhOgPfyKdRnXnYT_4")),
+        ("https://music.youtube.com/channel/UCoIOOL7QKuBhQHVKL8y7BEQ?si=osCb8S8l7ZmRUPlU",
+         EntityKey(YOUTUBE_MUSIC, "artist", "UCoIOOL7QKuBhQHVKL8y7BEQ")),
+        ("https://music.youtube.com/browse/MPREb_BQZvl3BFGay", EntityKey(YOUTUBE_MUSIC, "album", "MPREb_BQZvl3BFGay")),
+        ("https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ", EntityKey(YOUTUBE, "song", "dQw4w9WgXcQ")),
+        ("https://m.youtube.com/watch?v=dQw4w9WgXcQ", EntityKey(YOUTUBE, "song", "dQw4w9WgXcQ")),
+        ("https://youtu.be/5waF8YR3GmQ?si=abc", EntityKey(YOUTUBE, "song", "5waF8YR3GmQ")),
+        ("https://m.youtube.com/@coldplay", EntityKey(YOUTUBE, "artist", "@coldplay")),
+        ("https://www.youtube.com/channel/UCaziuyHLR37c2jBkHrYSQMA", EntityKey(YOUTUBE, "artist", "UCaziuyHLR37c2jBkHrYSQMA")),
+        ("https://www.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj",
+         EntityKey(YOUTUBE, "album", "PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj")),
+    ]
+)
+def test_parse_url(test_url, expected_key):
+    assert parse_url(test_url) == expected_key
+
+
+@pytest.mark.parametrize("test_url",
+    [
+        "",
+        "hello there",
+        "https://example.com/track/6jBCehpNMkwFVF3dz4nLIW",
+        "https://open.spotify.com/",
+        "https://open.spotify.com/user/spotify",
+        "https://music.youtube.com/watch?list=RDAMVM",
+        "https://www.youtube.com/feed/trending",
+        "https://music.youtube.com/browse/FEmusic_home",
+        "https://www.youtube.com/browse/MPREb_BQZvl3BFGay",
+        "ftp://open.spotify.com/track/6jBCehpNMkwFVF3dz4nLIW",
+        "https://open.spotify.com/track/6jBCehpNMk",  # half-pasted
+        "https://music.youtube.com/watch?v=dGeEu",
+        "https://youtu.be/5waF8",
+        "https://www.youtube.com/channel/UCaziuy",
+    ]
+)
+def test_parse_url_rejects_unsupported(test_url):
+    assert parse_url(test_url) is None
+
+
+def test_key_is_hashable_and_printable():
+    key = parse_url("https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT")
+    assert {key: 1}[EntityKey(SPOTIFY, "song", "4cOdK2wGLETKBW3PvgPWqT")] == 1
+    assert str(key) == "spotify:song:4cOdK2wGLETKBW3PvgPWqT"
@@ -0,0 +1,85 @@
+from benchmarks.fakes import FakeSpotify, FakeYTMusic
+from yt2spotify.converter import Converter
+from yt2spotify.isrc_index import IsrcIndex
+from yt2spotify.models import ResultItem, Results
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.spotify import SpotifyService
+from yt2spotify.services.youtube_music import YoutubeMusicService
+
+
+class YellowSpotify(FakeSpotify):
+    def track(self, track_id, market=None):
+        track = super().track(track_id)
+        # every track is the same recording
+        track["external_ids"] = {"isrc": "GBAYE0000351"}
+        track["name"] = "Yellow"
+        track["artists"] = [{**track["artists"][0], "name": "Coldplay"}]
+        return track
+
+
+class YellowYTMusic(FakeYTMusic):
+    """
+    Finds Yellow first, or only unrelated songs when `found` is False.
+    """
+
+    def __init__(self, found=True):
+        super().__init__()
+        self.found = found
+
+    def search(self, query, filter=None, scope=None, limit=20, ignore_spelling=False):
+        results = super().search(query, filter=filter, scope=scope, limit=limit, ignore_spelling=ignore_spelling)
+        if self.found:
+            coldplay = {"name": "Coldplay", "id": "UCIaFw5VBEK8qaW6nRpx_qnw"}
+            results[0] = {**results[0], "title": "Yellow", "artists": [coldplay]}
+        return results
+
+
+def make_result(url="https://music.youtube.com/watch?v=yKNxeF4KMsY", confidence=0.95):
+    item = ResultItem(url=url, uri=url, description1="Yellow")
+    return Results(results=[item], manual_search_link="https://music.youtube.com/search?q=Yellow",
+                   confidence=confidence)
+
+
+def test_roundtrip_and_persistence(tmp_path):
+    path = tmp_path / "index.sqlite3"
+    index = IsrcIndex(path)
+    index.set("gbaye0000351", ServiceNameEnum.YOUTUBE_MUSIC, make_result())
+    index.close()
+
+    index = IsrcIndex(path)
+    assert index.get("GBAYE0000351", ServiceNameEnum.YOUTUBE_MUSIC) == make_result()
+    assert index.get("GBAYE0000351", ServiceNameEnum.SPOTIFY) is None
+    assert index.stats().hits == 1 and index.stats().entries == 1
+
+
+def test_spotify_params_carry_isrc_and_duration():
+    params = SpotifyService(YellowSpotify()).url_to_search_params(
+        "https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg")
+
+    assert params.isrc == "GBAYE0000351"
+    assert params.duration_ms == 215_000
+
+
+def test_same_recording_skips_search(tmp_path):
+    ytm = YellowYTMusic()
+    converter = Converter(SpotifyService(YellowSpotify()), YoutubeMusicService(ytm),
+                          isrc_index=IsrcIndex(tmp_path / "index.sqlite3"))
+
+    single = converter.convert("https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg")
+    album_track = converter.convert("https://open.spotify.com/track/0000000000000000000000")
+
+    assert album_track == single
+    assert ytm.calls == 1
+
+
+def test_unconfident_matches_are_not_indexed(tmp_path):
+    ytm = YellowYTMusic(found=False)
+    index = IsrcIndex(tmp_path / "index.sqlite3")
+    converter = Converter(SpotifyService(YellowSpotify()), YoutubeMusicService(ytm), isrc_index=index)
+
+    converter.convert("https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg")
+    converter.convert("https://open.spotify.com/track/0000000000000000000000")
+
+    assert ytm.calls == 2
+    assert index.stats().entries == 0
+
@@ -0,0 +1,125 @@
+from yt2spotify.converter import Converter
+from yt2spotify.entities import parse_url
+from yt2spotify.link_graph import LinkGraph
+from yt2spotify.models import ResultItem, Results, SearchParams
+from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.services.service_names import ServiceNameEnum
+
+SPOTIFY = "https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg"
+YTM = "https://music.youtube.com/watch?v=yKNxeF4KMsY"
+YOUTUBE = "https://www.youtube.com/watch?v=yKNxeF4KMsY"
+YOUTUBE_UPLOAD = "https://www.youtube.com/watch?v=1MwjX4dG72s"
+YELLOW = SearchParams(name="Yellow", artist="Coldplay", album="Parachutes", search_type_hint="song")
+SPOTIFY_ALBUM = "https://open.spotify.com/album/6ZG5lRT77aJ3btmArcykra"
+# YouTube Music search links albums to their browse pages
+YTM_ALBUM = "https://music.youtube.com/browse/MPREb_BQZvl3BFGay"
+PARACHUTES = SearchParams(artist="Coldplay", album="Parachutes", year="2000", search_type_hint="album")
+
+
+def item(url: str) -> ResultItem:
+    return ResultItem(url=url, uri=url, description1="Yellow", description2="Parachutes (2000)",
+                      description3="Coldplay", description4="Track")
+
+
+def album_item(url: str) -> ResultItem:
+    return ResultItem(url=url, uri=url, description1="Parachutes", description2="2000", description3="Coldplay",
+                      description4="Album")
+
+
+class YellowService(MusicService):
+    """
+    Finds Yellow (or Parachutes, with `album`) at `url` and counts the calls it gets.
+    """
+
+    def __init__(self, name: ServiceNameEnum, url: str, album: bool = False):
+        self.name = name
+        self.url = url
+        self.album = album
+        self.calls = 0
+
+    def url_to_search_params(self, url: str) -> SearchParams:
+        self.calls += 1
+        return PARACHUTES if self.album else YELLOW
+
+    def search_with_params(self, params: SearchParams, limit: int = 10) -> Results:
+        self.calls += 1
+        result = album_item(self.url) if self.album else item(self.url)
+        return Results(results=[result], manual_search_link=self.manual_search_link(params))
+
+    def manual_search_link(self, params: SearchParams) -> str:
+        return f"https://example.com/{self.name.value}/search?q=Coldplay"
+
+
+def test_links_are_recorded_both_ways(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    graph = LinkGraph(path)
+    graph.set(parse_url(SPOTIFY), item(SPOTIFY), parse_url(YTM), item(YTM), 0.95,
+              source_search_link="https://open.spotify.com/search/Yellow Coldplay",
+              target_search_link="https://music.youtube.com/search?q=Yellow+Coldplay")
+    graph.close()
+
+    reopened = LinkGraph(path)
+    assert reopened.get(parse_url(SPOTIFY), ServiceNameEnum.YOUTUBE_MUSIC).results[0].url == YTM
+    assert reopened.get(parse_url(YTM), ServiceNameEnum.SPOTIFY).results[0].url == SPOTIFY
+    # the same video on YouTube
+    assert reopened.get(parse_url(YOUTUBE), ServiceNameEnum.SPOTIFY).results[0].url == SPOTIFY
+    assert reopened.get(parse_url(SPOTIFY), ServiceNameEnum.YOUTUBE_YTM).results[0].url == YOUTUBE
+    assert (reopened.get(parse_url(SPOTIFY), ServiceNameEnum.YOUTUBE_YTM).manual_search_link
+            == "https://www.youtube.com/results?search_query=Yellow+Coldplay")
+    assert reopened.get(parse_url(YTM), ServiceNameEnum.SPOTIFY).manual_search_link.startswith("https://open.spotify")
+    assert reopened.get(parse_url(SPOTIFY), ServiceNameEnum.SPOTIFY) is None
+    assert reopened.stats().hits == 6
+
+
+def test_links_are_joined_transitively(tmp_path):
+    graph = LinkGraph(tmp_path / "cache.sqlite3")
+    # a fan upload converted to the official track, which is later converted to Spotify
+    graph.set(parse_url(YOUTUBE_UPLOAD), item(YOUTUBE_UPLOAD), parse_url(YTM), item(YTM), 0.9)
+    graph.set(parse_url(YTM), item(YTM), parse_url(SPOTIFY), item(SPOTIFY), 0.95)
+
+    linked = graph.get(parse_url(YOUTUBE_UPLOAD), ServiceNameEnum.SPOTIFY)
+    assert linked.results[0].url == SPOTIFY
+    assert abs(linked.confidence - 0.9 * 0.95) < 1e-9
+    # the official video is linked more confidently than the upload
+    assert graph.get(parse_url(SPOTIFY), ServiceNameEnum.YOUTUBE_STANDARD).results[0].url == YOUTUBE
+
+
+def test_unconfident_links_are_not_recorded(tmp_path):
+    graph = LinkGraph(tmp_path / "cache.sqlite3", min_confidence=0.8)
+    graph.set(parse_url(SPOTIFY), item(SPOTIFY), parse_url(YTM), item(YTM), 0.6)
+
+    assert graph.get(parse_url(YTM), ServiceNameEnum.SPOTIFY) is None
+    assert graph.stats().entries == 0
+
+
+def test_reverse_conversion_needs_no_service_calls(tmp_path):
+    graph = LinkGraph(tmp_path / "cache.sqlite3")
+    spotify = YellowService(ServiceNameEnum.SPOTIFY, SPOTIFY)
+    ytmusic = YellowService(ServiceNameEnum.YOUTUBE_MUSIC, YTM)
+
+    assert Converter(spotify, ytmusic, link_graph=graph).convert(SPOTIFY).results[0].url == YTM
+    calls = spotify.calls + ytmusic.calls
+
+    reverse = Converter(ytmusic, spotify, link_graph=graph).convert(YTM, limit=1)
+    assert reverse.results[0].url == SPOTIFY
+    assert reverse.manual_search_link == "https://example.com/spotify/search?q=Coldplay"
+    assert spotify.calls + ytmusic.calls == calls
+
+    # the graph holds one linked entity, so callers wanting more candidates still search
+    assert len(Converter(ytmusic, spotify, link_graph=graph).convert(YTM, limit=3).results) == 1
+    assert spotify.calls + ytmusic.calls == calls + 2
+
+
+def test_albums_are_linked_through_their_browse_pages(tmp_path):
+    graph = LinkGraph(tmp_path / "cache.sqlite3")
+    spotify = YellowService(ServiceNameEnum.SPOTIFY, SPOTIFY_ALBUM, album=True)
+    ytmusic = YellowService(ServiceNameEnum.YOUTUBE_MUSIC, YTM_ALBUM, album=True)
+
+    assert Converter(spotify, ytmusic, link_graph=graph).convert(SPOTIFY_ALBUM).results[0].url == YTM_ALBUM
+    calls = spotify.calls + ytmusic.calls
+
+    assert Converter(ytmusic, spotify, link_graph=graph).convert(YTM_ALBUM, 1).results[0].url == SPOTIFY_ALBUM
+    assert Converter(spotify, ytmusic, link_graph=graph).convert(SPOTIFY_ALBUM, 1).results[0].url == YTM_ALBUM
+    assert spotify.calls + ytmusic.calls == calls
+    # browse IDs are YouTube Music's own, so no YouTube link is made up for them
+    assert graph.get(parse_url(SPOTIFY_ALBUM), ServiceNameEnum.YOUTUBE_STANDARD) is None
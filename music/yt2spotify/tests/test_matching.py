@@ -0,0 +1,52 @@
+from benchmarks.bench_matching import CASES, track
+from yt2spotify.matching import best_match, normalize, rank, score
+from yt2spotify.models import Results, SearchParams
+
+YELLOW = SearchParams(name="Yellow", artist="Coldplay", album="Parachutes", search_type_hint="song",
+                      duration_ms=266_000)
+
+
+def test_normalize_strips_decorations():
+    assert normalize("Déjà Vu (feat. JAY-Z) [Remastered 2011]") == "deja vu"
+    assert normalize("Coldplay - Topic") == "coldplay"
+    assert normalize("Coldplay - Yellow (Official Video)") == "coldplay yellow"
+
+
+def test_other_versions_score_lower():
+    studio = score(YELLOW, track("Yellow", "Parachutes", "Coldplay", 267))
+    live = score(YELLOW, track("Yellow - Live", "Live 2003", "Coldplay", 290))
+    cover = score(YELLOW, track("Yellow", "Acoustic Covers", "Some Band", 240))
+
+    assert studio > 0.95
+    assert live < 0.5 and cover < 0.7
+
+
+def test_scoring_stops_at_confident_match():
+    scored = []
+    candidates = [track("Yellow", "Parachutes", "Coldplay", 266)] + [track(f"Other {i}", "x", "y") for i in range(9)]
+
+    class Recording(list):
+        def __iter__(self):
+            for item in super().__iter__():
+                scored.append(item)
+                yield item
+
+    match = best_match(YELLOW, Recording(candidates))
+
+    assert match.index == 0
+    assert len(scored) == 1
+
+
+def test_rank_moves_best_first_with_confidence():
+    live = track("Yellow (Live)", "Live", "Coldplay", 290)
+    studio = track("Yellow", "Parachutes", "Coldplay", 266)
+    result = rank(YELLOW, Results(results=[live, studio], manual_search_link=""))
+
+    assert result.results == [studio, live]
+    assert result.confidence == 1.0
+
+
+def test_labelled_set_is_ranked_right():
+    for case in CASES:
+        result = rank(case.params, Results(results=case.candidates, manual_search_link=""))
+        assert result.results[0] is case.candidates[case.correct], case.name
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+from telegram import Chat, Message, MessageEntity
+
+from message_links import convert_links, extract_links
+
+SONG = "https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT"
+ALBUM = "https://music.youtube.com/playlist?list=OLAK5uy_kRWJ7VDJtfvkE9KLCMrsqcDx_ZSvfA4Ks"
+
+
+def make_message(text: str, entities=()) -> Message:
+    return Message(message_id=1, date=None, chat=Chat(id=1, type=Chat.PRIVATE), text=text, entities=entities)
+
+
+def url_entity(text: str, url: str) -> MessageEntity:
+    return MessageEntity(MessageEntity.URL, offset=text.index(url), length=len(url))
+
+
+def test_links_come_from_entities():
+    text = f"here are two: {SONG} and {ALBUM}!"
+    message = make_message(text, [url_entity(text, SONG), url_entity(text, ALBUM)])
+
+    assert extract_links(message) == [SONG, ALBUM]
+
+
+def test_text_links_use_their_target():
+    text = "listen to this"
+    message = make_message(text, [MessageEntity(MessageEntity.TEXT_LINK, offset=10, length=4, url=SONG)])
+
+    assert extract_links(message) == [SONG]
+
+
+def test_same_entity_is_converted_once():
+    other_link = f"{SONG}?si=abcdef"
+    text = f"{SONG} {other_link}"
+    message = make_message(text, [url_entity(text, SONG), MessageEntity(MessageEntity.URL, len(SONG) + 1,
+                                                                        len(other_link))])
+
+    assert extract_links(message) == [SONG]
+
+
+def test_message_without_entities_is_one_link():
+    assert extract_links(make_message(" spotify:track:4cOdK2wGLETKBW3PvgPWqT ")) == [
+        "spotify:track:4cOdK2wGLETKBW3PvgPWqT"]
+
+
+def test_links_convert_concurrently_up_to_limit():
+    active = 0
+    max_active = 0
+
+    async def convert(link):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        if link == "bad":
+            raise ValueError(link)
+        return link.upper()
+
+    start = time.perf_counter()
+    results = asyncio.run(convert_links(["a", "bad", "c", "d"], convert, limit=2))
+
+    assert results[0] == "A" and results[2:] == ["C", "D"]
+    assert isinstance(results[1], ValueError)
+    assert max_active == 2
+    assert time.perf_counter() - start < 0.15
@@ -0,0 +1,100 @@
+import pytest
+
+from benchmarks.fakes import FakeSpotify
+from yt2spotify.cache import DAY
+from yt2spotify.converter import Converter
+from yt2spotify.errors import NotFoundError
+from yt2spotify.models import Results, SearchParams
+from yt2spotify.negative_cache import NO_RESULTS, NOT_FOUND, BloomFilter, NegativeCache
+from yt2spotify.services.abstract_service import MusicService
+from yt2spotify.services.service_names import FormattedServiceNameEnum, ServiceNameEnum
+from yt2spotify.services.spotify import SpotifyService
+from yt2spotify.services.spotify_batch import LookupNotFound
+
+DEAD = "https://music.youtube.com/watch?v=aaaaaaaaaaa"
+OBSCURE = "https://music.youtube.com/watch?v=bbbbbbbbbbb"
+SPOTIFY_KEY = "spotify:song:3AJwUDP919kvQ9QcozQPxg"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingService(MusicService):
+    """
+    Acts as YouTube Music with one deleted song and as a Spotify that finds nothing, counting calls.
+    """
+
+    def __init__(self, name: ServiceNameEnum):
+        self.name = name
+        self.calls = 0
+
+    def url_to_search_params(self, url: str) -> SearchParams:
+        self.calls += 1
+        if url == DEAD:
+            raise NotFoundError("song", FormattedServiceNameEnum.YOUTUBE_MUSIC)
+        return SearchParams(name="Unknown", artist="Nobody", search_type_hint="song")
+
+    def search_with_params(self, params: SearchParams, limit: int = 10) -> Results:
+        self.calls += 1
+        return Results(manual_search_link="https://open.spotify.com/search/Unknown")
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"spotify:song:{i}")
+
+    assert all(f"spotify:song:{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"youtube_music:song:{i}" in bloom for i in range(10_000))
+    assert false_positives < 200
+    assert bloom.size_bytes < 12_500
+
+
+def test_failures_expire_per_error_class():
+    clock = Clock()
+    cache = NegativeCache(capacity=1000, ttls={NOT_FOUND: DAY, NO_RESULTS: DAY / 4}, clock=clock)
+    cache.add(NOT_FOUND, SPOTIFY_KEY, ServiceNameEnum.YOUTUBE_MUSIC)
+    cache.add(NO_RESULTS, "youtube_music:song:bbbbbbbbbbb", ServiceNameEnum.SPOTIFY)
+
+    # failures are only repeated for the target they happened on
+    assert cache.get(SPOTIFY_KEY, ServiceNameEnum.YOUTUBE_MUSIC) == NOT_FOUND
+    assert cache.get(SPOTIFY_KEY, ServiceNameEnum.YOUTUBE_STANDARD) is None
+    assert cache.get("youtube_music:song:bbbbbbbbbbb", ServiceNameEnum.SPOTIFY) == NO_RESULTS
+    assert cache.get("youtube_music:song:bbbbbbbbbbb", ServiceNameEnum.YOUTUBE_STANDARD) is None
+
+    clock.now += DAY / 4
+    assert cache.get("youtube_music:song:bbbbbbbbbbb", ServiceNameEnum.SPOTIFY) is None
+    assert cache.get(SPOTIFY_KEY, ServiceNameEnum.YOUTUBE_MUSIC) == NOT_FOUND
+    clock.now += DAY
+    assert cache.get(SPOTIFY_KEY, ServiceNameEnum.YOUTUBE_MUSIC) is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (3, 4)
+
+
+def test_failed_conversions_are_not_repeated():
+    ytmusic = FailingService(ServiceNameEnum.YOUTUBE_MUSIC)
+    spotify = FailingService(ServiceNameEnum.SPOTIFY)
+    converter = Converter(ytmusic, spotify, negative_cache=NegativeCache(capacity=1000))
+
+    for _ in range(3):
+        with pytest.raises(NotFoundError) as error:
+            converter.convert(DEAD)
+        assert str(error.value) == "Song not found on YouTube Music"
+        assert converter.convert(OBSCURE).results == []
+    assert (ytmusic.calls, spotify.calls) == (2, 1)
+
+
+def test_spotify_lookup_failures_are_not_found():
+    class Deleted(FakeSpotify):
+        def track(self, track_id):
+            raise LookupNotFound(track_id)
+
+    with pytest.raises(NotFoundError) as error:
+        SpotifyService(Deleted()).url_to_search_params("https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg")
+    assert str(error.value) == "Song not found on Spotify"
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeSpotify, FakeYTMusic, FakeYoutubeHttp
+from yt2spotify.converter import AsyncConverter
+from yt2spotify.entities import EntityKey, is_playlist, parse_url
+from yt2spotify.models import SearchParams
+from yt2spotify.playlist import convert_tracks
+from yt2spotify.services.client_pool import ClientPool
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.spotify import SpotifyService
+from yt2spotify.services.threaded import ThreadedMusicService
+from yt2spotify.services.youtube_client import build_youtube_client
+from yt2spotify.services.youtube_music import YoutubeMusicService
+from yt2spotify.services.youtube_standard import YoutubeService
+from yt2spotify.services.youtube_ytm import YoutubeYTMService
+
+SPOTIFY_PLAYLIST = "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M"
+YTM_PLAYLIST = "https://music.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj"
+YT_PLAYLIST = "https://www.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj"
+
+
+async def tracks(count: int):
+    for i in range(count):
+        yield SearchParams(name=str(i), search_type_hint="song")
+
+
+def test_playlist_keys():
+    assert parse_url(SPOTIFY_PLAYLIST) == EntityKey(ServiceNameEnum.SPOTIFY, "playlist", "37i9dQZF1DXcBWIGoYBM5M")
+    assert is_playlist(parse_url(SPOTIFY_PLAYLIST))
+    assert is_playlist(parse_url(YTM_PLAYLIST))
+    assert not is_playlist(parse_url("https://music.youtube.com/playlist?list=OLAK5uy_nbZjqOa38wTK9K4tvhOgPfyKdRnXnYT_4"))
+    assert not is_playlist(parse_url("https://open.spotify.com/album/6jBCehpNMkwFVF3dz4nLIW"))
+    assert not is_playlist(parse_url("https://music.youtube.com/browse/MPREb_BQZvl3BFGay"))
+
+
+def test_tracks_convert_in_order_with_bounded_concurrency():
+    active = 0
+    max_active = 0
+
+    async def convert(params):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        # later tracks finish first
+        await asyncio.sleep(0.01 * (5 - int(params.name) % 5))
+        active -= 1
+        if params.name == "3":
+            raise ValueError(params.name)
+        return params.name
+
+    async def run():
+        return [result async for result in convert_tracks(tracks(20), convert, concurrency=4)]
+
+    results = asyncio.run(run())
+
+    assert [r for r in results if not isinstance(r, Exception)] == [str(i) for i in range(20) if i != 3]
+    assert isinstance(results[3], ValueError)
+    assert max_active <= 4
+
+
+def test_stopping_early_cancels_pending_tracks():
+    started = []
+
+    async def convert(params):
+        started.append(params.name)
+        await asyncio.sleep(1)
+
+    async def run():
+        stream = convert_tracks(tracks(100), convert, concurrency=3)
+        await stream.asend(None)
+        await stream.aclose()
+
+    asyncio.run(asyncio.wait_for(run(), 2))
+    assert len(started) <= 4
+
+
+@pytest.mark.parametrize("service, url", [
+    (SpotifyService(FakeSpotify(playlist_length=250)), SPOTIFY_PLAYLIST),
+    (YoutubeMusicService(FakeYTMusic(playlist_length=250)), YTM_PLAYLIST),
+    (YoutubeService(build_youtube_client("key", ClientPool(lambda: FakeYoutubeHttp(playlist_length=250), 1))),
+     YT_PLAYLIST),
+])
+def test_services_page_through_playlists(service, url):
+    params = list(service.playlist_tracks(url))
+
+    assert len(params) == 250
+    assert all(p.search_type_hint == "song" and p.name and p.artist for p in params)
+
+
+def test_ytm_playlists_are_capped():
+    service = YoutubeMusicService(FakeYTMusic(playlist_length=YoutubeMusicService.max_playlist_tracks + 500))
+
+    assert len(list(service.playlist_tracks(YTM_PLAYLIST))) == YoutubeMusicService.max_playlist_tracks
+
+
+@pytest.mark.parametrize("url", [YT_PLAYLIST, YTM_PLAYLIST])
+def test_long_youtube_playlists_continue_through_the_data_api(url):
+    length = YoutubeMusicService.max_playlist_tracks + 120
+    http = FakeYoutubeHttp(playlist_length=length)
+    yt_service = YoutubeService(build_youtube_client("key", ClientPool(lambda: http, 1)))
+    service = YoutubeYTMService(YoutubeMusicService(FakeYTMusic(playlist_length=length)), yt_service)
+
+    names = [params.name for params in service.playlist_tracks(url)]
+
+    # in order, with nothing listed twice or dropped at the cap
+    data_api = YoutubeService(build_youtube_client(
+        "key", ClientPool(lambda: FakeYoutubeHttp(playlist_length=length), 1)))
+    assert names == [params.name for params in data_api.playlist_tracks(YT_PLAYLIST)]
+    # 20 pages walked for their tokens, then 3 pages read
+    assert http.calls == 23
+
+
+def test_youtube_playlists_stream_from_the_data_api_when_ytm_fails():
+    class Private(FakeYTMusic):
+        def get_playlist(self, playlistId, limit=100, related=False, suggestions_limit=0):
+            raise Exception("playlist not available")
+
+    http = FakeYoutubeHttp(playlist_length=250)
+    yt_service = YoutubeService(build_youtube_client("key", ClientPool(lambda: http, 1)))
+    tracks = YoutubeYTMService(YoutubeMusicService(Private()), yt_service).playlist_tracks(YT_PLAYLIST)
+
+    assert next(tracks).name
+    # pages are fetched as the tracks are consumed
+    assert http.calls == 1
+    assert len(list(tracks)) == 249
+    assert http.calls == 5
+
+
+def test_playlist_converts_end_to_end():
+    spotify = FakeSpotify(playlist_length=120)
+    converter = AsyncConverter(ThreadedMusicService(SpotifyService(spotify)),
+                               ThreadedMusicService(YoutubeMusicService(FakeYTMusic())))
+
+    async def run():
+        return [result async for result in converter.convert_playlist(SPOTIFY_PLAYLIST, concurrency=8)]
+
+    results = asyncio.run(run())
+
+    assert len(results) == 120
+    assert all(result.results[0].url.startswith("https://music.youtube.com/watch?v=") for result in results)
@@ -0,0 +1,107 @@
+import asyncio
+
+from yt2spotify.cache import DAY, ConversionCache
+from yt2spotify.entities import EntityKey, parse_url
+from yt2spotify.models import ResultItem, Results
+from yt2spotify.prewarm import Prewarmer, TrafficLog, ytmusic_chart_seeds
+from yt2spotify.quota import QuotaBudget
+from yt2spotify.services.service_names import ServiceNameEnum
+
+POPULAR = parse_url("https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg")
+OCCASIONAL = parse_url("https://music.youtube.com/watch?v=yKNxeF4KMsY")
+VIDEO = parse_url("https://www.youtube.com/watch?v=1MwjX4dG72s")
+HANDLE = parse_url("https://www.youtube.com/@coldplay")
+CHART_HIT = EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, "song", "oT79YlRtXDg")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def target_for(key: EntityKey) -> ServiceNameEnum:
+    return ServiceNameEnum.YOUTUBE_MUSIC if key.service == ServiceNameEnum.SPOTIFY else ServiceNameEnum.SPOTIFY
+
+
+def result(url: str) -> Results:
+    return Results(results=[ResultItem(url=url, uri=url, description1="Yellow")])
+
+
+def test_traffic_log_ranks_recent_requests(tmp_path):
+    clock = Clock()
+    traffic = TrafficLog(tmp_path / "cache.sqlite3", window_days=7, clock=clock)
+    traffic.record(OCCASIONAL)
+    clock.now += 8 * DAY
+    for _ in range(3):
+        traffic.record(POPULAR)
+    traffic.record(VIDEO)
+
+    assert traffic.top(10) == [POPULAR, VIDEO]
+    assert traffic.top(1) == [POPULAR]
+    assert traffic.purge_expired() == 1
+
+
+def test_chart_seeds():
+    class Charts:
+        def get_charts(self, country):
+            return {"videos": {"items": [{"videoId": CHART_HIT.id}]}, "trending": None,
+                    "artists": {"items": [{"browseId": "UCdFt4Cvhr7Okaxo6hZg5K8g"}]}}
+
+    assert ytmusic_chart_seeds(Charts()) == [
+        CHART_HIT, EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, "artist", "UCdFt4Cvhr7Okaxo6hZg5K8g")]
+
+
+def test_prewarmer_converts_uncached_seeds(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ConversionCache(path)
+    traffic = TrafficLog(path)
+    for key in (POPULAR, POPULAR, POPULAR, VIDEO, VIDEO, OCCASIONAL, HANDLE):
+        traffic.record(key)
+    cache.set(str(OCCASIONAL), ServiceNameEnum.SPOTIFY, "song", result("https://open.spotify.com/track/x"))
+    quota = QuotaBudget(path, daily_limit=1000, reserve=100)
+    converted = []
+
+    async def convert(url, target):
+        converted.append((parse_url(url), target))
+        if parse_url(url) == CHART_HIT:
+            raise RuntimeError("no match")
+
+    def failing_source():
+        raise ConnectionError("charts unavailable")
+
+    prewarmer = Prewarmer(convert, target_for, cache, traffic, seed_sources=[lambda: [CHART_HIT, POPULAR],
+                                                                             failing_source],
+                          rate=1000, quota=quota, quota_headroom=2000)
+    asyncio.run(prewarmer.run_once())
+
+    # videos are looked up through YouTube Music, handles only through the Data API
+    assert converted == [(POPULAR, ServiceNameEnum.YOUTUBE_MUSIC), (VIDEO, ServiceNameEnum.SPOTIFY),
+                         (CHART_HIT, ServiceNameEnum.SPOTIFY)]
+    stats = prewarmer.stats()
+    assert (stats.runs, stats.warmed, stats.cached, stats.deferred, stats.errors) == (1, 2, 1, 1, 1)
+    # checking the cache is not a cache hit
+    assert cache.stats().hits == 0
+
+
+def test_prewarmer_waits_while_users_are_converting(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    traffic = TrafficLog(path)
+    traffic.record(POPULAR)
+    busy_checks = []
+    converted = []
+
+    def busy():
+        busy_checks.append(len(converted))
+        return len(busy_checks) < 3
+
+    async def convert(url, target):
+        converted.append(url)
+
+    prewarmer = Prewarmer(convert, target_for, ConversionCache(path), traffic, rate=1000, busy=busy, idle_poll=0)
+    asyncio.run(prewarmer.run_once())
+
+    assert busy_checks == [0, 0, 0]
+    assert len(converted) == 1
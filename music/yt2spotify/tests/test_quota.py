@@ -0,0 +1,174 @@
+from datetime import datetime
+
+import httplib2
+import pytest
+
+from benchmarks.fakes import FakeYTMusic, FakeYoutubeHttp
+from yt2spotify.errors import NotFoundError
+from yt2spotify.models import SearchParams
+from yt2spotify.quota import QUOTA_TIMEZONE, QuotaBudget
+from yt2spotify.services.client_pool import ClientPool, PooledClient
+from yt2spotify.services.youtube_client import build_youtube_client
+from yt2spotify.services.youtube_music import YoutubeMusicService
+from yt2spotify.services.youtube_standard import YoutubeService
+from yt2spotify.services.youtube_ytm import YoutubeYTMService
+
+
+def pacific(*args) -> float:
+    return datetime(*args, tzinfo=QUOTA_TIMEZONE).timestamp()
+
+
+def youtube_service(quota, ytm=None, http=None):
+    http = http or FakeYoutubeHttp()
+    client = build_youtube_client("key", ClientPool(lambda: http, size=1), quota)
+    ytm = ytm or FakeYTMusic()
+    return YoutubeService(client, quota=quota, ytm_fallback=YoutubeMusicService(ytm)), http, ytm
+
+
+def youtube_ytm_service(quota, ytm=None, http=None):
+    service, http, ytm = youtube_service(quota, ytm, http)
+    return YoutubeYTMService(service.ytm_fallback, service), http, ytm
+
+
+def test_costs_are_recorded_per_method():
+    quota = QuotaBudget(daily_limit=1000, reserve=0)
+
+    assert quota.record("youtube.search.list") == 100
+    assert quota.record("youtube.videos.list") == 1
+
+    assert quota.spent() == 101
+    assert quota.remaining() == 899
+
+
+def test_budget_resets_at_pacific_midnight():
+    now = pacific(2024, 3, 1, 23, 59)
+    quota = QuotaBudget(daily_limit=1000, reserve=0, clock=lambda: now)
+    quota.record("youtube.search.list")
+    assert quota.stats().day == "2024-03-01"
+
+    now = pacific(2024, 3, 2, 0, 1)
+    assert quota.spent() == 0
+    assert quota.stats().day == "2024-03-02"
+
+
+def test_budget_persists_across_instances(tmp_path):
+    path = tmp_path / "quota.sqlite3"
+    quota = QuotaBudget(path)
+    quota.record("youtube.search.list")
+    quota.close()
+
+    assert QuotaBudget(path).spent() == 100
+
+
+def test_reserve_is_kept_back():
+    quota = QuotaBudget(daily_limit=650, reserve=500)
+
+    assert quota.can_call("youtube.search.list")
+    quota.record("youtube.search.list")
+    assert not quota.can_call("youtube.search.list")
+    assert quota.can_call("youtube.videos.list")
+
+
+def test_api_calls_are_accounted():
+    quota = QuotaBudget(reserve=0)
+    service, http, ytm = youtube_service(quota)
+
+    params = service.url_to_search_params("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    service.search_with_params(params)
+
+    assert quota.spent() == 101
+    assert http.calls == 2 and ytm.calls == 0
+
+
+def test_search_reroutes_to_ytm_when_budget_is_low():
+    quota = QuotaBudget(daily_limit=550, reserve=500)
+    service, http, ytm = youtube_service(quota)
+
+    result = service.search_with_params(SearchParams(name="Song", artist="Artist", search_type_hint="song"))
+
+    assert http.calls == 0 and ytm.calls == 1
+    assert quota.spent() == 0
+    assert result.results[0].url.startswith("https://youtube.com/watch?v=")
+    assert "results?search_query=" in result.manual_search_link
+
+
+def test_lookups_reroute_to_ytm_when_budget_is_exhausted():
+    quota = QuotaBudget(daily_limit=500, reserve=500)
+    service, http, ytm = youtube_service(quota)
+
+    params = service.url_to_search_params("https://youtu.be/dQw4w9WgXcQ")
+
+    assert http.calls == 0 and ytm.calls == 1
+    assert params.search_type_hint == "song"
+    assert params.name
+
+
+def test_lookups_ytm_cannot_answer_keep_the_data_api():
+    quota = QuotaBudget(daily_limit=500, reserve=500)
+    service, http, ytm = youtube_service(quota)
+
+    params = service.url_to_search_params("https://www.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj")
+
+    assert http.calls == 1 and ytm.calls == 0
+    assert params.search_type_hint == "album"
+
+
+def test_youtube_links_are_looked_up_without_quota():
+    quota = QuotaBudget(reserve=0)
+    service, http, ytm = youtube_ytm_service(quota)
+
+    for url in ("https://youtu.be/dQw4w9WgXcQ", "https://m.youtube.com/channel/UCaziuyHLR37c2jBkHrYSQMA",
+                "https://www.youtube.com/playlist?list=OLAK5uy_mbiRc-WQKXNRCfAeZBsoA-hILP3Oeu2WU"):
+        service.url_to_search_params(url)
+    tracks = service.playlist_tracks("https://www.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj")
+    assert len(list(tracks)) == ytm.playlist_length
+    assert http.calls == 0 and quota.spent() == 0
+
+    # handles and user playlists only resolve through the Data API
+    service.url_to_search_params("https://www.youtube.com/@coldplay")
+    service.url_to_search_params("https://www.youtube.com/playlist?list=PLFAcddgaFN8zqIJrTakvM9qWnR7iIrXnj")
+    assert http.calls == 2 and quota.spent() == 2
+
+
+def test_data_api_answers_what_ytm_cannot_resolve():
+    class AgeRestricted(FakeYTMusic):
+        def get_song(self, videoId, signatureTimestamp=None):
+            self._network()
+            return {"playabilityStatus": {"status": "LOGIN_REQUIRED"}}
+
+    quota = QuotaBudget(reserve=0)
+    service, http, ytm = youtube_ytm_service(quota, AgeRestricted())
+
+    params = service.url_to_search_params("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    assert params.name.startswith("Videos ")
+    assert ytm.calls == 1 and http.calls == 1 and quota.spent() == 1
+
+
+class NotOnYTMusic(FakeYTMusic):
+    def get_song(self, videoId, signatureTimestamp=None):
+        self._network()
+        raise Exception("Video not found")
+
+
+def test_videos_missing_on_ytm_are_looked_up_on_youtube():
+    quota = QuotaBudget(reserve=0)
+    service, http, ytm = youtube_ytm_service(quota, NotOnYTMusic())
+
+    params = service.url_to_search_params("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    assert params.name.startswith("Videos ")
+    assert ytm.calls == 1 and http.calls == 1
+
+
+def test_videos_missing_everywhere_are_not_found():
+    class Deleted(FakeYoutubeHttp):
+        def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+            self._network()
+            return httplib2.Response({"status": "200", "content-type": "application/json"}), b"{}"
+
+    service, http, ytm = youtube_ytm_service(QuotaBudget(reserve=0), NotOnYTMusic(), Deleted())
+
+    with pytest.raises(NotFoundError) as error:
+        service.url_to_search_params("https://youtu.be/dQw4w9WgXcQ")
+    assert str(error.value) == "Song not found on YouTube"
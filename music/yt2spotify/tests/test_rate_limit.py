@@ -0,0 +1,160 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import spotipy
+
+from yt2spotify.services.rate_limit import RateLimitedSpotify, TokenBucket, without_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after=None):
+        self.http_status = 429
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+
+class FlakySpotify:
+    auth_manager = "auth"
+
+    def __init__(self, failures, retry_after="2"):
+        self.failures = failures
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def track(self, track_id):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RateLimited(self.retry_after)
+        return {"id": track_id}
+
+
+def test_burst_is_free_then_calls_are_spaced():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=3, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(0.1)
+    assert waits[4] == pytest.approx(0.1)
+    stats = bucket.stats()
+    assert stats.calls == 5 and stats.throttled == 2
+    assert stats.wait_seconds == pytest.approx(0.2)
+
+
+def test_tokens_refill_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+
+    clock.now += 1
+
+    assert bucket.acquire() == 0
+
+
+def test_pause_holds_back_callers():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+
+    bucket.pause(3)
+
+    assert bucket.acquire() == pytest.approx(3)
+    assert bucket.stats().rate_limited == 1
+
+
+def test_concurrent_callers_queue_instead_of_failing():
+    bucket = TokenBucket(rate=200, capacity=1)
+    start = time.monotonic()
+
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 19 calls beyond the burst at 200/s
+    assert time.monotonic() - start >= 0.09
+    assert bucket.stats().calls == 20
+
+
+def test_retry_after_is_honoured():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, capacity=10, clock=clock, sleep=clock.sleep)
+    client = RateLimitedSpotify(FlakySpotify(failures=1, retry_after="2"), bucket)
+
+    assert client.track("abc") == {"id": "abc"}
+    assert clock.now == pytest.approx(2)
+    assert bucket.stats().rate_limited == 1
+
+
+def test_gives_up_after_max_retries():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, capacity=10, clock=clock, sleep=clock.sleep)
+    spotify = FlakySpotify(failures=10, retry_after=None)
+    client = RateLimitedSpotify(spotify, bucket, max_retries=2)
+
+    with pytest.raises(RateLimited):
+        client.track("abc")
+    assert spotify.calls == 3
+    assert client.auth_manager == "auth"
+
+
+class RateLimitedApi(BaseHTTPRequestHandler):
+    """
+    Answers the first request with a 429 and Retry-After, later ones with a track.
+    """
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        if type(self).requests == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "3")
+            body = b'{"error": {"status": 429, "message": "API rate limit exceeded"}}'
+        else:
+            self.send_response(200)
+            body = json.dumps({"id": "abc"}).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_spotipy_leaves_429s_to_the_shared_bucket():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RateLimitedApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=100, capacity=10, clock=clock, sleep=clock.sleep)
+        spotify = spotipy.Spotify(auth="token", status_forcelist=(500, 502, 503, 504))
+        spotify.prefix = f"http://127.0.0.1:{server.server_port}/"
+        client = RateLimitedSpotify(without_retry_after(spotify), bucket)
+
+        start = time.monotonic()
+        assert client.track("abc") == {"id": "abc"}
+
+        # one 429, not retried by urllib3, and its Retry-After paused the bucket instead of the thread
+        assert RateLimitedApi.requests == 2
+        assert clock.now == pytest.approx(3)
+        assert time.monotonic() - start < 2
+        assert bucket.stats().rate_limited == 1
+    finally:
+        server.shutdown()
+        server.server_close()
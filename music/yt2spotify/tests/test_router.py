@@ -0,0 +1,38 @@
+import pytest
+
+from yt2spotify.entities import EntityKey
+from yt2spotify.router import LinkRouter, Route
+from yt2spotify.services.factory import MusicServiceFactory
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.services.spotify import SpotifyService
+from yt2spotify.services.youtube_standard import YoutubeService
+from yt2spotify.services.youtube_ytm import YoutubeYTMService
+
+YOUTUBE = ServiceNameEnum.YOUTUBE_STANDARD
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("https://open.spotify.com/intl-de/track/6jBCehpNMkwFVF3dz4nLIW?si=y1dqtIB0SumdJGBqKSASQg",
+     Route(EntityKey(ServiceNameEnum.SPOTIFY, "song", "6jBCehpNMkwFVF3dz4nLIW"), ServiceNameEnum.SPOTIFY)),
+    ("https://music.youtube.com/channel/UCoIOOL7QKuBhQHVKL8y7BEQ",
+     Route(EntityKey(ServiceNameEnum.YOUTUBE_MUSIC, "artist", "UCoIOOL7QKuBhQHVKL8y7BEQ"),
+           ServiceNameEnum.YOUTUBE_MUSIC)),
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+     Route(EntityKey(YOUTUBE, "song", "dQw4w9WgXcQ"), ServiceNameEnum.YOUTUBE_YTM)),
+    ("https://m.youtube.com/@coldplay", Route(EntityKey(YOUTUBE, "artist", "@coldplay"), ServiceNameEnum.YOUTUBE_YTM)),
+    ("youtu.be/5waF8YR3GmQ", Route(EntityKey(YOUTUBE, "song", "5waF8YR3GmQ"), ServiceNameEnum.YOUTUBE_YTM)),
+    ("https://www.youtube.com/feed/trending", None),
+    ("check this out", None),
+])
+def test_default_routes(url, expected):
+    assert MusicServiceFactory.router().route(url) == expected
+
+
+def test_first_registered_service_wins():
+    router = LinkRouter([YoutubeService, YoutubeYTMService])
+    assert router.route("https://youtu.be/5waF8YR3GmQ").service == YOUTUBE
+
+    # kinds no registered service reads are not routed
+    router.register(SpotifyService)
+    assert router.route("https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M").service == ServiceNameEnum.SPOTIFY
+    assert LinkRouter([YoutubeService]).route("https://open.spotify.com/track/6jBCehpNMkwFVF3dz4nLIW") is None
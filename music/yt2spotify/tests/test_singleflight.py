@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from yt2spotify.converter import AsyncConverter
+from yt2spotify.models import Results, SearchParams
+from yt2spotify.services.abstract_service import AsyncMusicService
+from yt2spotify.services.service_names import ServiceNameEnum
+from yt2spotify.singleflight import SingleFlight
+
+
+class CountingAsyncService(AsyncMusicService):
+    name = ServiceNameEnum.SPOTIFY
+
+    def __init__(self):
+        self.lookups = 0
+        self.searches = 0
+
+    async def url_to_search_params(self, url: str) -> SearchParams:
+        self.lookups += 1
+        await asyncio.sleep(0.05)
+        return SearchParams(name=url, search_type_hint="song")
+
+    async def search_with_params(self, params: SearchParams, limit: int = 10) -> Results:
+        self.searches += 1
+        await asyncio.sleep(0.05)
+        return Results(results=[], manual_search_link=f"https://example.com/{params.name}")
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["done"] * 10
+    assert executions == 1
+    stats = flight.stats()
+    assert (stats.calls, stats.coalesced, stats.in_flight) == (10, 9, 0)
+
+
+def test_errors_reach_every_caller_and_are_not_remembered():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def ok():
+            return "recovered"
+        return await flight.do("key", ok)
+
+    assert asyncio.run(run()) == "recovered"
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        impatient = asyncio.ensure_future(flight.do("key", work))
+        patient = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_converter_coalesces_same_entity_only():
+    service = CountingAsyncService()
+    converter = AsyncConverter(service, service, single_flight=SingleFlight())
+    urls = ["https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT?si=a",
+            "https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT?si=b",
+            "https://open.spotify.com/track/3AJwUDP919kvQ9QcozQPxg"]
+
+    async def run():
+        return await asyncio.gather(*(converter.convert(url) for url in urls * 5))
+
+    asyncio.run(run())
+
+    assert service.lookups == 2
+    assert converter.single_flight.stats().coalesced == 13
@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fakes import FakeSpotify
+from yt2spotify.services.spotify import SpotifyService
+from yt2spotify.services.spotify_batch import LookupNotFound, SpotifyMetadataBatcher
+
+
+class CountingSpotify(FakeSpotify):
+    def __init__(self, missing=(), fail=False):
+        super().__init__()
+        self.missing = set(missing)
+        self.fail = fail
+        self.bulk_sizes = []
+
+    def tracks(self, tracks, market=None):
+        self.bulk_sizes.append(len(tracks))
+        if self.fail:
+            raise RuntimeError("boom")
+        result = super().tracks(tracks)
+        result["tracks"] = [None if t["id"] in self.missing else t for t in result["tracks"]]
+        return result
+
+    def albums(self, albums, market=None):
+        self.bulk_sizes.append(len(albums))
+        return super().albums(albums)
+
+
+def spotify_id(i: int) -> str:
+    return f"{i:022d}"
+
+
+def test_concurrent_lookups_share_one_request():
+    client = CountingSpotify()
+    batcher = SpotifyMetadataBatcher(client, window=0.05)
+
+    with ThreadPoolExecutor(30) as executor:
+        tracks = list(executor.map(batcher.track, [spotify_id(i) for i in range(30)]))
+
+    assert [track["id"] for track in tracks] == [spotify_id(i) for i in range(30)]
+    assert client.bulk_sizes == [30]
+    assert batcher.stats().lookups == 30 and batcher.stats().requests == 1
+
+
+def test_batches_respect_endpoint_limit():
+    client = CountingSpotify()
+    batcher = SpotifyMetadataBatcher(client, window=0.05)
+
+    with ThreadPoolExecutor(25) as executor:
+        albums = list(executor.map(batcher.album, [spotify_id(i) for i in range(25)]))
+
+    assert len(albums) == 25
+    assert sorted(client.bulk_sizes) == [5, 20]
+
+
+def test_duplicate_ids_are_looked_up_once():
+    client = CountingSpotify()
+    batcher = SpotifyMetadataBatcher(client, window=0.05)
+
+    with ThreadPoolExecutor(4) as executor:
+        tracks = list(executor.map(batcher.track, [spotify_id(1)] * 4))
+
+    assert client.bulk_sizes == [1]
+    assert all(track["id"] == spotify_id(1) for track in tracks)
+
+
+def test_errors_reach_only_the_affected_callers():
+    client = CountingSpotify(missing={spotify_id(1)})
+    batcher = SpotifyMetadataBatcher(client, window=0.05)
+
+    with ThreadPoolExecutor(2) as executor:
+        missing = executor.submit(batcher.track, spotify_id(1))
+        found = executor.submit(batcher.track, spotify_id(2))
+        assert found.result()["id"] == spotify_id(2)
+        with pytest.raises(LookupNotFound):
+            missing.result()
+
+
+def test_request_failure_is_raised_to_every_caller():
+    batcher = SpotifyMetadataBatcher(CountingSpotify(fail=True), window=0)
+
+    with pytest.raises(RuntimeError):
+        batcher.track(spotify_id(1))
+
+
+def test_service_uses_batcher_transparently():
+    service = SpotifyService(SpotifyMetadataBatcher(FakeSpotify(), window=0))
+
+    params = service.url_to_search_params(f"https://open.spotify.com/track/{spotify_id(7)}")
+    result = service.search_with_params(params)
+
+    assert params.search_type_hint == "song"
+    assert result.results
@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+
+from yt2spotify.services.spotify_token import SharedTokenCredentials
+
+
+class Endpoint:
+    def __init__(self, clock=time.time, lifetime=3600, delay=0.0):
+        self.clock = clock
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            return {"access_token": f"token-{self.calls}", "token_type": "Bearer", "expires_in": self.lifetime}
+
+
+def credentials(path, endpoint, **kwargs) -> SharedTokenCredentials:
+    creds = SharedTokenCredentials("client", "secret", path=str(path), **kwargs)
+    creds._request_access_token = endpoint
+    return creds
+
+
+def test_token_is_fetched_once_and_reused(tmp_path):
+    endpoint = Endpoint()
+    creds = credentials(tmp_path / "token.json", endpoint)
+
+    assert creds.get_access_token() == "token-1"
+    assert creds.get_access_token() == "token-1"
+    assert endpoint.calls == 1
+    assert os.stat(tmp_path / "token.json").st_mode & 0o777 == 0o600
+
+
+def test_token_is_shared_between_instances(tmp_path):
+    endpoint = Endpoint()
+    first = credentials(tmp_path / "token.json", endpoint)
+    second = credentials(tmp_path / "token.json", endpoint)
+
+    assert first.get_access_token() == second.get_access_token() == "token-1"
+    assert endpoint.calls == 1
+
+
+def test_parallel_workers_do_not_stampede(tmp_path):
+    endpoint = Endpoint(delay=0.05)
+    workers = [credentials(tmp_path / "token.json", endpoint) for _ in range(8)]
+    tokens = []
+
+    threads = [threading.Thread(target=lambda creds=creds: tokens.append(creds.get_access_token()))
+               for creds in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert endpoint.calls == 1
+    assert set(tokens) == {"token-1"}
+
+
+def test_expiring_token_is_replaced(tmp_path):
+    now = 1_000_000.0
+    endpoint = Endpoint()
+    creds = credentials(tmp_path / "token.json", endpoint, clock=lambda: now)
+    creds.get_access_token()
+
+    now = time.time() + 3600 - 30
+    assert creds.get_access_token() == "token-2"
+
+
+def test_refresher_renews_before_expiry(tmp_path):
+    # tokens live for 2 seconds and are renewed 1 second early, so no caller ever fetches one
+    endpoint = Endpoint(lifetime=2)
+    creds = credentials(tmp_path / "token.json", endpoint, refresh_margin=1)
+    creds.start_refresher()
+    try:
+        deadline = time.time() + 5
+        while endpoint.calls < 2 and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        creds.stop_refresher()
+
+    assert endpoint.calls >= 2
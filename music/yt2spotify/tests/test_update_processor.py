@@ -0,0 +1,65 @@
+import asyncio
+
+from telegram import Chat, Message, Update
+
+from update_processor import PerChatUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    chat = Chat(id=chat_id, type=Chat.PRIVATE)
+    message = Message(message_id=update_id, date=None, chat=chat, text="hi")
+    return Update(update_id=update_id, message=message)
+
+
+def test_same_chat_in_order_other_chats_concurrent():
+    processor = PerChatUpdateProcessor(max_concurrent_updates=16)
+    finished = []
+    active = 0
+    max_active = 0
+
+    async def handle(update_id: int, delay: float):
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(delay)
+        active -= 1
+        finished.append(update_id)
+
+    async def run():
+        # chat 1 sends a slow update followed by a fast one; chat 2 and 3 arrive meanwhile
+        updates = [(1, 1, 0.05), (2, 1, 0.0), (3, 2, 0.01), (4, 3, 0.01)]
+        await asyncio.gather(*(
+            processor.process_update(make_update(update_id, chat_id), handle(update_id, delay))
+            for update_id, chat_id, delay in updates
+        ))
+
+    asyncio.run(run())
+
+    assert finished.index(1) < finished.index(2)
+    assert finished.index(3) < finished.index(1)
+    assert max_active >= 3
+    assert processor._chat_queues == {}
+
+
+def test_busy_chat_does_not_hold_slots():
+    processor = PerChatUpdateProcessor(max_concurrent_updates=2)
+    finished = []
+
+    async def handle(update_id: int):
+        await asyncio.sleep(0.02)
+        finished.append(update_id)
+
+    async def run():
+        # chat 1's queued updates must not take the slot chat 2 needs
+        updates = [(1, 1), (2, 1), (3, 1), (4, 2)]
+        await asyncio.gather(*(
+            processor.process_update(make_update(update_id, chat_id), handle(update_id))
+            for update_id, chat_id in updates
+        ))
+
+    asyncio.run(run())
+
+    assert finished[0] in (1, 4)
+    assert finished.index(4) < finished.index(2)
+    assert [update_id for update_id in finished if update_id != 4] == [1, 2, 3]
+    assert processor._chat_queues == {}
@@ -0,0 +1,106 @@
+import json
+import threading
+
+import pytest
+
+from yt2spotify.services import youtube_client
+from yt2spotify.services.client_pool import ClientPool
+from yt2spotify.services.youtube_client import build_youtube_client, youtube_discovery_document
+from yt2spotify.services.youtube_standard import (CHANNEL_FIELDS, LOOKUP_FIELDS, PAGE_TOKEN_FIELDS, PLAYLIST_FIELDS,
+                                                  SEARCH_FIELDS)
+
+
+class RecordingHttp:
+    def __init__(self):
+        self.uris = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        import httplib2
+        self.uris.append(uri)
+        return httplib2.Response({"status": "200"}), json.dumps({"items": []}).encode()
+
+
+def test_document_is_parsed_once(monkeypatch):
+    monkeypatch.setattr(youtube_client, "_document", None)
+    loads = []
+    real_loads = json.loads
+    monkeypatch.setattr(youtube_client.json, "loads", lambda text: loads.append(1) or real_loads(text))
+
+    first = youtube_discovery_document()
+    build_youtube_client("key")
+    build_youtube_client("key")
+
+    assert youtube_discovery_document() is first
+    assert len(loads) == 1
+
+
+def test_document_can_come_from_disk(monkeypatch, tmp_path):
+    path = tmp_path / "youtube.v3.json"
+    path.write_text(json.dumps(youtube_discovery_document()))
+    monkeypatch.setattr(youtube_client, "_document", None)
+    monkeypatch.setenv("YOUTUBE_DISCOVERY_DOCUMENT", str(path))
+
+    client = build_youtube_client("key")
+
+    assert "videos" in youtube_discovery_document()["resources"]
+    assert client.videos().list(part="snippet", id="dQw4w9WgXcQ").uri.startswith("https://youtube.googleapis.com/")
+
+
+def test_pooled_client_is_thread_safe():
+    http = RecordingHttp()
+    client = build_youtube_client("key", ClientPool(lambda: http, size=2))
+
+    def call(i):
+        client.videos().list(part="snippet", id=str(i)).execute()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(http.uris) == 20
+    assert all("key=key" in uri for uri in http.uris)
+
+
+def _split_top_level(mask: str):
+    depth, start = 0, 0
+    for i, char in enumerate(mask):
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        if char == "," and depth == 0:
+            yield mask[start:i]
+            start = i + 1
+    yield mask[start:]
+
+
+def field_paths(mask: str, prefix=()):
+    """
+    The paths a partial-response `fields` mask selects, e.g. "a/b(c,d)" -> [(a, b, c), (a, b, d)].
+    """
+    paths = []
+    for term in _split_top_level(mask):
+        head, paren, inner = term.partition("(")
+        path = prefix + tuple(head.split("/"))
+        paths.extend(field_paths(inner[:-1], path) if paren else [path])
+    return paths
+
+
+@pytest.mark.parametrize("resource,mask", [
+    ("search", SEARCH_FIELDS),
+    ("videos", LOOKUP_FIELDS),
+    ("playlists", LOOKUP_FIELDS),
+    ("channels", CHANNEL_FIELDS),
+    ("playlistItems", PLAYLIST_FIELDS),
+    ("playlistItems", PAGE_TOKEN_FIELDS),
+])
+def test_field_masks_match_the_api_schema(resource, mask):
+    # the API answers a mask naming a field its resource lacks with 400 Bad Request
+    document = youtube_discovery_document()
+    response = document["resources"][resource]["methods"]["list"]["response"]["$ref"]
+    for path in field_paths(mask):
+        schema = document["schemas"][response]
+        for field in path:
+            schema = schema.get("items", schema)
+            schema = document["schemas"][schema["$ref"]] if "$ref" in schema else schema
+            assert field in schema.get("properties", {}), f"{resource}: {'/'.join(path)}"
+            schema = schema["properties"][field]